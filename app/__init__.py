@@ -3,19 +3,43 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flasgger import Swagger
+from .cache import ResponseCache
+from .passwords import PasswordHasher
+from .instrumentation import RequestInstrumentation
 
 db = SQLAlchemy()
 migrate = Migrate()
 jwt = JWTManager()
 swagger = Swagger()
+response_cache = ResponseCache()
+password_hasher = PasswordHasher()
+request_instrumentation = RequestInstrumentation()
 
-def create_app():
+def create_app(config_object='config.Config'):
     app = Flask(__name__)
-    app.config.from_object('config.Config')
+    app.config.from_object(config_object)
+
+    from .db_pool import engine_options, init_pool
+    from .metrics import init_metrics
+    from .serialization import init_serialization
+    init_serialization(app)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
 
     db.init_app(app)
+    with app.app_context():
+        init_pool(app, db.engine)
+        request_instrumentation.init_app(app, db.engine)
+        init_metrics(app, db.engine)
     migrate.init_app(app, db)
     jwt.init_app(app)
+    response_cache.init_app(app)
+    password_hasher.init_app(app)
+
+    # Se registran después de db porque consultan los modelos RevokedToken y ONG
+    from .token_revocation import TokenRevocationList
+    TokenRevocationList(app, jwt)
+    from .identity import IdentityCache
+    IdentityCache(app, jwt)
 
     swagger_config = {
         "securityDefinitions": {
@@ -35,10 +59,35 @@ def create_app():
 
     from .routes import api as api_blueprint
     app.register_blueprint(api_blueprint, url_prefix='/api')
+
+    from .monitoring import monitoring as monitoring_blueprint, get_metrics
+    app.register_blueprint(monitoring_blueprint, url_prefix='/monitoring')
+    app.add_url_rule('/metrics', 'metrics', get_metrics)
     
     from .models import ONG, ProjectDefinition, WorkPlan, CoveragePlan, PedidoColaboracion, Compromiso
+
+    # Bases efímeras (p. ej. SQLite en memoria de TestConfig) se crean desde los modelos
+    if app.config.get('SQLALCHEMY_CREATE_ALL'):
+        with app.app_context():
+            db.create_all()
     
-    from seed import seed_db_command
+    from seed import seed_db_command, seed_synthetic_command
     app.cli.add_command(seed_db_command)
+    app.cli.add_command(seed_synthetic_command)
+
+    from .coverage_totals import reconcile_coverage_command
+    app.cli.add_command(reconcile_coverage_command)
+
+    from .query_plans import check_query_plans_command
+    app.cli.add_command(check_query_plans_command)
+
+    from .pedido_events import prune_pedido_events_command
+    app.cli.add_command(prune_pedido_events_command)
+
+    from .sync import prune_tombstones_command
+    app.cli.add_command(prune_tombstones_command)
+
+    from .facets import rebuild_facets_command
+    app.cli.add_command(rebuild_facets_command)
 
     return app
\ No newline at end of file
@@ -1,15 +1,30 @@
-from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
-from flask_jwt_extended import create_access_token
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import create_access_token, create_refresh_token, get_jwt, jwt_required
+from sqlalchemy.exc import IntegrityError
 from app.models.ong import ONG
-from . import db
+from .passwords import PasswordPoolBusy
+from . import db, password_hasher
 
 auth = Blueprint('auth', __name__)
 
+@auth.errorhandler(PasswordPoolBusy)
+def handle_password_pool_busy(error):
+    # Rechazo rápido: mejor que el cliente reintente a que la petición espere en cola
+    response = jsonify({"msg": "Servicio de autenticación saturado, reintente en unos segundos"})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+def _issue_tokens(ong_id):
+    """Par de tokens: acceso de vida corta y refresco de vida larga."""
+    return {
+        "access_token": create_access_token(identity=str(ong_id)),
+        "refresh_token": create_refresh_token(identity=str(ong_id)),
+    }
+
 @auth.route('/login', methods=['POST'])
 def login():
     """
-    Inicia sesión de una ONG y devuelve un token de acceso JWT.
+    Inicia sesión de una ONG y devuelve un token de acceso JWT y un token de refresco.
     ---
     tags:
       - Autenticación
@@ -30,11 +45,13 @@ def login():
               example: "password123"
     responses:
       200:
-        description: Inicio de sesión exitoso, devuelve un token de acceso.
+        description: Inicio de sesión exitoso, devuelve un token de acceso y uno de refresco.
       400:
         description: Falta el nombre o la contraseña de la ONG.
       401:
         description: Nombre de ONG o contraseña incorrectos.
+      503:
+        description: Demasiados inicios de sesión en curso, reintentar luego.
     """
     data = request.get_json()
     name = data.get('name')
@@ -46,11 +63,20 @@ def login():
     # Buscamos la ONG por su nombre
     ong = ONG.query.filter_by(name=name).first()
 
-    # Verificamos si la ONG existe y si el hash de la contraseña coincide
-    if ong and check_password_hash(ong.password, password):
-        # Creamos el token de acceso, identificando al usuario por su ID
-        access_token = create_access_token(identity=str(ong.id))
-        return jsonify(access_token=access_token)
+    # Verificamos si la ONG existe y si el hash de la contraseña coincide (en el pool de hashing)
+    if ong and password_hasher.verify(ong.password, password):
+        # Si el costo configurado cambió, regeneramos el hash ahora que conocemos la
+        # contraseña. Con el pool saturado se deja para otro inicio de sesión: la
+        # contraseña ya se verificó y el login no debe fallar por esto
+        if password_hasher.needs_rehash(ong.password):
+            try:
+                ong.password = password_hasher.hash(password)
+                db.session.commit()
+            except PasswordPoolBusy:
+                pass
+
+        # Creamos los tokens, identificando al usuario por su ID
+        return jsonify(_issue_tokens(ong.id))
 
     return jsonify({"msg": "Nombre de ONG o contraseña incorrectos"}), 401
 
@@ -83,6 +109,8 @@ def register():
         description: Falta el nombre o la contraseña de la ONG.
       409:
         description: El nombre de la ONG ya existe.
+      503:
+        description: Demasiados registros en curso, reintentar luego.
     """
     data = request.get_json()
     name = data.get('name')
@@ -96,7 +124,7 @@ def register():
         return jsonify({"msg": "El nombre de la ONG ya existe"}), 409
 
     # Creamos un hash de la contraseña antes de guardarla
-    hashed_password = generate_password_hash(password, method='pbkdf2:sha256')
+    hashed_password = password_hasher.hash(password)
     
     # Creamos la nueva instancia de la ONG
     new_ong = ONG(name=name, password=hashed_password)
@@ -105,4 +133,55 @@ def register():
     db.session.add(new_ong)
     db.session.commit()
 
-    return jsonify({"msg": "ONG creada exitosamente"}), 201
\ No newline at end of file
+    return jsonify({"msg": "ONG creada exitosamente"}), 201
+
+@auth.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    """
+    Emite un nuevo token de acceso a partir de un token de refresco, sin volver a
+    verificar la contraseña. El token de refresco usado queda revocado y se
+    devuelve uno nuevo (rotación): reutilizar uno ya usado devuelve 401.
+    ---
+    tags:
+      - Autenticación
+    security:
+      - bearerAuth: []
+    responses:
+      200:
+        description: Nuevo token de acceso y nuevo token de refresco.
+      401:
+        description: Token de refresco inválido, vencido o ya utilizado.
+    """
+    jwt_payload = get_jwt()
+    current_app.extensions['token_revocation'].revoke(jwt_payload)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Otra petición rotó este mismo token al mismo tiempo
+        db.session.rollback()
+        return jsonify({"msg": "El token de refresco ya fue utilizado"}), 401
+
+    return jsonify(_issue_tokens(jwt_payload['sub']))
+
+@auth.route('/logout', methods=['POST'])
+@jwt_required(verify_type=False)
+def logout():
+    """
+    Revoca el token enviado (de acceso o de refresco).
+    ---
+    tags:
+      - Autenticación
+    security:
+      - bearerAuth: []
+    responses:
+      200:
+        description: Token revocado.
+    """
+    current_app.extensions['token_revocation'].revoke(get_jwt())
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+
+    return jsonify({"msg": "Token revocado"})
\ No newline at end of file
@@ -0,0 +1,172 @@
+"""
+Caché de respuestas HTTP para los endpoints de lectura.
+
+Las respuestas se guardan por ruta + query string (y cabecera Accept, que elige
+entre JSON, NDJSON y MessagePack) y se invalidan por versión: cada
+recurso ('pedidos', 'proyectos') tiene un contador que los endpoints de escritura
+incrementan, y la versión vigente forma parte de la clave, de modo que una
+escritura deja inaccesibles todas las entradas anteriores sin tener que
+recorrerlas. Además cada entrada vence a los RESPONSE_CACHE_TTL segundos.
+
+Toda respuesta cacheada lleva un ETag fuerte (hash del cuerpo) y un
+`If-None-Match` coincidente se responde con 304 sin cuerpo.
+
+El backend por defecto es un LRU en memoria de cada worker: con varios workers de
+gunicorn una escritura solo invalida el caché del worker que la atendió y los
+demás pueden servir la versión anterior hasta que venza el TTL. Con
+RESPONSE_CACHE_BACKEND='redis' las versiones y las entradas se comparten entre
+workers.
+"""
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import make_response, request
+
+
+class MemoryBackend:
+    """LRU con vencimiento por entrada, local al proceso y seguro entre hilos."""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            expires_at = time.monotonic() + ttl if ttl else None
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def get_counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key):
+        # Los contadores de versión viven fuera del LRU para que nunca se desalojen
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+
+class RedisBackend:
+    """Backend compartido entre workers. Requiere el paquete `redis`."""
+
+    def __init__(self, url, prefix='respcache:'):
+        import redis
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self._client.get(self.prefix + key)
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        self._client.set(self.prefix + key, pickle.dumps(value), ex=ttl)
+
+    def delete(self, key):
+        self._client.delete(self.prefix + key)
+
+    def get_counter(self, key):
+        raw = self._client.get(self.prefix + key)
+        return int(raw) if raw is not None else 0
+
+    def incr(self, key):
+        # Las versiones se guardan como enteros planos para poder usar INCR
+        return self._client.incr(self.prefix + key)
+
+
+class ResponseCache:
+    """Extensión de Flask que cachea respuestas GET y las invalida por versión."""
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.ttl = None
+        self.enabled = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config['RESPONSE_CACHE_TTL']
+        self.enabled = app.config['RESPONSE_CACHE_ENABLED']
+        if app.config['RESPONSE_CACHE_BACKEND'] == 'redis':
+            self.backend = RedisBackend(app.config['RESPONSE_CACHE_REDIS_URL'])
+        else:
+            self.backend = MemoryBackend(app.config['RESPONSE_CACHE_MAX_ENTRIES'])
+        app.extensions['response_cache'] = self
+
+    def _key(self, namespaces):
+        versions = ','.join(f"{ns}={self.backend.get_counter(f'version:{ns}')}" for ns in namespaces)
+        # Se ordena por nombre de parámetro sin alterar el orden de los valores
+        # repetidos (`?ids=3&ids=1` no es lo mismo que `?ids=1&ids=3`)
+        params = request.query_string.decode().split('&')
+        query_string = '&'.join(sorted(params, key=lambda param: param.split('=', 1)[0]))
+        # El formato de la respuesta también depende de la cabecera Accept
+        accept = request.headers.get('Accept', '')
+        return f"{versions}:{request.path}?{query_string}:{accept}"
+
+    def invalidate(self, *namespaces):
+        """Incrementa la versión de los recursos modificados por una escritura."""
+        if self.backend is None:
+            return
+        for namespace in namespaces:
+            self.backend.incr(f"version:{namespace}")
+
+    def cached(self, *namespaces):
+        """
+        Decorador para vistas GET cuyo resultado depende solo de la ruta, el query
+        string y los recursos indicados (no de la ONG autenticada). Las respuestas en
+        streaming y las que no son 200 no se cachean.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return view(*args, **kwargs)
+
+                key = self._key(namespaces)
+                entry = self.backend.get(key)
+                if entry is None:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200 or response.is_streamed:
+                        return response
+                    body = response.get_data()
+                    entry = {
+                        "body": body,
+                        "mimetype": response.mimetype,
+                        "headers": [(k, v) for k, v in response.headers if k in ('X-Next-Cursor', 'Link', 'Vary')],
+                        "etag": hashlib.sha256(body).hexdigest(),
+                    }
+                    self.backend.set(key, entry, self.ttl)
+                else:
+                    response = make_response(entry["body"])
+                    response.mimetype = entry["mimetype"]
+                    response.headers.extend(entry["headers"])
+
+                response.set_etag(entry["etag"])
+                # Responde 304 sin cuerpo si el cliente ya tiene esta versión
+                return response.make_conditional(request)
+            return wrapper
+        return decorator
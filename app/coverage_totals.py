@@ -0,0 +1,135 @@
+"""
+Totales de cobertura mantenidos sobre cada pedido de colaboración.
+
+`amount_committed_total` y `amount_fulfilled_total` se actualizan en la misma
+transacción que crea o cumple un compromiso, con un UPDATE atómico (x = x + monto)
+para que dos compromisos concurrentes no pisen sus sumas. Cuando lo comprometido
+alcanza lo pedido, el pedido pasa a 'covered' en esa misma sentencia.
+
+El comando `flask reconcile-coverage` reconstruye los totales desde la tabla de
+compromisos, por lotes de ids, por si alguna escritura quedó fuera de este camino.
+Solo los pedidos que efectivamente cambian reciben un `updated_at` nuevo, así una
+reconciliación no obliga a los clientes de GET /api/sync a descargar todo.
+"""
+from datetime import datetime
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import and_, bindparam, case, exists, func, or_, select, update
+from . import db
+
+from .models import PedidoColaboracion, Compromiso
+
+
+pedidos_table = PedidoColaboracion.__table__
+
+
+def _covers(committed_total, amount_requested):
+    """Condición de pedido cubierto, la misma al registrar compromisos y al reconciliar."""
+    return committed_total >= func.coalesce(amount_requested, 0)
+
+
+def _covered_status(committed_total):
+    """Expresión del nuevo estado: 'covered' si lo comprometido alcanza lo pedido."""
+    return case(
+        (_covers(committed_total, pedidos_table.c.amount_requested), 'covered'),
+        else_=pedidos_table.c.status,
+    )
+
+
+def register_commitments(amounts):
+    """
+    Suma los compromisos nuevos a sus pedidos ({pedido_id: monto}) y marca como
+    cubiertos los que alcanzan lo pedido. Una sola sentencia ejecutada en lote.
+    """
+    if not amounts:
+        return
+    committed_total = func.coalesce(pedidos_table.c.amount_committed_total, 0) + bindparam('amount')
+    db.session.execute(
+        update(pedidos_table)
+        .where(pedidos_table.c.id == bindparam('pedido_id'))
+        .values(amount_committed_total=committed_total, status=_covered_status(committed_total)),
+        [{"pedido_id": pedido_id, "amount": amount} for pedido_id, amount in amounts.items()],
+    )
+
+
+def register_fulfillments(amounts):
+    """Suma los compromisos cumplidos al total cumplido de sus pedidos ({pedido_id: monto})."""
+    if not amounts:
+        return
+    db.session.execute(
+        update(pedidos_table)
+        .where(pedidos_table.c.id == bindparam('pedido_id'))
+        .values(amount_fulfilled_total=func.coalesce(pedidos_table.c.amount_fulfilled_total, 0) + bindparam('amount')),
+        [{"pedido_id": pedido_id, "amount": amount} for pedido_id, amount in amounts.items()],
+    )
+
+
+def register_commitment(pedido_id, amount):
+    """Suma un compromiso nuevo al pedido y lo marca como cubierto si corresponde."""
+    register_commitments({pedido_id: amount})
+
+
+def register_fulfillment(pedido_id, amount):
+    """Suma un compromiso cumplido al total cumplido del pedido."""
+    register_fulfillments({pedido_id: amount})
+
+
+def reconcile_totals(batch_size=10000, min_id=0):
+    """
+    Recalcula los totales y el estado de los pedidos con id mayor a `min_id` (por
+    defecto todos) a partir de los compromisos. Trabaja por rangos de ids y
+    confirma cada lote para no retener locks sobre toda la tabla.
+    Devuelve la cantidad de pedidos procesados.
+    """
+    committed = (
+        select(func.coalesce(func.sum(Compromiso.amount_committed), 0))
+        .where(Compromiso.pedido_id == PedidoColaboracion.id)
+        .scalar_subquery()
+    )
+    fulfilled = (
+        select(func.coalesce(func.sum(Compromiso.amount_committed), 0))
+        .where(Compromiso.pedido_id == PedidoColaboracion.id, Compromiso.status == 'fulfilled')
+        .scalar_subquery()
+    )
+    # El estado se evalúa al registrar un compromiso: un pedido sin compromisos
+    # sigue abierto aunque pida un monto 0
+    has_commitments = exists().where(Compromiso.pedido_id == PedidoColaboracion.id)
+    status = case(
+        (and_(has_commitments, _covers(committed, PedidoColaboracion.amount_requested)), 'covered'),
+        else_='open',
+    )
+    changed = or_(
+        PedidoColaboracion.amount_committed_total.is_distinct_from(committed),
+        PedidoColaboracion.amount_fulfilled_total.is_distinct_from(fulfilled),
+        PedidoColaboracion.status.is_distinct_from(status),
+    )
+
+    max_id = db.session.execute(select(func.max(PedidoColaboracion.id))).scalar() or 0
+    processed = 0
+    for start in range(min_id, max_id, batch_size):
+        result = db.session.execute(
+            update(PedidoColaboracion)
+            .where(PedidoColaboracion.id > start, PedidoColaboracion.id <= start + batch_size)
+            .values(
+                amount_committed_total=committed, amount_fulfilled_total=fulfilled, status=status,
+                updated_at=case((changed, datetime.now()), else_=PedidoColaboracion.updated_at),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        processed += result.rowcount
+    return processed
+
+
+@click.command('reconcile-coverage')
+@click.option('--batch-size', default=10000, show_default=True, help="Pedidos por lote.")
+@with_appcontext
+def reconcile_coverage_command(batch_size):
+    """Reconstruye los totales de cobertura y el estado de todos los pedidos."""
+    try:
+        processed = reconcile_totals(batch_size)
+        print(f"Totales de cobertura recalculados para {processed} pedidos.")
+    except Exception as e:
+        db.session.rollback()
+        raise click.ClickException(f"Error al recalcular los totales de cobertura: {e}")
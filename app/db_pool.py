@@ -0,0 +1,156 @@
+"""
+Configuración y métricas del pool de conexiones a Postgres.
+
+El tamaño del pool se calcula por worker de gunicorn según su clase: un worker
+`sync` atiende una petición a la vez, uno `gthread` tantas como hilos y uno
+`gevent`/`eventlet` muchas más. Así el total de conexiones (workers x (pool_size
++ max_overflow)) puede dimensionarse contra `max_connections` de Postgres.
+
+Cada sentencia tiene un tope de duración (DB_STATEMENT_TIMEOUT_MS). Con
+DB_PGBOUNCER_MODE=1 el tope se aplica con `SET LOCAL` al iniciar cada
+transacción, porque pgbouncer en modo transacción no reenvía los parámetros de
+arranque de la conexión; psycopg2 no usa sentencias preparadas del lado del
+servidor, así que no hace falta nada más para ese modo.
+
+`pool_stats()` expone conexiones en uso, overflow y un histograma del tiempo de
+espera para obtener una conexión del pool.
+"""
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+# Límites superiores (en segundos) del histograma de espera de checkout
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float('inf'))
+
+# Conexiones base y de overflow por worker, según la clase de worker de gunicorn
+WORKER_POOL_DEFAULTS = {
+    'sync': (2, 0),
+    'gevent': (10, 10),
+    'eventlet': (10, 10),
+}
+
+
+class PoolMetrics:
+    """Contadores e histograma de espera del pool de este proceso."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.bucket_counts = [0] * len(WAIT_BUCKETS)
+        self.wait_sum = 0.0
+        self.checkouts = 0
+        self.timeouts = 0
+        # Callbacks adicionales por cada espera y cada timeout (p. ej. app/metrics.py)
+        self.wait_observers = []
+        self.timeout_observers = []
+
+    def observe_wait(self, seconds):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_sum += seconds
+            for i, bound in enumerate(WAIT_BUCKETS):
+                if seconds <= bound:
+                    self.bucket_counts[i] += 1
+                    break
+        for observer in self.wait_observers:
+            observer(seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+        for observer in self.timeout_observers:
+            observer()
+
+
+pool_metrics = PoolMetrics()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool que mide cuánto espera cada checkout hasta obtener una conexión."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.record_timeout()
+            raise
+        finally:
+            pool_metrics.observe_wait(time.perf_counter() - start)
+
+
+def _default_pool_size(config):
+    worker_class = config['GUNICORN_WORKER_CLASS']
+    if worker_class == 'gthread':
+        threads = config['GUNICORN_THREADS']
+        return threads, max(1, threads // 2)
+    return WORKER_POOL_DEFAULTS.get(worker_class, WORKER_POOL_DEFAULTS['sync'])
+
+
+def engine_options(config):
+    """Opciones de `create_engine` para SQLALCHEMY_ENGINE_OPTIONS según la configuración."""
+    if not config['SQLALCHEMY_DATABASE_URI'].startswith('postgresql'):
+        return {}
+
+    default_size, default_overflow = _default_pool_size(config)
+    options = {
+        'poolclass': TimedQueuePool,
+        'pool_size': config['DB_POOL_SIZE'] or default_size,
+        'max_overflow': config['DB_MAX_OVERFLOW'] if config['DB_MAX_OVERFLOW'] is not None else default_overflow,
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': True,
+    }
+
+    statement_timeout = config['DB_STATEMENT_TIMEOUT_MS']
+    if statement_timeout and not config['DB_PGBOUNCER_MODE']:
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+    return options
+
+
+def init_pool(app, engine):
+    """Registra los eventos que dependen del modo de conexión sobre el engine ya creado."""
+    statement_timeout = app.config['DB_STATEMENT_TIMEOUT_MS']
+    if engine.dialect.name != 'postgresql' or not app.config['DB_PGBOUNCER_MODE'] or not statement_timeout:
+        return
+
+    @event.listens_for(engine, 'begin')
+    def set_local_statement_timeout(conn):
+        # SET LOCAL vale solo para esta transacción, que pgbouncer atiende con una única
+        # conexión real. Se usa el cursor DBAPI porque la transacción aún se está abriendo.
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(f'SET LOCAL statement_timeout = {int(statement_timeout)}')
+        finally:
+            cursor.close()
+
+
+def pool_stats(engine):
+    """Estado actual del pool y métricas acumuladas de espera de este proceso."""
+    pool = engine.pool
+    stats = {
+        'pool_class': type(pool).__name__,
+        'checkouts': pool_metrics.checkouts,
+        'checkout_timeouts': pool_metrics.timeouts,
+        'checkout_wait_seconds_sum': pool_metrics.wait_sum,
+        'checkout_wait_seconds_buckets': {
+            ('+Inf' if bound == float('inf') else str(bound)): count
+            for bound, count in zip(WAIT_BUCKETS, _cumulative(pool_metrics.bucket_counts))
+        },
+    }
+    if isinstance(pool, QueuePool):
+        stats.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow(),
+        })
+    return stats
+
+
+def _cumulative(counts):
+    total = 0
+    for count in counts:
+        total += count
+        yield total
@@ -0,0 +1,109 @@
+"""
+Conteos por faceta para la navegación del catálogo (GET /api/facets).
+
+`facet_counts` guarda una fila por (faceta, valor):
+    country        proyectos por país
+    project_type   proyectos por cada tipo de `project_types`
+    request_type   pedidos (abiertos y cubiertos) por tipo de pedido
+
+Las escrituras que crean proyectos o pedidos suman sus valores en la misma
+transacción con un upsert (INSERT ... ON CONFLICT DO UPDATE, count = count + n),
+así el endpoint lee una tabla chica por su clave primaria sin importar el tamaño
+del catálogo. Las claves se actualizan siempre en el mismo orden para que dos
+transacciones concurrentes no se bloqueen mutuamente.
+
+`flask rebuild-facets` recalcula la tabla desde cero, por ejemplo después de una
+carga masiva o si alguna escritura quedó fuera de este camino. Los filtros
+`?project_types=` de los listados siguen resolviéndose con el índice GIN de
+`project_definitions.project_types`.
+"""
+from collections import Counter
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import delete, func, insert, literal, select, text, true
+from sqlalchemy.dialects import postgresql, sqlite
+from . import db
+
+from .models import ProjectDefinition, PedidoColaboracion, FacetCount
+
+FACETS = ('country', 'project_type', 'request_type')
+# Largo máximo de un valor contado: un tipo de proyecto más largo haría fallar el upsert
+FACET_VALUE_MAX_LENGTH = FacetCount.value.type.length
+
+
+def _upsert():
+    dialect = postgresql if db.engine.dialect.name == 'postgresql' else sqlite
+    statement = dialect.insert(FacetCount)
+    return statement.on_conflict_do_update(
+        index_elements=[FacetCount.facet, FacetCount.value],
+        set_={'count': FacetCount.count + statement.excluded['count']},
+    )
+
+
+def increment_facets(counts):
+    """Suma `counts` ({(faceta, valor): n}) a la tabla, en la transacción en curso."""
+    rows = [
+        {"facet": facet, "value": value, "count": count}
+        for (facet, value), count in sorted(counts.items()) if count
+    ]
+    if rows:
+        db.session.execute(_upsert(), rows)
+
+
+def register_project_facets(country, project_types):
+    """Cuenta un proyecto nuevo en su país y en cada uno de sus tipos."""
+    counts = Counter({('country', country): 1})
+    counts.update(('project_type', project_type) for project_type in set(project_types or ()) if project_type)
+    increment_facets(counts)
+
+
+def register_pedido_facets(request_types):
+    """Cuenta los pedidos nuevos, uno por elemento de `request_types`."""
+    increment_facets(Counter(('request_type', request_type) for request_type in request_types))
+
+
+def _project_type_counts():
+    """Proyectos por tipo, desanidando `project_types` (ARRAY en Postgres, JSON en SQLite)."""
+    if db.engine.dialect.name == 'postgresql':
+        types = func.unnest(ProjectDefinition.project_types).table_valued('value').render_derived()
+    else:
+        types = func.json_each(ProjectDefinition.project_types).table_valued('value')
+    return (
+        select(literal('project_type'), types.c.value, func.count(ProjectDefinition.id.distinct()))
+        .select_from(ProjectDefinition)
+        .join(types, true())
+        .where(types.c.value.is_not(None))
+        .group_by(types.c.value)
+    )
+
+
+def rebuild_facets():
+    """Recalcula todos los conteos desde los proyectos y pedidos. Devuelve la cantidad de filas."""
+    sources = [
+        select(literal('country'), ProjectDefinition.country, func.count())
+        .group_by(ProjectDefinition.country),
+        _project_type_counts(),
+        select(literal('request_type'), PedidoColaboracion.request_type, func.count())
+        .group_by(PedidoColaboracion.request_type),
+    ]
+    if db.engine.dialect.name == 'postgresql':
+        # Las altas concurrentes esperan a que termine; las lecturas siguen
+        db.session.execute(text("LOCK TABLE facet_counts IN EXCLUSIVE MODE"))
+    db.session.execute(delete(FacetCount))
+    for source in sources:
+        db.session.execute(insert(FacetCount).from_select(['facet', 'value', 'count'], source))
+    db.session.commit()
+    return db.session.execute(select(func.count()).select_from(FacetCount)).scalar()
+
+
+@click.command('rebuild-facets')
+@with_appcontext
+def rebuild_facets_command():
+    """Recalcula la tabla de conteos por faceta de GET /api/facets."""
+    try:
+        rows = rebuild_facets()
+        print(f"Conteos por faceta recalculados: {rows} valores.")
+    except Exception as e:
+        db.session.rollback()
+        raise click.ClickException(f"Error al recalcular los conteos por faceta: {e}")
@@ -0,0 +1,68 @@
+"""
+Identidad de la ONG autenticada, resuelta una vez por petición y cacheada por worker.
+
+`flask_jwt_extended` llama a `user_lookup_loader` en cada petición autenticada.
+Acá ese callback devuelve una `ONGIdentity` (id, nombre) tomada de un LRU con
+vencimiento, de modo que las rutas leen `current_ong.id` y `current_ong.name`
+sin consultar la tabla `ongs` en cada petición.
+
+Los cambios o bajas de una ONG hechos por el ORM invalidan la entrada en el
+worker que los hace; en los demás workers la entrada vence a los
+IDENTITY_CACHE_TTL segundos.
+"""
+from collections import namedtuple
+
+from flask import jsonify
+from flask_jwt_extended import get_current_user
+from sqlalchemy import event, select
+from werkzeug.local import LocalProxy
+from . import db
+
+from .cache import MemoryBackend
+from .models import ONG
+
+ONGIdentity = namedtuple('ONGIdentity', ['id', 'name'])
+
+# La ONG autenticada en la petición actual
+current_ong = LocalProxy(get_current_user)
+
+
+class IdentityCache:
+    """Resuelve y cachea la identidad de la ONG dueña del token."""
+
+    def __init__(self, app=None, jwt=None):
+        self.ttl = None
+        self.backend = None
+        if app is not None:
+            self.init_app(app, jwt)
+
+    def init_app(self, app, jwt):
+        self.ttl = app.config['IDENTITY_CACHE_TTL']
+        self.backend = MemoryBackend(app.config['IDENTITY_CACHE_MAX_ENTRIES'])
+        jwt.user_lookup_loader(self._lookup_callback)
+        jwt.user_lookup_error_loader(self._lookup_error_callback)
+        event.listen(ONG, 'after_update', self._evict_callback)
+        event.listen(ONG, 'after_delete', self._evict_callback)
+        app.extensions['identity_cache'] = self
+
+    def get(self, ong_id):
+        identity = self.backend.get(ong_id)
+        if identity is None:
+            row = db.session.execute(select(ONG.id, ONG.name).where(ONG.id == ong_id)).first()
+            if row is None:
+                return None
+            identity = ONGIdentity(row.id, row.name)
+            self.backend.set(ong_id, identity, self.ttl)
+        return identity
+
+    def evict(self, ong_id):
+        self.backend.delete(ong_id)
+
+    def _lookup_callback(self, jwt_header, jwt_payload):
+        return self.get(int(jwt_payload['sub']))
+
+    def _lookup_error_callback(self, jwt_header, jwt_payload):
+        return jsonify({"msg": "ONG no encontrada"}), 401
+
+    def _evict_callback(self, mapper, connection, target):
+        self.evict(target.id)
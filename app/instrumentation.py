@@ -0,0 +1,151 @@
+"""
+Instrumentación por petición: consultas SQL, tiempo en la base y serialización.
+
+Con eventos del engine se cuenta cada sentencia y se suma su duración dentro de
+la petición en curso; el proveedor JSON de la app (app/serialization.py) suma el
+tiempo de cada codificación con `serialization_timer`. Al terminar la petición se agrega la cabecera
+`Server-Timing` (visible en las herramientas de desarrollo del navegador):
+
+    Server-Timing: db;dur=12.4;desc="5 queries", serialize;dur=3.1, app;dur=4.0, total;dur=19.5
+
+Las peticiones que superan SLOW_REQUEST_MS se registran, con una fracción
+SLOW_REQUEST_SAMPLE_RATE, en el logger `app.slow_requests` junto con sus
+sentencias más lentas. Los parámetros de las sentencias nunca se escriben: solo
+su nombre y tipo.
+
+Las respuestas en streaming serializan después de que termina la petición, así
+que para ellas `serialize` no incluye el cuerpo.
+"""
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+slow_request_logger = logging.getLogger('app.slow_requests')
+
+# Sentencias guardadas por petición para el log de peticiones lentas
+MAX_RECORDED_STATEMENTS = 200
+
+
+class RequestStats:
+    """Lo medido durante una petición."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.statements = []
+
+    def record_statement(self, statement, parameters, executemany, seconds):
+        self.queries += 1
+        self.db_seconds += seconds
+        if len(self.statements) < MAX_RECORDED_STATEMENTS:
+            self.statements.append((seconds, statement, redact(parameters, executemany)))
+
+
+def redact(parameters, executemany=False):
+    """Reemplaza cada valor de los parámetros por su tipo."""
+    if executemany:
+        return f"<{len(parameters)} filas>"
+    if isinstance(parameters, dict):
+        return {key: f"<{type(value).__name__}>" for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [f"<{type(value).__name__}>" for value in parameters]
+    return None
+
+
+def current_stats():
+    """Estadísticas de la petición en curso, o None fuera de una petición."""
+    if not has_request_context():
+        return None
+    return g.get('_request_stats')
+
+
+@contextmanager
+def serialization_timer():
+    """Suma al tiempo de serialización de la petición en curso lo que dure el bloque."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = current_stats()
+        if stats is not None:
+            stats.serialize_seconds += time.perf_counter() - start
+
+
+class RequestInstrumentation:
+    """Extensión de Flask que mide cada petición y emite Server-Timing y el log de lentas."""
+
+    def __init__(self, app=None, engine=None):
+        self.enabled = False
+        self.slow_seconds = None
+        self.sample_rate = None
+        self.max_logged_statements = None
+        if app is not None:
+            self.init_app(app, engine)
+
+    def init_app(self, app, engine):
+        self.enabled = app.config['SERVER_TIMING_ENABLED']
+        self.slow_seconds = app.config['SLOW_REQUEST_MS'] / 1000
+        self.sample_rate = app.config['SLOW_REQUEST_SAMPLE_RATE']
+        self.max_logged_statements = app.config['SLOW_REQUEST_MAX_STATEMENTS']
+        app.extensions['request_instrumentation'] = self
+        if not self.enabled:
+            return
+
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None and current_stats() is not None:
+            context._instrumentation_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, '_instrumentation_start', None)
+        stats = current_stats()
+        if start is None or stats is None:
+            return
+        stats.record_statement(statement, parameters, executemany, time.perf_counter() - start)
+
+    def _start_request(self):
+        g._request_stats = RequestStats()
+
+    def _finish_request(self, response):
+        stats = current_stats()
+        if stats is None:
+            return response
+        total = time.perf_counter() - stats.started
+        app_seconds = max(total - stats.db_seconds - stats.serialize_seconds, 0.0)
+        response.headers['Server-Timing'] = (
+            f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries", '
+            f'serialize;dur={stats.serialize_seconds * 1000:.1f}, '
+            f'app;dur={app_seconds * 1000:.1f}, '
+            f'total;dur={total * 1000:.1f}'
+        )
+        if total >= self.slow_seconds and random.random() < self.sample_rate:
+            self._log_slow_request(stats, total, response.status_code)
+        return response
+
+    def _log_slow_request(self, stats, total, status):
+        slowest = sorted(stats.statements, key=lambda s: s[0], reverse=True)[:self.max_logged_statements]
+        slow_request_logger.warning(json.dumps({
+            "method": request.method,
+            "path": request.path,
+            "endpoint": request.endpoint,
+            "status": status,
+            "total_ms": round(total * 1000, 1),
+            "db_ms": round(stats.db_seconds * 1000, 1),
+            "serialize_ms": round(stats.serialize_seconds * 1000, 1),
+            "queries": stats.queries,
+            "statements": [
+                {"ms": round(seconds * 1000, 2), "sql": " ".join(statement.split()), "params": params}
+                for seconds, statement, params in slowest
+            ],
+        }, ensure_ascii=False))
@@ -0,0 +1,107 @@
+"""
+Métricas en formato Prometheus.
+
+Con gunicorn cada worker es un proceso distinto: si PROMETHEUS_MULTIPROC_DIR está
+definida (entrypoint.sh), prometheus_client escribe los valores de cada proceso
+en ese directorio y `/metrics` los agrega todos, sin importar qué worker atienda
+el scrape. Los gauges usan el modo `livesum` (suma de los procesos vivos) y
+gunicorn.conf.py descarta los archivos de los workers que terminan. Sin la
+variable (desarrollo, pruebas) se usa el registro en memoria del proceso.
+
+Métricas:
+- http_request_duration_seconds{blueprint, endpoint, method}: histograma de latencia
+- http_requests_in_flight{blueprint}: peticiones en curso
+- http_responses_total{blueprint, endpoint, method, status}
+- db_pool_*: conexiones en uso, overflow, tamaño, espera de checkout y timeouts
+- pedidos_opened_total, compromisos_created_total, compromisos_fulfilled_total
+"""
+import os
+import time
+
+from flask import g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+from .db_pool import WAIT_BUCKETS, pool_metrics
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', "Latencia de las peticiones HTTP.",
+    ['blueprint', 'endpoint', 'method'], buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight', "Peticiones HTTP en curso.", ['blueprint'], multiprocess_mode='livesum',
+)
+RESPONSES = Counter(
+    'http_responses_total', "Respuestas HTTP por código de estado.", ['blueprint', 'endpoint', 'method', 'status'],
+)
+
+DB_POOL_SIZE = Gauge('db_pool_size', "Conexiones base de los pools.", multiprocess_mode='livesum')
+DB_POOL_CHECKED_OUT = Gauge('db_pool_checked_out', "Conexiones en uso.", multiprocess_mode='livesum')
+DB_POOL_OVERFLOW = Gauge('db_pool_overflow', "Conexiones de overflow abiertas.", multiprocess_mode='livesum')
+DB_POOL_WAIT = Histogram(
+    'db_pool_checkout_wait_seconds', "Espera para obtener una conexión del pool.",
+    buckets=[bound for bound in WAIT_BUCKETS if bound != float('inf')],
+)
+DB_POOL_TIMEOUTS = Counter('db_pool_checkout_timeouts_total', "Checkouts que agotaron DB_POOL_TIMEOUT.")
+
+PEDIDOS_OPENED = Counter('pedidos_opened_total', "Pedidos de colaboración creados.")
+COMPROMISOS_CREATED = Counter('compromisos_created_total', "Compromisos creados.")
+COMPROMISOS_FULFILLED = Counter('compromisos_fulfilled_total', "Compromisos marcados como cumplidos.")
+
+
+def _labels():
+    return request.blueprint or 'none', request.endpoint or 'none', request.method
+
+
+def _start_request():
+    g._metrics_started = time.perf_counter()
+    REQUESTS_IN_FLIGHT.labels(request.blueprint or 'none').inc()
+
+
+def _finish_request(response):
+    started = g.pop('_metrics_started', None)
+    if started is None:
+        return response
+    blueprint, endpoint, method = _labels()
+    REQUESTS_IN_FLIGHT.labels(blueprint).dec()
+    REQUEST_LATENCY.labels(blueprint, endpoint, method).observe(time.perf_counter() - started)
+    RESPONSES.labels(blueprint, endpoint, method, str(response.status_code)).inc()
+    return response
+
+
+def _watch_pool(engine):
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return
+    DB_POOL_SIZE.set(pool.size())
+
+    def update_gauges(*args):
+        DB_POOL_CHECKED_OUT.set(pool.checkedout())
+        DB_POOL_OVERFLOW.set(pool.overflow())
+
+    event.listen(engine, 'checkout', update_gauges)
+    event.listen(engine, 'checkin', update_gauges)
+    pool_metrics.wait_observers.append(DB_POOL_WAIT.observe)
+    pool_metrics.timeout_observers.append(DB_POOL_TIMEOUTS.inc)
+
+
+def init_metrics(app, engine):
+    """Registra la medición de peticiones y del pool de conexiones."""
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    _watch_pool(engine)
+
+
+def metrics_response():
+    """(cuerpo, content type) de la exposición en formato texto de Prometheus."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -3,4 +3,8 @@ from .project import ProjectDefinition
 from .workplan import WorkPlan
 from .coverage import CoveragePlan
 from .pedido_colaboración import PedidoColaboracion
-from .compromiso import Compromiso
\ No newline at end of file
+from .compromiso import Compromiso
+from .revoked_token import RevokedToken
+from .pedido_event import PedidoEvent
+from .tombstone import Tombstone
+from .facet_count import FacetCount
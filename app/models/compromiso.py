@@ -1,16 +1,23 @@
 from app import db
+from datetime import datetime
 
 class Compromiso(db.Model):
     __tablename__ = "compromisos"
 
     id = db.Column(db.Integer, primary_key=True)
     
-    pedido_id = db.Column(db.Integer, db.ForeignKey("pedidos_colaboracion.id"), nullable=False)
-    ong_id = db.Column(db.Integer, db.ForeignKey("ongs.id"), nullable=False) # La ONG que ayuda
+    pedido_id = db.Column(db.Integer, db.ForeignKey("pedidos_colaboracion.id"), nullable=False, index=True)
+    ong_id = db.Column(db.Integer, db.ForeignKey("ongs.id"), nullable=False, index=True) # La ONG que ayuda
     
     details = db.Column(db.Text) # "Yo puedo cubrir 500 USD"
     amount_committed = db.Column(db.Float, default=0)
     status = db.Column(db.String(50), default='pending') # 'pending', 'fulfilled'
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, nullable=False)
 
     pedido = db.relationship("PedidoColaboracion", back_populates="compromisos")
-    compromiso_ong = db.relationship("ONG", back_populates="compromisos")
\ No newline at end of file
+    compromiso_ong = db.relationship("ONG", back_populates="compromisos")
+
+    __table_args__ = (
+        # Cambios desde un token de sincronización (keyset sobre updated_at, id)
+        db.Index("ix_compromisos_updated_at_id", "updated_at", "id"),
+    )
\ No newline at end of file
@@ -1,13 +1,14 @@
 from app import db 
 from datetime import datetime
+from .types import StringArray
 
 class CoveragePlan(db.Model):
     __tablename__ = "coverage_plans"
 
     id = db.Column(db.Integer, primary_key=True)
-    project_id = db.Column(db.Integer, db.ForeignKey("project_definitions.id"), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey("project_definitions.id"), nullable=False, index=True)
     strategy = db.Column(db.Text)
-    organizations = db.Column(db.ARRAY(db.String))
+    organizations = db.Column(StringArray)
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.now)
 
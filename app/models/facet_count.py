@@ -0,0 +1,9 @@
+from app import db
+
+class FacetCount(db.Model):
+    """Conteos precalculados por faceta y valor para GET /api/facets (app/facets.py)."""
+    __tablename__ = "facet_counts"
+
+    facet = db.Column(db.String(30), primary_key=True) # 'country', 'project_type', 'request_type'
+    value = db.Column(db.String(255), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
@@ -1,4 +1,5 @@
 from app import db
+from datetime import datetime
 
 class PedidoColaboracion(db.Model):
     __tablename__ = "pedidos_colaboracion"
@@ -9,7 +10,21 @@ class PedidoColaboracion(db.Model):
     description = db.Column(db.Text, nullable=False)
     amount_requested = db.Column(db.Float, default=0)
     status = db.Column(db.String(50), default='open') # 'open', 'covered'
+    # Totales mantenidos por app/coverage_totals.py al crear y cumplir compromisos
+    amount_committed_total = db.Column(db.Float, default=0, server_default='0', nullable=False)
+    amount_fulfilled_total = db.Column(db.Float, default=0, server_default='0', nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+    # onupdate también aplica a los UPDATE de Core (totales, cumplidos en lote)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, nullable=False)
 
     compromisos = db.relationship("Compromiso", back_populates="pedido")
-    coverage_plan_id = db.Column(db.Integer, db.ForeignKey("coverage_plans.id"), nullable=False)
-    coverage_plan = db.relationship("CoveragePlan", back_populates="pedidos")
\ No newline at end of file
+    coverage_plan_id = db.Column(db.Integer, db.ForeignKey("coverage_plans.id"), nullable=False, index=True)
+    coverage_plan = db.relationship("CoveragePlan", back_populates="pedidos")
+
+    __table_args__ = (
+        # Listado paginado de pedidos por estado y por tipo (keyset sobre created_at, id)
+        db.Index("ix_pedidos_status_created_at_id", "status", "created_at", "id"),
+        db.Index("ix_pedidos_request_type_status_created_at_id", "request_type", "status", "created_at", "id"),
+        # Cambios desde un token de sincronización (keyset sobre updated_at, id)
+        db.Index("ix_pedidos_updated_at_id", "updated_at", "id"),
+    )
\ No newline at end of file
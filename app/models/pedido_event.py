@@ -0,0 +1,14 @@
+from app import db
+from datetime import datetime
+
+class PedidoEvent(db.Model):
+    """Registro de cambios de pedidos que alimenta GET /api/pedidos/stream (app/pedido_events.py)."""
+    __tablename__ = "pedido_events"
+
+    id = db.Column(db.Integer, primary_key=True) # Orden de los eventos SSE (ver el cursor de Last-Event-ID)
+    pedido_id = db.Column(db.Integer, nullable=False) # Sin FK: la tabla es un registro que se poda
+    event_type = db.Column(db.String(20), nullable=False) # 'created', 'updated', 'covered'
+    # Copias del pedido y su proyecto al momento del evento, para filtrar sin joins
+    country = db.Column(db.String(100))
+    request_type = db.Column(db.String(50))
+    created_at = db.Column(db.DateTime, default=datetime.now, index=True)
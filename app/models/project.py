@@ -1,5 +1,6 @@
 from app import db 
 from datetime import datetime
+from .types import StringArray
 
 class ProjectDefinition(db.Model):
     __tablename__ = "project_definitions"
@@ -10,15 +11,27 @@ class ProjectDefinition(db.Model):
     description = db.Column(db.Text, nullable=False)
     country = db.Column(db.String(100), nullable=False)
     location = db.Column(db.String(255), nullable=False)
-    project_types = db.Column(db.ARRAY(db.String), nullable=True)
+    project_types = db.Column(StringArray, nullable=True)
     budget = db.Column(db.Float, nullable=False)
     duration = db.Column(db.Integer, nullable=False)
     objectives = db.Column(db.Text, nullable=False)
     beneficiaries = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.now)
+    # Fecha del último cambio, para la sincronización incremental (GET /api/sync)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, nullable=False)
 
-    creador_ong_id = db.Column(db.Integer, db.ForeignKey("ongs.id"), nullable=False)
+    creador_ong_id = db.Column(db.Integer, db.ForeignKey("ongs.id"), nullable=False, index=True)
     creador_ong = db.relationship("ONG", back_populates="projects")
 
     coverage_plan = db.relationship("CoveragePlan", back_populates="project", uselist=False)
-    work_plan = db.relationship("WorkPlan", back_populates="project", uselist=False)
\ No newline at end of file
+    work_plan = db.relationship("WorkPlan", back_populates="project", uselist=False)
+
+    __table_args__ = (
+        # Listado paginado de proyectos (keyset sobre created_at, id), general y por país
+        db.Index("ix_project_definitions_created_at_id", "created_at", "id"),
+        db.Index("ix_project_definitions_country_created_at_id", "country", "created_at", "id"),
+        # Filtro por tipos de proyecto con el operador @>
+        db.Index("ix_project_definitions_project_types", "project_types", postgresql_using="gin"),
+        # Cambios desde un token de sincronización (keyset sobre updated_at, id)
+        db.Index("ix_project_definitions_updated_at_id", "updated_at", "id"),
+    )
\ No newline at end of file
@@ -0,0 +1,12 @@
+from app import db
+from datetime import datetime
+
+class RevokedToken(db.Model):
+    __tablename__ = "revoked_tokens"
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), unique=True, nullable=False) # Identificador único del JWT revocado
+    token_type = db.Column(db.String(10), nullable=False) # 'access', 'refresh'
+    ong_id = db.Column(db.Integer, db.ForeignKey("ongs.id"), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False) # Pasada esta fecha el token ya no es válido de todos modos
+    revoked_at = db.Column(db.DateTime, default=datetime.now)
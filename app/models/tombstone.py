@@ -0,0 +1,15 @@
+from app import db
+from datetime import datetime
+
+class Tombstone(db.Model):
+    """Filas borradas de proyectos, pedidos y compromisos, para GET /api/sync (app/sync.py)."""
+    __tablename__ = "tombstones"
+
+    id = db.Column(db.Integer, primary_key=True)
+    resource = db.Column(db.String(20), nullable=False) # 'proyectos', 'pedidos', 'compromisos'
+    row_id = db.Column(db.Integer, nullable=False) # Id de la fila borrada (sin FK: ya no existe)
+    deleted_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_tombstones_deleted_at_id", "deleted_at", "id"),
+    )
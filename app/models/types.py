@@ -0,0 +1,69 @@
+"""
+Tipos de columna portables entre Postgres y SQLite.
+
+`StringArray` es un ARRAY(VARCHAR) nativo en Postgres y un array JSON en el
+resto de los dialectos, de modo que los modelos (y todas las rutas) pueden
+correr sobre SQLite en memoria para pruebas y perfilado sin un servidor de base
+de datos. `StringArray.contains([...])` se traduce a `@>` en Postgres (y puede
+usar el índice GIN) y a una consulta sobre `json_each` en SQLite.
+"""
+from sqlalchemy import JSON, String, TypeDecorator, bindparam
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.types import Boolean
+
+
+class ArrayContains(ColumnElement):
+    """Expresión booleana: la columna contiene todos los valores indicados."""
+    inherit_cache = False
+    type = Boolean()
+
+    def __init__(self, column, values):
+        self.column = column
+        self.values = list(values)
+
+    @property
+    def _from_objects(self):
+        return self.column._from_objects
+
+    def get_children(self, **kw):
+        return (self.column,)
+
+
+@compiles(ArrayContains)
+def _compile_array_contains(element, compiler, **kw):
+    # Fallback para columnas JSON: cada valor buscado aparece en el array guardado
+    column = compiler.process(element.column, **kw)
+    checks = [
+        f"EXISTS (SELECT 1 FROM json_each({column}) WHERE json_each.value = "
+        f"{compiler.process(_literal(value), **kw)})"
+        for value in element.values
+    ]
+    return '(' + ' AND '.join(checks) + ')' if checks else '1 = 1'
+
+
+@compiles(ArrayContains, 'postgresql')
+def _compile_array_contains_pg(element, compiler, **kw):
+    column = compiler.process(element.column, **kw)
+    values = compiler.process(_literal(element.values, postgresql.ARRAY(String)), **kw)
+    return f"{column} @> {values}"
+
+
+def _literal(value, type_=None):
+    return bindparam(None, value, type_=type_ or String(), unique=True)
+
+
+class StringArray(TypeDecorator):
+    """Lista de strings: ARRAY nativo en Postgres, JSON en los demás dialectos."""
+    impl = JSON
+    cache_ok = True
+
+    class comparator_factory(TypeDecorator.Comparator):
+        def contains(self, other, **kwargs):
+            return ArrayContains(self.expr, other)
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(postgresql.ARRAY(String))
+        return dialect.type_descriptor(JSON())
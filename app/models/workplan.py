@@ -5,7 +5,7 @@ class WorkPlan(db.Model):
     __tablename__ = "work_plans"
 
     id = db.Column(db.Integer, primary_key=True)
-    project_id = db.Column(db.Integer, db.ForeignKey("project_definitions.id"), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey("project_definitions.id"), nullable=False, index=True)
     stages = db.Column(db.JSON, nullable=False)  # [{name, start, end, activities, resources}]
     monitoring_plan = db.Column(db.Text)
     risk_analysis = db.Column(db.Text)
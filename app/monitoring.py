@@ -0,0 +1,78 @@
+"""
+Endpoints de monitoreo: `/monitoring/pool` y `/metrics`.
+
+Exponen nombres de rutas, volumen de tráfico y el estado de la base, así que no
+son públicos: se habilitan configurando MONITORING_TOKEN y cada petición debe
+enviarlo en `Authorization: Bearer <token>` (en Prometheus, `authorization` o
+`bearer_token` del scrape config). Sin MONITORING_TOKEN responden 404.
+"""
+import hmac
+from functools import wraps
+
+from flask import Blueprint, Response, current_app, jsonify, request
+from . import db
+
+from .db_pool import pool_stats
+from .metrics import metrics_response
+
+monitoring = Blueprint('monitoring', __name__)
+
+
+def monitoring_token_required(view):
+    """Exige el token de MONITORING_TOKEN; sin token configurado el endpoint no existe."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = current_app.config['MONITORING_TOKEN']
+        if not token:
+            return jsonify({"msg": "Not Found"}), 404
+        sent = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if not hmac.compare_digest(sent.encode(), token.encode()):
+            return jsonify({"msg": "Token de monitoreo inválido"}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@monitoring.route('/pool', methods=['GET'])
+@monitoring_token_required
+def get_pool_stats():
+    """
+    Estado del pool de conexiones a la base de datos del worker que atiende la petición.
+    ---
+    tags:
+      - Monitoreo
+    security:
+      - bearerAuth: []
+    responses:
+      200:
+        description: Conexiones en uso, overflow, timeouts e histograma de espera de checkout.
+      401:
+        description: Falta el token de monitoreo o no coincide con MONITORING_TOKEN.
+      404:
+        description: Monitoreo deshabilitado (MONITORING_TOKEN no configurado).
+    """
+    return jsonify(pool_stats(db.engine))
+
+
+@monitoring_token_required
+def get_metrics():
+    """
+    Métricas de todos los workers en el formato de texto de Prometheus. Se expone
+    en `/metrics`, fuera del prefijo del blueprint, que es donde Prometheus las
+    busca por defecto.
+    ---
+    tags:
+      - Monitoreo
+    security:
+      - bearerAuth: []
+    produces:
+      - text/plain
+    responses:
+      200:
+        description: Latencia por ruta, peticiones en curso, códigos de estado, pool de conexiones y contadores de negocio.
+      401:
+        description: Falta el token de monitoreo o no coincide con MONITORING_TOKEN.
+      404:
+        description: Monitoreo deshabilitado (MONITORING_TOKEN no configurado).
+    """
+    body, content_type = metrics_response()
+    return Response(body, content_type=content_type)
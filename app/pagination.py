@@ -0,0 +1,101 @@
+"""
+Paginación por cursor (keyset) para los listados del blueprint `api`.
+
+Los listados se ordenan por (created_at, id) descendente y el cursor es un token
+opaco que codifica la última fila entregada. Cada página se resuelve con un
+recorrido de índice acotado a `limit` filas, sin OFFSET, por lo que el costo no
+crece con la posición de la página ni con el tamaño de la tabla.
+"""
+import base64
+import json
+from datetime import datetime
+from urllib.parse import urlencode
+
+from flask import current_app, jsonify, request
+from sqlalchemy import tuple_
+
+
+class InvalidPageRequest(ValueError):
+    """El cursor o el límite recibidos no son válidos."""
+
+
+def encode_token(values):
+    """Codifica una lista de valores JSON como token opaco para la URL."""
+    payload = json.dumps(values)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_token(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError:
+        raise InvalidPageRequest("Cursor inválido")
+
+
+def encode_cursor(created_at, row_id):
+    return encode_token([created_at.isoformat() if created_at else None, row_id])
+
+
+def decode_cursor(token):
+    try:
+        created_at, row_id = decode_token(token)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise InvalidPageRequest("Cursor inválido")
+
+
+def parse_page_args(args, decode=decode_cursor, cursor_arg='cursor'):
+    """Lee el cursor (`cursor_arg`) y `limit` de los query params aplicando los topes de la configuración."""
+    default_limit = current_app.config['API_PAGE_SIZE']
+    max_limit = current_app.config['API_MAX_PAGE_SIZE']
+
+    try:
+        limit = int(args.get('limit', default_limit))
+    except ValueError:
+        raise InvalidPageRequest("El parámetro 'limit' debe ser un entero")
+    if limit < 1:
+        raise InvalidPageRequest("El parámetro 'limit' debe ser mayor a 0")
+
+    cursor = args.get(cursor_arg)
+    return (decode(cursor) if cursor else None), min(limit, max_limit)
+
+
+def keyset(query, created_col, id_col, cursor):
+    """Aplica el orden del listado y, si hay cursor, la condición de keyset."""
+    if cursor is not None:
+        query = query.where(tuple_(created_col, id_col) < tuple_(*cursor))
+    return query.order_by(created_col.desc(), id_col.desc())
+
+
+def paginate(query, created_col, id_col, cursor, limit):
+    """
+    Aplica orden, condición de keyset y límite a la consulta.
+    Se pide una fila de más para saber si existe una página siguiente.
+    """
+    return keyset(query, created_col, id_col, cursor).limit(limit + 1)
+
+
+def page_response(rows, limit, cursor_for=None):
+    """
+    Devuelve la página como un array JSON (igual que antes de paginar) y anuncia la
+    página siguiente en las cabeceras `X-Next-Cursor` y `Link`. `cursor_for` arma
+    el cursor a partir de la última fila; por defecto usa (created_at, id).
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    response = jsonify(rows)
+
+    if has_more:
+        last = rows[-1]
+        if cursor_for is None:
+            next_cursor = encode_cursor(last['created_at'], last['id'])
+        else:
+            next_cursor = cursor_for(last)
+        args = request.args.to_dict()
+        args['cursor'] = next_cursor
+        args['limit'] = limit
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+
+    return response
@@ -0,0 +1,123 @@
+"""
+Hash y verificación de contraseñas fuera del hilo de la petición.
+
+PBKDF2 es deliberadamente caro: una ráfaga de logins ocupa todo el CPU de los
+workers y las consultas baratas quedan esperando detrás. Acá el cálculo se
+ejecuta en un pool de procesos acotado (PASSWORD_POOL_WORKERS por worker de
+gunicorn) y la cantidad de operaciones en curso o en cola está limitada por
+PASSWORD_POOL_MAX_PENDING: si se supera, la petición se rechaza de inmediato con
+503 en lugar de encolarse y degradar al resto.
+
+El costo del hash se configura con PASSWORD_HASH_METHOD (formato de werkzeug,
+p. ej. 'pbkdf2:sha256:1000000'). Los hashes guardados con un costo menor al
+configurado se regeneran en el siguiente login exitoso, así que subir el costo no
+necesita una migración. Un hash más fuerte que el configurado nunca se reescribe:
+bajar PASSWORD_HASH_METHOD no debilita las contraseñas ya guardadas.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+
+def canonical_method(method):
+    """
+    Completa los parámetros que werkzeug agrega por defecto, para comparar el
+    método configurado con el prefijo que queda guardado en cada hash.
+    """
+    parts = method.split(':')
+    if parts[0] == 'pbkdf2' and len(parts) < 3:
+        digest = parts[1] if len(parts) > 1 else 'sha256'
+        return f"pbkdf2:{digest}:{DEFAULT_PBKDF2_ITERATIONS}"
+    if parts[0] == 'scrypt' and len(parts) == 1:
+        return 'scrypt:32768:8:1'
+    return method
+
+
+def hash_cost(method):
+    """(esquema, parámetros de costo) de un método de werkzeug; None si no se reconoce."""
+    parts = canonical_method(method).split(':')
+    try:
+        if parts[0] == 'pbkdf2' and len(parts) == 3:
+            return f"pbkdf2:{parts[1]}", (int(parts[2]),)
+        if parts[0] == 'scrypt' and len(parts) == 4:
+            return 'scrypt', tuple(int(part) for part in parts[1:])
+    except ValueError:
+        pass
+    return None
+
+
+class PasswordPoolBusy(Exception):
+    """El pool de hashing está saturado o no respondió a tiempo."""
+
+
+class PasswordHasher:
+    """Extensión de Flask que ejecuta el hashing de contraseñas en un pool de procesos."""
+
+    def __init__(self, app=None):
+        self.method = None
+        self.workers = 0
+        self.timeout = None
+        self._slots = None
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.method = canonical_method(app.config['PASSWORD_HASH_METHOD'])
+        self.workers = app.config['PASSWORD_POOL_WORKERS']
+        self.timeout = app.config['PASSWORD_POOL_TIMEOUT']
+        self._slots = threading.BoundedSemaphore(app.config['PASSWORD_POOL_MAX_PENDING'])
+        app.extensions['password_hasher'] = self
+
+    def _get_executor(self):
+        # El pool se crea perezosamente en cada worker: un pool creado antes del
+        # fork de gunicorn quedaría compartido (y roto) entre procesos.
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordPoolBusy("Demasiados inicios de sesión en curso")
+        # Con PASSWORD_POOL_WORKERS=0 se calcula en el mismo proceso (desarrollo y pruebas)
+        if not self.workers:
+            try:
+                return func(*args)
+            finally:
+                self._slots.release()
+        try:
+            future = self._get_executor().submit(func, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        # El lugar se libera cuando el cálculo termina: tras un timeout la tarea
+        # sigue ocupando un proceso del pool y debe seguir contando como pendiente
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise PasswordPoolBusy("El cálculo del hash excedió el tiempo máximo")
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """
+        Indica si el hash guardado es más débil que el método configurado: mismo
+        esquema, algún parámetro de costo menor y ninguno mayor. Con esquemas
+        distintos o costos que no se pueden comparar el hash se conserva.
+        """
+        stored, configured = hash_cost(pwhash.split('$', 1)[0]), hash_cost(self.method)
+        if stored is None or configured is None or stored[0] != configured[0]:
+            return False
+        return stored[1] != configured[1] and all(s <= c for s, c in zip(stored[1], configured[1]))
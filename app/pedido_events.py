@@ -0,0 +1,262 @@
+"""
+Eventos de pedidos para GET /api/pedidos/stream (Server-Sent Events).
+
+Cada cambio de un pedido (creado, comprometido, cubierto, cumplido) agrega una
+fila a `pedido_events` en la misma transacción que el cambio, así un evento
+existe si y solo si el cambio se confirmó.
+
+Los ids salen de una secuencia al insertar, pero las transacciones confirman en
+otro orden: un evento con id menor puede hacerse visible después de que el
+stream ya entregó ids mayores. Por eso el stream no avanza un simple "último id":
+relee los eventos posteriores al último id asentado (todos los eventos con ese id
+o menor ya se entregaron y ninguno puede aparecer después, porque son más viejos
+que SSE_OVERLAP_SECONDS) y descarta los ids que ya entregó. El id SSE de cada
+evento codifica ambas cosas ('120:121,125'), así un cliente que se reconecta con
+`Last-Event-ID` recibe exactamente los eventos que se perdió.
+
+Los streams abiertos no consultan la tabla en un bucle: esperan en un broker en
+memoria (`EventBroker`) que se despierta
+  * al confirmarse una transacción que registró eventos en este proceso, y
+  * en Postgres, con NOTIFY: un hilo por worker escucha el canal con LISTEN y
+    despierta al broker cuando otro worker confirma eventos.
+Si no llega ninguna notificación (por ejemplo detrás de pgbouncer en modo
+transacción, donde LISTEN no funciona), cada stream vuelve a consultar cada
+SSE_HEARTBEAT_SECONDS, así que el peor caso es una demora, no un evento perdido.
+
+Cada stream dura como mucho SSE_MAX_SECONDS; el cliente se reconecta solo con
+`Last-Event-ID`. Mientras tanto ocupa un hilo del worker: con workers `sync` de un
+solo hilo cada cliente bloquearía un worker entero, así que en ese caso el
+endpoint responde 503 (SSE_ENABLED). Requiere GUNICORN_WORKER_CLASS=gthread o
+gevent, o GUNICORN_THREADS mayor a 1.
+"""
+import logging
+import os
+import select as select_module
+import threading
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import DateTime, case, delete, event, func, insert, literal, select
+from . import db
+
+from .models import PedidoColaboracion, CoveragePlan, ProjectDefinition, PedidoEvent
+from .queries import fetch_all, pedido_events_query
+
+NOTIFY_CHANNEL = 'pedido_events'
+LISTEN_RECONNECT_SECONDS = 5
+
+logger = logging.getLogger(__name__)
+
+
+class EventBroker:
+    """Despierta a los streams de este proceso cuando hay eventos nuevos."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._sequence = 0
+
+    @property
+    def sequence(self):
+        return self._sequence
+
+    def notify(self):
+        with self._condition:
+            self._sequence += 1
+            self._condition.notify_all()
+
+    def wait(self, sequence, timeout):
+        """
+        Espera una notificación posterior a `sequence` (leída antes de consultar la
+        tabla, así no se pierde una que llegue entre la consulta y la espera).
+        Devuelve la secuencia actual; igual a `sequence` si venció el timeout.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._sequence != sequence, timeout)
+            return self._sequence
+
+
+broker = EventBroker()
+
+
+def record_pedido_events(pedido_ids, event_type=None):
+    """
+    Registra un evento por pedido en la transacción en curso. Sin `event_type`
+    el tipo sale del estado del pedido ya actualizado: 'covered' o 'updated'.
+    """
+    if not pedido_ids:
+        return
+    kind = literal(event_type) if event_type else case(
+        (PedidoColaboracion.status == 'covered', 'covered'), else_='updated'
+    )
+    source = (
+        select(
+            PedidoColaboracion.id, kind, ProjectDefinition.country,
+            PedidoColaboracion.request_type, literal(datetime.now(), DateTime),
+        )
+        .join(PedidoColaboracion.coverage_plan)
+        .join(CoveragePlan.project)
+        .where(PedidoColaboracion.id.in_(pedido_ids))
+        .order_by(PedidoColaboracion.id)
+    )
+    db.session.execute(
+        insert(PedidoEvent).from_select(
+            ['pedido_id', 'event_type', 'country', 'request_type', 'created_at'], source
+        )
+    )
+    if db.engine.dialect.name == 'postgresql':
+        # Se entrega a los demás workers recién cuando la transacción se confirma
+        db.session.execute(select(func.pg_notify(NOTIFY_CHANNEL, '')))
+    db.session.info['pedido_events_pending'] = True
+
+
+@event.listens_for(db.session, 'after_commit')
+def _notify_after_commit(session):
+    if session.info.pop('pedido_events_pending', False):
+        broker.notify()
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('pedido_events_pending', None)
+
+
+_listener_lock = threading.Lock()
+_listener_pid = None
+
+
+def _listen_forever(engine):
+    """Escucha NOTIFY con una conexión propia (fuera del pool) y despierta al broker."""
+    while True:
+        raw = None
+        try:
+            raw = engine.raw_connection()
+            raw.detach()
+            connection = raw.driver_connection
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f'LISTEN {NOTIFY_CHANNEL}')
+            # Lo confirmado mientras no se escuchaba se recupera consultando la tabla
+            broker.notify()
+            while True:
+                readable, _, _ = select_module.select([connection], [], [], 60)
+                if readable:
+                    connection.poll()
+                    if connection.notifies:
+                        connection.notifies.clear()
+                        broker.notify()
+        except Exception:
+            logger.exception("Se perdió la conexión de LISTEN %s; reintentando", NOTIFY_CHANNEL)
+            time.sleep(LISTEN_RECONNECT_SECONDS)
+        finally:
+            if raw is not None:
+                raw.close()
+
+
+def ensure_listener():
+    """Arranca (una vez por proceso, después del fork de gunicorn) el hilo de LISTEN."""
+    global _listener_pid
+    engine = db.engine
+    if engine.dialect.name != 'postgresql' or current_app.config['DB_PGBOUNCER_MODE']:
+        return
+    with _listener_lock:
+        if _listener_pid == os.getpid():
+            return
+        threading.Thread(target=_listen_forever, args=(engine,), daemon=True, name='pedido-events-listener').start()
+        _listener_pid = os.getpid()
+
+
+def _settled_before():
+    """Fecha antes de la cual todo evento registrado ya está confirmado (o no existirá)."""
+    return datetime.now() - timedelta(seconds=current_app.config['SSE_OVERLAP_SECONDS'])
+
+
+def format_event_cursor(settled_id, seen):
+    """Id SSE: último id asentado y los ids posteriores ya entregados ('120:121,125')."""
+    if not seen:
+        return str(settled_id)
+    return f"{settled_id}:{','.join(str(event_id) for event_id in sorted(seen))}"
+
+
+def parse_event_cursor(value):
+    """(id asentado, ids ya entregados) de un `Last-Event-ID`; ValueError si es inválido."""
+    settled_id, _, seen = value.partition(':')
+    return int(settled_id), {int(event_id) for event_id in seen.split(',')} if seen else set()
+
+
+def initial_event_cursor(country=None, request_type=None):
+    """
+    Posición de un stream nuevo: no reenvía los eventos ya visibles, pero sí los de
+    ids menores que todavía no se confirmaron.
+    """
+    settled_id = db.session.execute(
+        select(func.coalesce(func.max(PedidoEvent.id), 0)).where(PedidoEvent.created_at < _settled_before())
+    ).scalar()
+    recent = select(PedidoEvent.id).where(PedidoEvent.id > settled_id)
+    if country:
+        recent = recent.where(PedidoEvent.country == country)
+    if request_type:
+        recent = recent.where(PedidoEvent.request_type == request_type)
+    return settled_id, set(db.session.execute(recent).scalars())
+
+
+def generate_event_stream(cursor, country=None, request_type=None):
+    """Genera el cuerpo text/event-stream desde `cursor` (id asentado, ids ya entregados)."""
+    config = current_app.config
+    batch_size = config['SSE_BATCH_SIZE']
+    heartbeat = config['SSE_HEARTBEAT_SECONDS']
+    deadline = time.monotonic() + config['SSE_MAX_SECONDS']
+    dumps = current_app.json.dumps
+    settled_id, seen = cursor
+
+    yield f"retry: {config['SSE_RETRY_MS']}\n\n"
+    while True:
+        sequence = broker.sequence
+        settled = _settled_before()
+        rows = fetch_all(pedido_events_query(settled_id, country, request_type, batch_size))
+        # La conexión vuelve al pool mientras el stream espera
+        db.session.close()
+        progressed = False
+        settling = True
+        for row in rows:
+            event_id = row.pop('event_id')
+            event_type = row.pop('event_type')
+            deliver = event_id not in seen
+            # El id asentado avanza mientras los eventos leídos sean anteriores al
+            # margen: a partir del primero reciente puede faltar alguno por confirmar
+            settling = settling and row.pop('event_created_at') < settled
+            if settling:
+                settled_id = event_id
+                seen = {seen_id for seen_id in seen if seen_id > settled_id}
+            elif deliver:
+                seen.add(event_id)
+            progressed = progressed or settling or deliver
+            if not deliver:
+                continue
+            yield f"id: {format_event_cursor(settled_id, seen)}\nevent: {event_type}\ndata: {dumps(row)}\n\n"
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        if len(rows) == batch_size and progressed:
+            continue
+        if broker.wait(sequence, min(heartbeat, remaining)) == sequence:
+            yield ": keepalive\n\n"
+
+
+@click.command('prune-pedido-events')
+@click.option('--days', default=7, show_default=True, help="Antigüedad a partir de la cual se borran los eventos.")
+@with_appcontext
+def prune_pedido_events_command(days):
+    """Borra los eventos de pedidos viejos; un cliente desconectado más tiempo debe releer GET /api/pedidos."""
+    try:
+        result = db.session.execute(
+            delete(PedidoEvent).where(PedidoEvent.created_at < datetime.now() - timedelta(days=days))
+        )
+        db.session.commit()
+        print(f"{result.rowcount} eventos de pedidos borrados.")
+    except Exception as e:
+        db.session.rollback()
+        raise click.ClickException(f"Error al borrar los eventos de pedidos: {e}")
@@ -0,0 +1,432 @@
+"""
+Capa de consultas de lectura del blueprint `api`.
+
+Cada recurso define una proyección (nombre del campo en la respuesta -> columna)
+y una función que arma el SELECT con los joins necesarios, de modo que cada
+endpoint resuelva su respuesta con una cantidad constante de consultas, sin
+importar cuántas filas devuelva (evita las cargas perezosas N+1).
+
+Con `?fields=` el cliente pide un subconjunto de la proyección (`select_fields`):
+solo esas columnas se leen de la base y los joins que solo aportaban columnas no
+pedidas se omiten.
+"""
+from sqlalchemy import case, func, or_, select
+from . import db
+
+from .models import (
+    ONG, ProjectDefinition, WorkPlan, CoveragePlan, PedidoColaboracion, Compromiso, PedidoEvent, Tombstone,
+    FacetCount
+)
+
+# Estados válidos de un pedido para filtrar los listados
+PEDIDO_STATUSES = ('open', 'covered')
+
+# Campos de GET /api/pedidos
+PEDIDO_LIST_FIELDS = {
+    "id": PedidoColaboracion.id,
+    "request_type": PedidoColaboracion.request_type,
+    "description": PedidoColaboracion.description,
+    "amount_requested": PedidoColaboracion.amount_requested,
+    "amount_committed_total": PedidoColaboracion.amount_committed_total,
+    "amount_fulfilled_total": PedidoColaboracion.amount_fulfilled_total,
+    "status": PedidoColaboracion.status,
+    "created_at": PedidoColaboracion.created_at,
+    "project_name": ProjectDefinition.project_name,
+    "project_country": ProjectDefinition.country,
+    "creador_ong_name": ONG.name,
+}
+
+# Campos de GET /api/proyectos
+PROJECT_FIELDS = {
+    "id": ProjectDefinition.id,
+    "project_name": ProjectDefinition.project_name,
+    "ong_name": ProjectDefinition.ong_name,
+    "description": ProjectDefinition.description,
+    "country": ProjectDefinition.country,
+    "created_at": ProjectDefinition.created_at,
+}
+
+# Campos de GET /api/proyectos/<id>
+PROJECT_DETAIL_FIELDS = {
+    **PROJECT_FIELDS,
+    "location": ProjectDefinition.location,
+    "project_types": ProjectDefinition.project_types,
+    "budget": ProjectDefinition.budget,
+    "duration": ProjectDefinition.duration,
+    "objectives": ProjectDefinition.objectives,
+    "beneficiaries": ProjectDefinition.beneficiaries,
+    "creador_ong_id": ProjectDefinition.creador_ong_id,
+    "updated_at": ProjectDefinition.updated_at,
+}
+
+# Planes (uno a uno) que GET /api/proyectos/<id> incluye con `?include=`:
+# nombre -> (relación desde el proyecto, proyección)
+PROJECT_PLANS = {
+    "work_plan": (ProjectDefinition.work_plan, {
+        "id": WorkPlan.id,
+        "stages": WorkPlan.stages,
+        "monitoring_plan": WorkPlan.monitoring_plan,
+        "risk_analysis": WorkPlan.risk_analysis,
+        "success_indicators": WorkPlan.success_indicators,
+        "terms_accepted": WorkPlan.terms_accepted,
+        "created_at": WorkPlan.created_at,
+    }),
+    "coverage_plan": (ProjectDefinition.coverage_plan, {
+        "id": CoveragePlan.id,
+        "strategy": CoveragePlan.strategy,
+        "organizations": CoveragePlan.organizations,
+        "notes": CoveragePlan.notes,
+        "created_at": CoveragePlan.created_at,
+    }),
+}
+
+# Campos de GET /api/proyectos/<id>/pedidos
+PROJECT_PEDIDO_FIELDS = {
+    "id": PedidoColaboracion.id,
+    "request_type": PedidoColaboracion.request_type,
+    "description": PedidoColaboracion.description,
+    "amount_requested": PedidoColaboracion.amount_requested,
+    "amount_committed_total": PedidoColaboracion.amount_committed_total,
+    "amount_fulfilled_total": PedidoColaboracion.amount_fulfilled_total,
+    "status": PedidoColaboracion.status,
+}
+
+# Campos de GET /api/proyectos/<id>/compromisos
+PROJECT_COMPROMISO_FIELDS = {
+    "compromiso_id": Compromiso.id,
+    "compromiso_status": Compromiso.status,
+    "details": Compromiso.details,
+    "amount_committed": Compromiso.amount_committed,
+    "pedido_id": PedidoColaboracion.id,
+    "pedido_description": PedidoColaboracion.description,
+    "compromiso_ong_name": ONG.name,
+}
+
+# Campos de GET /api/sync: filas sin datos de otras tablas (salvo el id del proyecto
+# de cada pedido), así un cambio en una tabla no deja copias viejas en el cliente
+SYNC_PROJECT_FIELDS = {
+    **PROJECT_FIELDS,
+    "creador_ong_id": ProjectDefinition.creador_ong_id,
+    "updated_at": ProjectDefinition.updated_at,
+}
+
+SYNC_PEDIDO_FIELDS = {
+    **PROJECT_PEDIDO_FIELDS,
+    "project_id": CoveragePlan.project_id,
+    "created_at": PedidoColaboracion.created_at,
+    "updated_at": PedidoColaboracion.updated_at,
+}
+
+SYNC_COMPROMISO_FIELDS = {
+    "id": Compromiso.id,
+    "pedido_id": Compromiso.pedido_id,
+    "ong_id": Compromiso.ong_id,
+    "details": Compromiso.details,
+    "amount_committed": Compromiso.amount_committed,
+    "status": Compromiso.status,
+    "updated_at": Compromiso.updated_at,
+}
+
+
+class InvalidFieldsRequest(ValueError):
+    """El parámetro `fields` pide campos que el recurso no tiene."""
+
+
+def select_fields(fields, requested, required=()):
+    """
+    Proyección reducida a los campos pedidos con `?fields=` (toda si no se pidió
+    ninguno). Los campos `required`, por ejemplo los que arman el cursor de la
+    paginación, se incluyen siempre.
+    """
+    if not requested:
+        return fields
+    unknown = [name for name in requested if name not in fields]
+    if unknown:
+        raise InvalidFieldsRequest(
+            f"Campos desconocidos: {', '.join(unknown)}. Disponibles: {', '.join(fields)}"
+        )
+    return {name: column for name, column in fields.items() if name in requested or name in required}
+
+
+def uses_model(fields, *models):
+    """True si alguna columna de la proyección pertenece a alguno de los modelos."""
+    return any(column.class_ in models for column in fields.values())
+
+
+def project_columns(fields):
+    """Convierte una proyección en la lista de columnas etiquetadas para el SELECT."""
+    return [column.label(name) for name, column in fields.items()]
+
+
+def fetch_all(query):
+    """Ejecuta la consulta y devuelve cada fila como un dict listo para serializar."""
+    return [dict(row) for row in db.session.execute(query).mappings()]
+
+
+def filter_project_types(query, project_types):
+    """Restringe a proyectos que incluyan todos los tipos pedidos (operador @> en Postgres)."""
+    if project_types:
+        query = query.where(ProjectDefinition.project_types.contains(project_types))
+    return query
+
+
+def pedidos_list_query(status='open', country=None, request_type=None, project_types=None,
+                       fields=PEDIDO_LIST_FIELDS):
+    """
+    Pedidos en el estado indicado (None: todos), junto con su proyecto y la ONG
+    creadora (solo si la proyección o los filtros los usan). El orden y el límite
+    los aplica la paginación.
+    """
+    query = select(*project_columns(fields)).select_from(PedidoColaboracion)
+    if status is not None:
+        query = query.where(PedidoColaboracion.status == status)
+    if country or project_types or uses_model(fields, ProjectDefinition, ONG):
+        query = query.join(PedidoColaboracion.coverage_plan).join(CoveragePlan.project)
+    if uses_model(fields, ONG):
+        query = query.join(ProjectDefinition.creador_ong)
+    if country:
+        query = query.where(ProjectDefinition.country == country)
+    if request_type:
+        query = query.where(PedidoColaboracion.request_type == request_type)
+    return filter_project_types(query, project_types)
+
+
+def projects_query(country=None, project_types=None, fields=PROJECT_FIELDS):
+    """Proyectos filtrados por país y tipos. El orden y el límite los aplica la paginación."""
+    query = select(*project_columns(fields))
+    if country:
+        query = query.where(ProjectDefinition.country == country)
+    return filter_project_types(query, project_types)
+
+
+def fetch_by_ids(query, id_col, ids):
+    """
+    Filas de `query` con los ids pedidos, resueltas con un solo IN y devueltas en
+    el orden de `ids`. Devuelve (filas, ids que no existen).
+    """
+    found = {row['id']: row for row in fetch_all(query.where(id_col.in_(ids)))}
+    return [found[i] for i in ids if i in found], [i for i in ids if i not in found]
+
+
+def project_owner_id(project_id):
+    """
+    Devuelve el id de la ONG creadora del proyecto, o None si el proyecto no existe.
+    Permite validar existencia y permisos sin cargar la entidad completa.
+    """
+    return db.session.execute(
+        select(ProjectDefinition.creador_ong_id).where(ProjectDefinition.id == project_id)
+    ).scalar_one_or_none()
+
+
+def project_detail(project_id, fields=PROJECT_DETAIL_FIELDS, plans=()):
+    """
+    Un proyecto con los planes indicados en `plans`, en una sola consulta con
+    LEFT JOIN (son uno a uno). Devuelve (dict del proyecto con cada plan anidado,
+    id de la ONG dueña), o None si el proyecto no existe.
+    """
+    columns = project_columns(fields) + [ProjectDefinition.creador_ong_id.label('_owner_id')]
+    query = select().select_from(ProjectDefinition).where(ProjectDefinition.id == project_id)
+    for plan in plans:
+        relationship, plan_fields = PROJECT_PLANS[plan]
+        columns += [column.label(f"{plan}.{name}") for name, column in plan_fields.items()]
+        query = query.outerjoin(relationship)
+
+    row = db.session.execute(query.add_columns(*columns)).mappings().first()
+    if row is None:
+        return None
+    project = {name: row[name] for name in fields}
+    for plan in plans:
+        values = {name: row[f"{plan}.{name}"] for name in PROJECT_PLANS[plan][1]}
+        project[plan] = values if values["id"] is not None else None
+    return project, row['_owner_id']
+
+
+def project_pedidos_query(project_id, fields=PROJECT_PEDIDO_FIELDS):
+    """Todos los pedidos (abiertos y cubiertos) del plan de cobertura de un proyecto."""
+    return (
+        select(*project_columns(fields))
+        .select_from(PedidoColaboracion)
+        .join(PedidoColaboracion.coverage_plan)
+        .where(CoveragePlan.project_id == project_id)
+        .order_by(PedidoColaboracion.id)
+    )
+
+
+def project_compromisos_query(project_id, fields=PROJECT_COMPROMISO_FIELDS):
+    """
+    Todos los compromisos de los pedidos de un proyecto, con el nombre de la ONG
+    que ayuda (el join a `ongs` solo si se pidió ese campo).
+    """
+    query = (
+        select(*project_columns(fields))
+        .select_from(Compromiso)
+        .join(Compromiso.pedido)
+        .join(PedidoColaboracion.coverage_plan)
+        .where(CoveragePlan.project_id == project_id)
+        .order_by(PedidoColaboracion.id, Compromiso.id)
+    )
+    if uses_model(fields, ONG):
+        query = query.join(Compromiso.compromiso_ong)
+    return query
+
+
+def project_summary_query(project_id):
+    """
+    Totales de los pedidos de un proyecto agrupados por (request_type, status), a
+    partir de los totales que mantiene app/coverage_totals.py. Cada fila trae
+    además la cantidad de ONGs distintas con compromisos en el proyecto.
+    """
+    # Lo comprometido por encima de lo pedido no cubre otros pedidos
+    covered = case(
+        (PedidoColaboracion.amount_committed_total > func.coalesce(PedidoColaboracion.amount_requested, 0),
+         func.coalesce(PedidoColaboracion.amount_requested, 0)),
+        else_=PedidoColaboracion.amount_committed_total,
+    )
+    collaborators = (
+        select(func.count(func.distinct(Compromiso.ong_id)))
+        .join(Compromiso.pedido)
+        .join(PedidoColaboracion.coverage_plan)
+        .where(CoveragePlan.project_id == project_id)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            PedidoColaboracion.request_type,
+            PedidoColaboracion.status,
+            func.count().label('pedidos'),
+            func.coalesce(func.sum(PedidoColaboracion.amount_requested), 0).label('amount_requested'),
+            func.sum(PedidoColaboracion.amount_committed_total).label('amount_committed'),
+            func.sum(PedidoColaboracion.amount_fulfilled_total).label('amount_fulfilled'),
+            func.sum(covered).label('amount_covered'),
+            collaborators.label('collaborating_ongs'),
+        )
+        .join(PedidoColaboracion.coverage_plan)
+        .where(CoveragePlan.project_id == project_id)
+        .group_by(PedidoColaboracion.request_type, PedidoColaboracion.status)
+        .order_by(PedidoColaboracion.request_type, PedidoColaboracion.status)
+    )
+
+
+def pedido_context(pedido_id):
+    """Estado del pedido y dueño de su proyecto, en una sola consulta (None si no existe)."""
+    return db.session.execute(
+        select(PedidoColaboracion.status, ProjectDefinition.creador_ong_id)
+        .join(PedidoColaboracion.coverage_plan)
+        .join(CoveragePlan.project)
+        .where(PedidoColaboracion.id == pedido_id)
+    ).first()
+
+
+def project_coverage_context(project_id):
+    """Dueño del proyecto e id de su plan de cobertura (None si el proyecto no existe)."""
+    return db.session.execute(
+        select(ProjectDefinition.creador_ong_id, CoveragePlan.id.label('coverage_plan_id'))
+        .outerjoin(ProjectDefinition.coverage_plan)
+        .where(ProjectDefinition.id == project_id)
+    ).first()
+
+
+def compromiso_context(compromiso_id):
+    """Datos del compromiso y dueño del proyecto al que pertenece (None si no existe)."""
+    return db.session.execute(
+        select(
+            Compromiso.pedido_id, Compromiso.status, Compromiso.amount_committed,
+            ProjectDefinition.creador_ong_id,
+        )
+        .join(Compromiso.pedido)
+        .join(PedidoColaboracion.coverage_plan)
+        .join(CoveragePlan.project)
+        .where(Compromiso.id == compromiso_id)
+    ).first()
+
+
+def pedidos_context(pedido_ids):
+    """Versión en lote de `pedido_context`: {pedido_id: fila} con una sola consulta IN."""
+    rows = db.session.execute(
+        select(
+            PedidoColaboracion.id, PedidoColaboracion.status, PedidoColaboracion.amount_requested,
+            PedidoColaboracion.amount_committed_total, ProjectDefinition.creador_ong_id,
+        )
+        .join(PedidoColaboracion.coverage_plan)
+        .join(CoveragePlan.project)
+        .where(PedidoColaboracion.id.in_(pedido_ids))
+    )
+    return {row.id: row for row in rows}
+
+
+def compromisos_context(compromiso_ids):
+    """Versión en lote de `compromiso_context`: {compromiso_id: fila} con una sola consulta IN."""
+    rows = db.session.execute(
+        select(
+            Compromiso.id, Compromiso.pedido_id, Compromiso.status, Compromiso.amount_committed,
+            ProjectDefinition.creador_ong_id,
+        )
+        .join(Compromiso.pedido)
+        .join(PedidoColaboracion.coverage_plan)
+        .join(CoveragePlan.project)
+        .where(Compromiso.id.in_(compromiso_ids))
+    )
+    return {row.id: row for row in rows}
+
+
+def pedido_events_query(after_id, country=None, request_type=None, limit=None):
+    """
+    Eventos de pedidos posteriores a `after_id`, cada uno con el estado actual del
+    pedido en la proyección de GET /api/pedidos.
+    """
+    query = (
+        select(
+            PedidoEvent.id.label('event_id'), PedidoEvent.event_type.label('event_type'),
+            PedidoEvent.created_at.label('event_created_at'), *project_columns(PEDIDO_LIST_FIELDS),
+        )
+        .join(PedidoColaboracion, PedidoColaboracion.id == PedidoEvent.pedido_id)
+        .join(PedidoColaboracion.coverage_plan)
+        .join(CoveragePlan.project)
+        .join(ProjectDefinition.creador_ong)
+        .where(PedidoEvent.id > after_id)
+        .order_by(PedidoEvent.id)
+        .limit(limit)
+    )
+    if country:
+        query = query.where(PedidoEvent.country == country)
+    if request_type:
+        query = query.where(PedidoEvent.request_type == request_type)
+    return query
+
+
+def sync_projects_query():
+    """Proyectos para GET /api/sync. El orden y el límite los aplica app/sync.py."""
+    return select(*project_columns(SYNC_PROJECT_FIELDS))
+
+
+def sync_pedidos_query():
+    """Pedidos para GET /api/sync, con el id de su proyecto."""
+    return select(*project_columns(SYNC_PEDIDO_FIELDS)).join(PedidoColaboracion.coverage_plan)
+
+
+def sync_compromisos_query(ong_id):
+    """
+    Compromisos visibles para la ONG en GET /api/sync: los que hizo ella y los de
+    pedidos de sus proyectos (los mismos que ve en /api/proyectos/<id>/compromisos).
+    """
+    return (
+        select(*project_columns(SYNC_COMPROMISO_FIELDS))
+        .join(Compromiso.pedido)
+        .join(PedidoColaboracion.coverage_plan)
+        .join(CoveragePlan.project)
+        .where(or_(Compromiso.ong_id == ong_id, ProjectDefinition.creador_ong_id == ong_id))
+    )
+
+
+def tombstones_query():
+    """Filas borradas para GET /api/sync."""
+    return select(Tombstone.id, Tombstone.resource, Tombstone.row_id, Tombstone.deleted_at)
+
+
+def facet_counts_query(facets):
+    """Valores con al menos una fila de las facetas pedidas, de mayor a menor conteo."""
+    return (
+        select(FacetCount.facet, FacetCount.value, FacetCount.count)
+        .where(FacetCount.facet.in_(facets), FacetCount.count > 0)
+        .order_by(FacetCount.facet, FacetCount.count.desc(), FacetCount.value)
+    )
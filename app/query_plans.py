@@ -0,0 +1,183 @@
+"""
+Verificación de planes de ejecución de las consultas calientes.
+
+`flask check-query-plans` recorre los endpoints GET del blueprint `api` y los
+helpers que usan los endpoints de escritura contra la base configurada (poblada,
+por ejemplo, con `flask seed-synthetic`), captura cada sentencia SQL que emiten
+con sus parámetros reales, obtiene su `EXPLAIN (FORMAT JSON)` y falla si algún
+plan recorre secuencialmente una tabla con más de --min-rows filas estimadas.
+
+Con --output los planes quedan guardados en un archivo JSON para compararlos
+entre versiones. La misma verificación corre en `tests/test_query_plans.py`
+cuando se indica una base Postgres poblada en QUERY_PLANS_DATABASE_URL.
+"""
+import json
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, select, text
+from . import db
+
+from .models import ProjectDefinition, CoveragePlan, PedidoColaboracion, Compromiso
+from .queries import pedido_context, project_coverage_context, compromiso_context
+from .sync import STREAM_COUNT, encode_sync_token
+
+
+@contextmanager
+def capture_statements():
+    """Registra (sentencia, parámetros) de todo lo que se ejecute dentro del bloque."""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith('SELECT'):
+            captured.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def _sample_ids():
+    """Un compromiso cualquiera con su pedido, proyecto y dueño, para parametrizar las rutas."""
+    return db.session.execute(
+        select(
+            Compromiso.id.label('compromiso_id'), PedidoColaboracion.id.label('pedido_id'),
+            ProjectDefinition.id.label('project_id'), ProjectDefinition.creador_ong_id,
+            ProjectDefinition.country, PedidoColaboracion.request_type,
+        )
+        .join(Compromiso.pedido)
+        .join(PedidoColaboracion.coverage_plan)
+        .join(CoveragePlan.project)
+        .order_by(Compromiso.id.desc())
+        .limit(1)
+    ).first()
+
+
+def collect_hot_queries(sample):
+    """Ejecuta las rutas y helpers calientes y devuelve {nombre: [(sentencia, parámetros)]}."""
+    token = create_access_token(identity=str(sample.creador_ong_id))
+    headers = {'Authorization': f'Bearer {token}'}
+    # Una sincronización incremental de la última hora: debe recorrer solo los cambios
+    now = datetime.now()
+    since = encode_sync_token(now, [(now - timedelta(hours=1), 0)] * STREAM_COUNT)
+    routes = {
+        'get_pedidos': '/api/pedidos',
+        'get_pedidos_filtrados': f'/api/pedidos?country={sample.country}&request_type={sample.request_type}',
+        'get_projects': '/api/proyectos',
+        'get_projects_por_pais': f'/api/proyectos?country={sample.country}',
+        'get_project_pedidos': f'/api/proyectos/{sample.project_id}/pedidos',
+        'get_project_compromisos': f'/api/proyectos/{sample.project_id}/compromisos',
+        'get_project_detalle': f'/api/proyectos/{sample.project_id}?include=work_plan,coverage_plan,pedidos,compromisos',
+        'get_project_summary': f'/api/proyectos/{sample.project_id}/resumen',
+        'get_facets': '/api/facets',
+        'get_sync': f'/api/sync?since={since}',
+    }
+    helpers = {
+        'pedido_context': lambda: pedido_context(sample.pedido_id),
+        'project_coverage_context': lambda: project_coverage_context(sample.project_id),
+        'compromiso_context': lambda: compromiso_context(sample.compromiso_id),
+    }
+
+    # El caché de respuestas ocultaría las consultas
+    cache = current_app.extensions['response_cache']
+    cache_enabled, cache.enabled = cache.enabled, False
+    client = current_app.test_client()
+    collected = {}
+    try:
+        for name, url in routes.items():
+            with capture_statements() as captured:
+                response = client.get(url, headers=headers)
+            if response.status_code != 200:
+                raise click.ClickException(f"{url} respondió {response.status_code}")
+            collected[name] = captured
+        for name, helper in helpers.items():
+            with capture_statements() as captured:
+                helper()
+            collected[name] = captured
+    finally:
+        cache.enabled = cache_enabled
+    return collected
+
+
+def explain(statement, parameters):
+    """Plan de ejecución en JSON de una sentencia ya compilada por el driver."""
+    cursor = db.session.connection().connection.cursor()
+    try:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + statement, parameters)
+        plan = cursor.fetchone()[0]
+    finally:
+        cursor.close()
+    return (json.loads(plan) if isinstance(plan, str) else plan)[0]['Plan']
+
+
+def seq_scans(plan):
+    """Todas las tablas recorridas con Seq Scan en el árbol del plan."""
+    found = []
+    if plan.get('Node Type') == 'Seq Scan':
+        found.append(plan['Relation Name'])
+    for child in plan.get('Plans', []):
+        found.extend(seq_scans(child))
+    return found
+
+
+def table_sizes():
+    """Filas estimadas por tabla según las estadísticas de Postgres."""
+    rows = db.session.execute(text(
+        "SELECT relname, reltuples FROM pg_class WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+    ))
+    return {name: tuples for name, tuples in rows}
+
+
+def find_plan_regressions(min_rows):
+    """
+    Planes de las consultas calientes y regresiones encontradas: (reporte por
+    ruta, lista de descripciones). Requiere Postgres con datos sembrados.
+    """
+    sample = _sample_ids()
+    if sample is None:
+        raise click.ClickException("No hay compromisos en la base; sembrar datos antes (flask seed-synthetic)")
+
+    db.session.execute(text('ANALYZE'))
+    sizes = table_sizes()
+    report = {}
+    failures = []
+    for name, statements in collect_hot_queries(sample).items():
+        report[name] = []
+        for statement, parameters in statements:
+            plan = explain(statement, parameters)
+            report[name].append({"statement": statement, "plan": plan})
+            for table in seq_scans(plan):
+                if sizes.get(table, 0) >= min_rows:
+                    failures.append(f"{name}: Seq Scan sobre {table} (~{int(sizes[table])} filas)\n    {statement}")
+    return report, failures
+
+
+@click.command('check-query-plans')
+@click.option('--min-rows', default=10000, show_default=True,
+              help="Tamaño de tabla a partir del cual un Seq Scan se considera regresión.")
+@click.option('--output', type=click.Path(dir_okay=False, writable=True),
+              help="Archivo donde guardar los planes capturados en JSON.")
+@with_appcontext
+def check_query_plans_command(min_rows, output):
+    """Falla si alguna consulta caliente recorre secuencialmente una tabla grande."""
+    if db.engine.dialect.name != 'postgresql':
+        raise click.ClickException("La verificación de planes requiere Postgres")
+
+    report, failures = find_plan_regressions(min_rows)
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+
+    checked = sum(len(statements) for statements in report.values())
+    if failures:
+        raise click.ClickException(f"{len(failures)} regresiones de plan en {checked} consultas:\n" + "\n".join(
+            f"  - {failure}" for failure in failures
+        ))
+    print(f"Planes correctos: {checked} consultas sin Seq Scan sobre tablas de más de {min_rows} filas.")
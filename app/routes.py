@@ -1,25 +1,180 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from . import db
+import math
+
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required
+from sqlalchemy import insert, update
+from . import db, response_cache
 
 from .models import ONG, ProjectDefinition, WorkPlan, CoveragePlan, PedidoColaboracion, Compromiso
+from .queries import (
+    PEDIDO_STATUSES, PEDIDO_LIST_FIELDS, PROJECT_FIELDS, PROJECT_DETAIL_FIELDS, PROJECT_PLANS,
+    PROJECT_PEDIDO_FIELDS, PROJECT_COMPROMISO_FIELDS, InvalidFieldsRequest, select_fields, fetch_all,
+    fetch_by_ids, pedidos_list_query, projects_query, project_detail, project_owner_id,
+    project_pedidos_query, project_compromisos_query, project_summary_query, pedido_context,
+    project_coverage_context, compromiso_context, pedidos_context, compromisos_context, facet_counts_query
+)
+from .identity import current_ong
+from .pagination import InvalidPageRequest, parse_page_args, keyset, paginate, page_response
+from .search import SEARCH_KINDS, search_query, decode_search_cursor, encode_search_cursor, render_highlight
+from .streaming import stream_format, stream_response
+from .pedido_events import (
+    ensure_listener, generate_event_stream, initial_event_cursor, parse_event_cursor, record_pedido_events,
+)
+from .sync import decode_sync_token, sync_changes, sync_token_expired
+from .facets import FACETS, FACET_VALUE_MAX_LENGTH, register_project_facets, register_pedido_facets
+from .metrics import PEDIDOS_OPENED, COMPROMISOS_CREATED, COMPROMISOS_FULFILLED
+from .coverage_totals import (
+    register_commitment, register_fulfillment, register_commitments, register_fulfillments
+)
 
 api = Blueprint('api', __name__)
 
+# Relaciones que GET /api/proyectos/<id> puede incluir con `?include=`
+PROJECT_INCLUDES = (*PROJECT_PLANS, 'pedidos', 'compromisos')
+
+@api.errorhandler(InvalidPageRequest)
+@api.errorhandler(InvalidFieldsRequest)
+def handle_invalid_request(error):
+    return jsonify({"msg": str(error)}), 400
+
+def _export_query(query, created_col, id_col, cursor, limit):
+    """
+    Consulta para las respuestas en streaming de los listados paginados: respeta
+    el cursor y los filtros, pero solo limita si el cliente pidió un `limit`.
+    """
+    query = keyset(query, created_col, id_col, cursor)
+    if 'limit' in request.args:
+        query = query.limit(limit)
+    return query
+
+def _to_amount(value):
+    """
+    Convierte un monto recibido en el cuerpo a float; None si no es un número
+    positivo (los montos se suman a los totales mantenidos de cada pedido).
+    """
+    if isinstance(value, bool):
+        return None
+    try:
+        amount = float(value)
+    except (TypeError, ValueError):
+        return None
+    return amount if math.isfinite(amount) and amount > 0 else None
+
+def _is_id(value):
+    """True si `value` es un id válido en un cuerpo JSON (un entero, no un booleano)."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _bulk_items(key):
+    """
+    Lee la lista `key` del cuerpo de un endpoint en lote. Devuelve (items, None)
+    o (None, respuesta de error) si falta, está vacía o supera BULK_MAX_ITEMS.
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get(key)
+    if not isinstance(items, list) or not items:
+        return None, (jsonify({"msg": f"Falta la lista '{key}'"}), 400)
+    max_items = current_app.config['BULK_MAX_ITEMS']
+    if len(items) > max_items:
+        return None, (jsonify({"msg": f"La lista '{key}' admite como máximo {max_items} elementos"}), 400)
+    return items, None
+
+def _ids_arg():
+    """
+    Lee `?ids=` de los endpoints de listado: enteros sin repetir, en el orden pedido.
+    Devuelve (ids, None) o (None, respuesta de error) si alguno no es un entero o
+    superan BULK_MAX_ITEMS.
+    """
+    try:
+        ids = list(dict.fromkeys(int(value) for value in _list_arg('ids')))
+    except ValueError:
+        return None, (jsonify({"msg": "El parámetro 'ids' debe ser una lista de enteros"}), 400)
+    max_items = current_app.config['BULK_MAX_ITEMS']
+    if not ids or len(ids) > max_items:
+        return None, (jsonify({"msg": f"El parámetro 'ids' admite entre 1 y {max_items} ids"}), 400)
+    return ids, None
+
+def _multi_get(query, id_col):
+    """Respuesta de `?ids=`: las filas en el orden pedido y los ids que no existen."""
+    ids, error = _ids_arg()
+    if error:
+        return error
+    results, missing = fetch_by_ids(query, id_col, ids)
+    return jsonify({"results": results, "missing": missing})
+
+def _percent(part, whole):
+    """Porcentaje redondeado a un decimal; None si no hay nada pedido."""
+    return round(100 * part / whole, 1) if whole else None
+
+def _list_arg(name):
+    """Lee un parámetro multivalor, aceptando tanto `?x=a&x=b` como `?x=a,b`."""
+    values = []
+    for raw in request.args.getlist(name):
+        values.extend(v.strip() for v in raw.split(',') if v.strip())
+    return values
+
+def _fields(available, required=()):
+    """Proyección pedida con `?fields=`; los listados paginados agregan los campos del cursor."""
+    return select_fields(available, _list_arg('fields'), required)
+
 @api.route('/pedidos', methods=['GET'])
 @jwt_required()
+@response_cache.cached('pedidos', 'proyectos')
 def get_pedidos():
     """
-    Visualización de todos los pedidos de colaboración que están 'abiertos'.
-    Cualquier ONG autenticada puede ver esta lista.
+    Visualización paginada de los pedidos de colaboración que están 'abiertos'.
+    Cualquier ONG autenticada puede ver esta lista. La página siguiente se
+    anuncia en las cabeceras `X-Next-Cursor` y `Link`.
+    Con `ids` devuelve esos pedidos (en cualquier estado) en el orden pedido, con
+    una sola consulta, para refrescar los que el cliente ya conoce.
     ---
     tags:
       - Pedidos y Compromisos
     security:
       - bearerAuth: []
+    parameters:
+      - in: query
+        name: ids
+        description: "Ids de pedidos separados por coma (hasta BULK_MAX_ITEMS). Con este parámetro se ignoran los filtros y la paginación y la respuesta es `{results, missing}`."
+        type: string
+      - in: query
+        name: cursor
+        description: "Cursor opaco devuelto en `X-Next-Cursor` por la página anterior."
+        type: string
+      - in: query
+        name: limit
+        description: "Cantidad máxima de pedidos a devolver."
+        type: integer
+      - in: query
+        name: status
+        description: "Estado de los pedidos: 'open' (por defecto) o 'covered'."
+        type: string
+      - in: query
+        name: country
+        description: "País del proyecto."
+        type: string
+      - in: query
+        name: request_type
+        description: "Tipo de pedido, por ejemplo 'materiales'."
+        type: string
+      - in: query
+        name: project_types
+        description: "Tipos de proyecto separados por coma; el proyecto debe tenerlos todos."
+        type: string
+      - in: query
+        name: fields
+        description: "Campos a devolver separados por coma (por defecto todos). `id` y `created_at` se incluyen siempre."
+        type: string
+      - in: query
+        name: stream
+        description: "Con `1` devuelve el array completo en streaming, sin tamaño de página por defecto."
+        type: string
+      - in: query
+        name: format
+        description: "Con `ndjson` devuelve un objeto por línea en streaming (equivale a `Accept: application/x-ndjson`)."
+        type: string
     responses:
       200:
-        description: Una lista de todos los pedidos de colaboración abiertos.
+        description: Una página de pedidos de colaboración.
         schema:
           type: array
           items:
@@ -28,26 +183,111 @@ def get_pedidos():
               request_type: { type: string }
               description: { type: string }
               amount_requested: { type: number }
+              amount_committed_total: { type: number }
+              amount_fulfilled_total: { type: number }
+              status: { type: string }
+              created_at: { type: string }
               project_name: { type: string }
               project_country: { type: string }
               creador_ong_name: { type: string }
+      304:
+        description: La respuesta no cambió respecto del ETag enviado en `If-None-Match`.
+      400:
+        description: Parámetros de paginación, filtros, campos o ids inválidos.
     """
-    # Buscamos todos los pedidos que no estén 'covered'
-    open_pedidos = PedidoColaboracion.query.filter(PedidoColaboracion.status != 'covered').all()
-    
-    results = []
-    for p in open_pedidos:
-        results.append({
-            "id": p.id,
-            "request_type": p.request_type,
-            "description": p.description,
-            "amount_requested": p.amount_requested,
-            "project_name": p.coverage_plan.project.project_name,
-            "project_country": p.coverage_plan.project.country,
-            "creador_ong_name": p.coverage_plan.project.creador_ong.name
-        })
-        
-    return jsonify(results)
+    if 'ids' in request.args:
+        return _multi_get(
+            pedidos_list_query(status=None, fields=_fields(PEDIDO_LIST_FIELDS, required=('id',))),
+            PedidoColaboracion.id,
+        )
+
+    cursor, limit = parse_page_args(request.args)
+
+    status = request.args.get('status', 'open')
+    if status not in PEDIDO_STATUSES:
+        return jsonify({"msg": "El parámetro 'status' debe ser 'open' o 'covered'"}), 400
+
+    # Pedidos del estado pedido, con su proyecto y ONG en una sola consulta
+    query = pedidos_list_query(
+        status=status,
+        country=request.args.get('country'),
+        request_type=request.args.get('request_type'),
+        project_types=_list_arg('project_types'),
+        fields=_fields(PEDIDO_LIST_FIELDS, required=('id', 'created_at')),
+    )
+
+    fmt = stream_format()
+    if fmt:
+        return stream_response(
+            _export_query(query, PedidoColaboracion.created_at, PedidoColaboracion.id, cursor, limit), fmt
+        )
+
+    query = paginate(query, PedidoColaboracion.created_at, PedidoColaboracion.id, cursor, limit)
+
+    return page_response(fetch_all(query), limit)
+
+@api.route('/pedidos/stream', methods=['GET'])
+@jwt_required()
+def stream_pedidos():
+    """
+    Stream de Server-Sent Events con los pedidos creados y actualizados, para no
+    tener que consultar GET /api/pedidos periódicamente. Cada evento trae el
+    pedido con los mismos campos que GET /api/pedidos. El stream se cierra
+    periódicamente; el cliente se reconecta enviando `Last-Event-ID` y recibe los
+    eventos que se perdió. Requiere workers de gunicorn con hilos o gevent.
+    ---
+    tags:
+      - Pedidos y Compromisos
+    security:
+      - bearerAuth: []
+    produces:
+      - text/event-stream
+    parameters:
+      - in: header
+        name: Last-Event-ID
+        description: "Id del último evento recibido (opaco); sin él solo se envían los eventos nuevos."
+        type: string
+      - in: query
+        name: last_event_id
+        description: "Alternativa a la cabecera `Last-Event-ID`."
+        type: string
+      - in: query
+        name: country
+        description: "País del proyecto."
+        type: string
+      - in: query
+        name: request_type
+        description: "Tipo de pedido, por ejemplo 'materiales'."
+        type: string
+    responses:
+      200:
+        description: "Eventos `created`, `updated` (nuevos compromisos o cumplimientos) y `covered`."
+      400:
+        description: "`Last-Event-ID` inválido."
+      503:
+        description: "Stream deshabilitado: los workers `sync` de un solo hilo quedarían bloqueados por cada cliente."
+    """
+    if not current_app.config['SSE_ENABLED']:
+        return jsonify({"msg": "El stream de pedidos no está disponible en este servidor; usar GET /api/sync"}), 503
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    if last_event_id is None:
+        cursor = initial_event_cursor(request.args.get('country'), request.args.get('request_type'))
+    else:
+        try:
+            cursor = parse_event_cursor(last_event_id)
+        except ValueError:
+            return jsonify({"msg": "'Last-Event-ID' inválido"}), 400
+    db.session.close()
+
+    ensure_listener()
+    events = generate_event_stream(cursor, request.args.get('country'), request.args.get('request_type'))
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        # Sin buffer en proxies intermedios (nginx) ni caché
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
 
 @api.route('/pedidos/<int:pedido_id>/compromiso', methods=['POST'])
 @jwt_required()
@@ -79,37 +319,46 @@ def make_commitment(pedido_id):
               example: 50
     responses:
       201:
-        description: Compromiso creado exitosamente.
+        description: Compromiso creado exitosamente. Si con él se alcanza el monto pedido, el pedido pasa a 'covered'.
+      400:
+        description: Faltan datos o el monto no es un número.
       403:
         description: No puedes comprometerte a un pedido de tu propio proyecto.
       404:
         description: Pedido no encontrado o ya está cubierto.
     """
-    current_ong_id = int(get_jwt_identity())
-    
-    # Buscamos el pedido
-    pedido = PedidoColaboracion.query.get(pedido_id)
+    # Buscamos el pedido junto con el dueño de su proyecto
+    pedido = pedido_context(pedido_id)
 
     if not pedido or pedido.status != 'open':
         return jsonify({"msg": "Pedido no encontrado o ya está cubierto"}), 404
         
     # Verificamos que la ONG que ayuda no sea la misma que creó el proyecto
-    if pedido.coverage_plan.project.creador_ong_id == current_ong_id:
+    if pedido.creador_ong_id == current_ong.id:
         return jsonify({"msg": "No puedes comprometerte a un pedido de tu propio proyecto"}), 403
 
     data = request.get_json()
     if not data or 'details' not in data or 'amount_committed' not in data:
         return jsonify({"msg": "Faltan los campos 'details' y 'amount_committed'"}), 400
 
+    amount_committed = _to_amount(data['amount_committed'])
+    if amount_committed is None:
+        return jsonify({"msg": "El campo 'amount_committed' debe ser un número mayor a 0"}), 400
+
     new_compromiso = Compromiso(
-        pedido_id=pedido.id,
-        ong_id=current_ong_id,
+        pedido_id=pedido_id,
+        ong_id=current_ong.id,
         details=data.get('details'),
-        amount_committed=data.get('amount_committed'),
+        amount_committed=amount_committed,
         status='pending' # El compromiso inicia como 'pendiente'
     )
     db.session.add(new_compromiso)
+    # Actualizamos los totales del pedido en la misma transacción
+    register_commitment(pedido_id, amount_committed)
+    record_pedido_events([pedido_id])
     db.session.commit()
+    response_cache.invalidate('pedidos')
+    COMPROMISOS_CREATED.inc()
     
     return jsonify({
         "msg": "Compromiso creado exitosamente", 
@@ -141,42 +390,84 @@ def fulfill_commitment(compromiso_id):
       404:
         description: Compromiso no encontrado.
     """
-    current_ong_id = int(get_jwt_identity())
-    
-    # Buscamos el compromiso
-    compromiso = Compromiso.query.get(compromiso_id)
+    # Buscamos el compromiso junto con el dueño del proyecto
+    compromiso = compromiso_context(compromiso_id)
     
     if not compromiso:
         return jsonify({"msg": "Compromiso no encontrado"}), 404
     
     # Verificación de Permiso: 
     # El ID del usuario (token) debe ser igual al ID del creador del proyecto
-    project_owner_id = compromiso.pedido.coverage_plan.project.creador_ong_id
-    if project_owner_id != current_ong_id:
+    if compromiso.creador_ong_id != current_ong.id:
         return jsonify({"msg": "No tienes permiso para aprobar este compromiso"}), 403
 
-    # Actualizamos el estado
-    compromiso.status = 'fulfilled'
-    db.session.add(compromiso)
-    
+    # Actualizamos el estado solo si no estaba cumplido, así un compromiso
+    # no se suma dos veces al total del pedido aunque llegue el PUT repetido
+    result = db.session.execute(
+        update(Compromiso)
+        .where(Compromiso.id == compromiso_id, Compromiso.status != 'fulfilled')
+        .values(status='fulfilled')
+    )
+    if result.rowcount:
+        register_fulfillment(compromiso.pedido_id, compromiso.amount_committed or 0)
+        record_pedido_events([compromiso.pedido_id], 'updated')
+
     db.session.commit()
+    response_cache.invalidate('pedidos')
+    COMPROMISOS_FULFILLED.inc(result.rowcount)
     
     return jsonify({"msg": "Compromiso marcado como 'cumplido'"})
 
 @api.route('/proyectos', methods=['GET'])
 @jwt_required()
+@response_cache.cached('proyectos')
 def get_projects():
     """
-    Obtiene una lista de todos los proyectos registrados.
-    Cualquier ONG autenticada puede ver esta lista.
+    Obtiene una lista paginada de los proyectos registrados, del más reciente al más antiguo.
+    Cualquier ONG autenticada puede ver esta lista. La página siguiente se
+    anuncia en las cabeceras `X-Next-Cursor` y `Link`.
+    Con `ids` devuelve esos proyectos en el orden pedido, con una sola consulta.
     ---
     tags:
       - Proyectos
     security:
       - bearerAuth: []
+    parameters:
+      - in: query
+        name: ids
+        description: "Ids de proyectos separados por coma (hasta BULK_MAX_ITEMS). Con este parámetro se ignoran los filtros y la paginación y la respuesta es `{results, missing}`."
+        type: string
+      - in: query
+        name: cursor
+        description: "Cursor opaco devuelto en `X-Next-Cursor` por la página anterior."
+        type: string
+      - in: query
+        name: limit
+        description: "Cantidad máxima de proyectos a devolver."
+        type: integer
+      - in: query
+        name: country
+        description: "País del proyecto."
+        type: string
+      - in: query
+        name: project_types
+        description: "Tipos de proyecto separados por coma; el proyecto debe tenerlos todos."
+        type: string
+      - in: query
+        name: fields
+        description: "Campos a devolver separados por coma (por defecto todos). `id` y `created_at` se incluyen siempre."
+        type: string
+      - in: query
+        name: stream
+        description: "Con `1` devuelve el array completo en streaming, sin tamaño de página por defecto."
+        type: string
+      - in: query
+        name: format
+        description: "Con `ndjson` devuelve un objeto por línea en streaming (equivale a `Accept: application/x-ndjson`)."
+        type: string
     responses:
       200:
-        description: Una lista de todos los proyectos.
+        description: Una página de proyectos.
         schema:
           type: array
           items:
@@ -186,23 +477,119 @@ def get_projects():
               ong_name: { type: string }
               description: { type: string }
               country: { type: string }
+              created_at: { type: string }
+      304:
+        description: La respuesta no cambió respecto del ETag enviado en `If-None-Match`.
+      400:
+        description: Parámetros de paginación, campos o ids inválidos.
     """
-    projects = ProjectDefinition.query.order_by(ProjectDefinition.created_at.desc()).all()
-    
-    results = [
-        {
-            "id": p.id,
-            "project_name": p.project_name,
-            "ong_name": p.ong_name,
-            "description": p.description,
-            "country": p.country,
-        } for p in projects
-    ]
-        
-    return jsonify(results)
+    if 'ids' in request.args:
+        return _multi_get(projects_query(fields=_fields(PROJECT_FIELDS, required=('id',))), ProjectDefinition.id)
+
+    cursor, limit = parse_page_args(request.args)
+
+    query = projects_query(
+        country=request.args.get('country'),
+        project_types=_list_arg('project_types'),
+        fields=_fields(PROJECT_FIELDS, required=('id', 'created_at')),
+    )
+
+    fmt = stream_format()
+    if fmt:
+        return stream_response(
+            _export_query(query, ProjectDefinition.created_at, ProjectDefinition.id, cursor, limit), fmt
+        )
+
+    query = paginate(query, ProjectDefinition.created_at, ProjectDefinition.id, cursor, limit)
+
+    return page_response(fetch_all(query), limit)
+
+@api.route('/proyectos/<int:project_id>', methods=['GET'])
+@jwt_required()
+def get_project(project_id):
+    """
+    Obtiene un proyecto y, con `include`, sus relaciones en un solo documento.
+    El proyecto y sus planes salen de una única consulta (LEFT JOIN) y los pedidos
+    y compromisos de una consulta cada uno: como máximo tres consultas, sin
+    importar cuántos pedidos o compromisos tenga el proyecto.
+    Los compromisos solo los puede incluir la ONG dueña del proyecto.
+    ---
+    tags:
+      - Proyectos
+    security:
+      - bearerAuth: []
+    parameters:
+      - in: path
+        name: project_id
+        description: "El ID del proyecto."
+        required: true
+        schema: { type: integer }
+      - in: query
+        name: include
+        description: "Relaciones a incluir separadas por coma: `work_plan`, `coverage_plan`, `pedidos`, `compromisos`."
+        type: string
+      - in: query
+        name: fields
+        description: "Campos del proyecto a devolver separados por coma (por defecto todos; `id` siempre se incluye)."
+        type: string
+    responses:
+      200:
+        description: "El proyecto, con una clave por cada relación incluida (`null` si el plan no existe)."
+        schema:
+          properties:
+            id: { type: integer }
+            project_name: { type: string }
+            ong_name: { type: string }
+            description: { type: string }
+            country: { type: string }
+            location: { type: string }
+            project_types: { type: array, items: { type: string } }
+            budget: { type: number }
+            duration: { type: integer }
+            objectives: { type: string }
+            beneficiaries: { type: string }
+            creador_ong_id: { type: integer }
+            created_at: { type: string }
+            updated_at: { type: string }
+            work_plan: { type: object }
+            coverage_plan: { type: object }
+            pedidos: { type: array, items: { type: object } }
+            compromisos: { type: array, items: { type: object } }
+      400:
+        description: Relación desconocida en `include` o campo desconocido en `fields`.
+      403:
+        description: Solo la ONG dueña del proyecto puede incluir los compromisos.
+      404:
+        description: Proyecto no encontrado.
+    """
+    includes = _list_arg('include')
+    unknown = [name for name in includes if name not in PROJECT_INCLUDES]
+    if unknown:
+        return jsonify({
+            "msg": f"Relaciones desconocidas: {', '.join(unknown)}. Disponibles: {', '.join(PROJECT_INCLUDES)}"
+        }), 400
+
+    fields = _fields(PROJECT_DETAIL_FIELDS, required=('id',))
+    result = project_detail(project_id, fields, plans=[plan for plan in PROJECT_PLANS if plan in includes])
+
+    if result is None:
+        return jsonify({"msg": "Proyecto no encontrado"}), 404
+
+    project, owner_id = result
+
+    if 'compromisos' in includes and owner_id != current_ong.id:
+        return jsonify({"msg": "No estás autorizado para ver los compromisos de este proyecto"}), 403
+
+    if 'pedidos' in includes:
+        project['pedidos'] = fetch_all(project_pedidos_query(project_id))
+    if 'compromisos' in includes:
+        project['compromisos'] = fetch_all(project_compromisos_query(project_id))
+
+    return jsonify(project)
 
 @api.route('/proyectos/<int:project_id>/pedidos', methods=['GET'])
 @jwt_required()
+@response_cache.cached('pedidos')
 def get_project_pedidos(project_id):
     """
     Obtiene todos los pedidos (abiertos y cubiertos) de un proyecto específico.
@@ -218,6 +605,18 @@ def get_project_pedidos(project_id):
         description: "El ID del proyecto que se quiere consultar."
         required: true
         schema: { type: integer }
+      - in: query
+        name: fields
+        description: "Campos a devolver separados por coma (por defecto todos)."
+        type: string
+      - in: query
+        name: stream
+        description: "Con `1` devuelve el array en streaming."
+        type: string
+      - in: query
+        name: format
+        description: "Con `ndjson` devuelve un objeto por línea en streaming (equivale a `Accept: application/x-ndjson`)."
+        type: string
     responses:
       200:
         description: Una lista de todos los pedidos para el proyecto.
@@ -229,29 +628,108 @@ def get_project_pedidos(project_id):
               request_type: { type: string }
               description: { type: string }
               amount_requested: { type: number }
+              amount_committed_total: { type: number }
+              amount_fulfilled_total: { type: number }
               status: { type: string }
+      304:
+        description: La respuesta no cambió respecto del ETag enviado en `If-None-Match`.
+      400:
+        description: Campo desconocido en `fields`.
       404:
         description: Proyecto no encontrado.
     """
-    project = ProjectDefinition.query.get(project_id)
-    if not project:
+    if project_owner_id(project_id) is None:
         return jsonify({"msg": "Proyecto no encontrado"}), 404
-        
+
     # Accedemos a los pedidos a través del plan de cobertura
-    pedidos = project.coverage_plan.pedidos
-    
-    results = [
-        {
-            "id": p.id,
-            "request_type": p.request_type,
-            "description": p.description,
-            "amount_requested": p.amount_requested,
-            "status": p.status
-        } for p in pedidos
-    ]
-    
+    query = project_pedidos_query(project_id, fields=_fields(PROJECT_PEDIDO_FIELDS))
+
+    fmt = stream_format()
+    if fmt:
+        return stream_response(query, fmt)
+
+    results = fetch_all(query)
+
     return jsonify(results)
 
+@api.route('/proyectos/<int:project_id>/resumen', methods=['GET'])
+@jwt_required()
+def get_project_summary(project_id):
+    """
+    Resumen de cobertura de un proyecto para el tablero de su dueño: montos pedidos,
+    comprometidos y cumplidos por tipo de pedido y estado, cantidad de ONGs que
+    colaboran y porcentaje de cobertura. Se calcula con una sola consulta agrupada
+    sobre los totales que se mantienen en cada pedido.
+    Solo la ONG dueña del proyecto puede verlo.
+    ---
+    tags:
+      - Proyectos
+    security:
+      - bearerAuth: []
+    parameters:
+      - in: path
+        name: project_id
+        description: "El ID del proyecto."
+        required: true
+        schema: { type: integer }
+    responses:
+      200:
+        description: "Totales del proyecto y desglose por `request_type` y `status`. `coverage_percent` cuenta lo comprometido hasta el monto de cada pedido."
+        schema:
+          properties:
+            project_id: { type: integer }
+            pedidos: { type: integer }
+            amount_requested: { type: number }
+            amount_committed: { type: number }
+            amount_fulfilled: { type: number }
+            coverage_percent: { type: number }
+            fulfillment_percent: { type: number }
+            collaborating_ongs: { type: integer }
+            by_request_type:
+              type: array
+              items:
+                properties:
+                  request_type: { type: string }
+                  status: { type: string }
+                  pedidos: { type: integer }
+                  amount_requested: { type: number }
+                  amount_committed: { type: number }
+                  amount_fulfilled: { type: number }
+      403:
+        description: No estás autorizado para ver el resumen de este proyecto.
+      404:
+        description: Proyecto no encontrado.
+    """
+    owner_id = project_owner_id(project_id)
+
+    if owner_id is None:
+        return jsonify({"msg": "Proyecto no encontrado"}), 404
+
+    if owner_id != current_ong.id:
+        return jsonify({"msg": "No estás autorizado para ver el resumen de este proyecto"}), 403
+
+    groups = fetch_all(project_summary_query(project_id))
+
+    requested = sum(group['amount_requested'] for group in groups)
+    covered = sum(group.pop('amount_covered') for group in groups)
+    fulfilled = sum(group['amount_fulfilled'] for group in groups)
+    # El conteo de colaboradores es del proyecto entero y viene repetido en cada grupo
+    collaborating_ongs = groups[0]['collaborating_ongs'] if groups else 0
+    for group in groups:
+        del group['collaborating_ongs']
+
+    return jsonify({
+        "project_id": project_id,
+        "pedidos": sum(group['pedidos'] for group in groups),
+        "amount_requested": requested,
+        "amount_committed": sum(group['amount_committed'] for group in groups),
+        "amount_fulfilled": fulfilled,
+        "coverage_percent": _percent(covered, requested),
+        "fulfillment_percent": _percent(fulfilled, requested),
+        "collaborating_ongs": collaborating_ongs,
+        "by_request_type": groups,
+    })
+
 @api.route('/proyectos/<int:project_id>/pedido', methods=['POST'])
 @jwt_required()
 def add_project_pedido(project_id):
@@ -287,37 +765,45 @@ def add_project_pedido(project_id):
       201:
         description: Pedido de colaboración creado exitosamente.
       400:
-        description: Faltan datos en el cuerpo de la solicitud.
+        description: Faltan datos en el cuerpo de la solicitud o 'amount_requested' no es un número mayor a 0.
       403:
         description: No tienes permiso para añadir pedidos a este proyecto.
       404:
         description: Proyecto no encontrado o no tiene un plan de cobertura.
     """
-    current_ong_id = int(get_jwt_identity())
-    project = ProjectDefinition.query.get(project_id)
+    project = project_coverage_context(project_id)
 
     if not project:
         return jsonify({"msg": "Proyecto no encontrado"}), 404
 
-    if project.creador_ong_id != current_ong_id:
+    if project.creador_ong_id != current_ong.id:
         return jsonify({"msg": "No tienes permiso para añadir pedidos a este proyecto"}), 403
 
-    if not project.coverage_plan:
+    if not project.coverage_plan_id:
         return jsonify({"msg": "El proyecto no tiene un plan de cobertura para asociar el pedido"}), 404
 
     data = request.get_json()
     if not data or 'request_type' not in data or 'description' not in data or 'amount_requested' not in data:
         return jsonify({"msg": "Faltan los campos 'request_type', 'description' y 'amount_requested'"}), 400
 
+    amount_requested = _to_amount(data['amount_requested'])
+    if amount_requested is None:
+        return jsonify({"msg": "El campo 'amount_requested' debe ser un número mayor a 0"}), 400
+
     new_pedido = PedidoColaboracion(
-        coverage_plan_id=project.coverage_plan.id,
+        coverage_plan_id=project.coverage_plan_id,
         request_type=data['request_type'],
         description=data['description'],
-        amount_requested=data['amount_requested'],
+        amount_requested=amount_requested,
         status='open'
     )
     db.session.add(new_pedido)
+    db.session.flush()
+    record_pedido_events([new_pedido.id], 'created')
+    register_pedido_facets([new_pedido.request_type])
     db.session.commit()
+    response_cache.invalidate('pedidos')
+    PEDIDOS_OPENED.inc()
 
     return jsonify({"msg": "Pedido creado exitosamente", "pedido_id": new_pedido.id}), 201
 
@@ -374,11 +860,10 @@ def create_project():
       201:
         description: Proyecto creado exitosamente.
       400:
-        description: Faltan datos requeridos en el cuerpo de la solicitud.
-      404:
+        description: Faltan datos requeridos en el cuerpo de la solicitud o `project_types` no es una lista de textos de hasta 255 caracteres.
+      401:
         description: ONG del token no encontrada.
     """
-    current_ong_id = int(get_jwt_identity())
     data = request.get_json()
 
     required_fields = [
@@ -388,13 +873,25 @@ def create_project():
     if not data or not all(field in data for field in required_fields):
         return jsonify({"msg": "Faltan datos requeridos para crear el proyecto"}), 400
 
-    ong = ONG.query.get(current_ong_id)
-    if not ong:
-        return jsonify({"msg": "ONG no encontrada"}), 404
+    # La columna es un ARRAY de textos: cualquier otra cosa fallaría al insertar, y
+    # cada tipo se cuenta en facet_counts, con un largo máximo
+    project_types = data.get('project_types')
+    if project_types is not None and not (
+        isinstance(project_types, list)
+        and all(
+            isinstance(project_type, str) and project_type.strip() and len(project_type) <= FACET_VALUE_MAX_LENGTH
+            for project_type in project_types
+        )
+    ):
+        return jsonify({
+            "msg": f"El campo 'project_types' debe ser una lista de textos no vacíos de hasta {FACET_VALUE_MAX_LENGTH} caracteres"
+        }), 400
 
+    # La identidad de la ONG ya viene resuelta (y cacheada) desde el token
     new_project = ProjectDefinition(
-        creador_ong_id=current_ong_id,
-        ong_name=ong.name,
+        creador_ong_id=current_ong.id,
+        ong_name=current_ong.name,
+        project_types=project_types,
         **{key: data[key] for key in required_fields if key != 'stages'}
     )
     
@@ -403,7 +900,9 @@ def create_project():
     new_project.coverage_plan = CoveragePlan(strategy="Plan de cobertura inicial.")
     
     db.session.add(new_project)
+    register_project_facets(new_project.country, new_project.project_types)
     db.session.commit()
+    response_cache.invalidate('proyectos')
     
     return jsonify({"msg": "Proyecto creado exitosamente", "project_id": new_project.id}), 201
 
@@ -424,41 +923,453 @@ def get_project_compromisos(project_id):
         description: "El ID del proyecto para ver sus compromisos."
         required: true
         schema: { type: integer }
+      - in: query
+        name: fields
+        description: "Campos a devolver separados por coma (por defecto todos)."
+        type: string
+      - in: query
+        name: stream
+        description: "Con `1` devuelve el array en streaming."
+        type: string
+      - in: query
+        name: format
+        description: "Con `ndjson` devuelve un objeto por línea en streaming (equivale a `Accept: application/x-ndjson`)."
+        type: string
     responses:
       200:
         description: Una lista de todos los compromisos para el proyecto.
+      400:
+        description: Campo desconocido en `fields`.
       403:
         description: No estás autorizado para ver esta información.
       404:
         description: Proyecto no encontrado.
     """
-    current_ong_id = int(get_jwt_identity())
-    project = ProjectDefinition.query.get(project_id)
-    
-    if not project:
+    owner_id = project_owner_id(project_id)
+
+    if owner_id is None:
         return jsonify({"msg": "Proyecto no encontrado"}), 404
-        
-    # Verificación de autorización (usando la navegación simple)
-    if project.creador_ong_id != current_ong_id:
+
+    # Verificación de autorización sin cargar el proyecto completo
+    if owner_id != current_ong.id:
         return jsonify({"msg": "No estás autorizado para ver los compromisos de este proyecto"}), 403
 
+    # Si no hay plan de cobertura la consulta simplemente no devuelve filas
+    query = project_compromisos_query(project_id, fields=_fields(PROJECT_COMPROMISO_FIELDS))
+
+    fmt = stream_format()
+    if fmt:
+        return stream_response(query, fmt)
+
+    results = fetch_all(query)
+
+    return jsonify(results)
+
+@api.route('/search', methods=['GET'])
+@jwt_required()
+@response_cache.cached('proyectos', 'pedidos')
+def search():
+    """
+    Búsqueda de texto completo sobre proyectos (nombre, descripción, objetivos y
+    beneficiarios) y pedidos (tipo y descripción), ordenada por relevancia.
+    Cualquier ONG autenticada puede buscar. La página siguiente se anuncia en las
+    cabeceras `X-Next-Cursor` y `Link`.
+    ---
+    tags:
+      - Búsqueda
+    security:
+      - bearerAuth: []
+    parameters:
+      - in: query
+        name: q
+        description: "Texto a buscar. Todas las palabras deben aparecer."
+        required: true
+        type: string
+      - in: query
+        name: type
+        description: "Tipos de resultado separados por coma: 'proyecto', 'pedido' (por defecto ambos)."
+        type: string
+      - in: query
+        name: cursor
+        description: "Cursor opaco devuelto en `X-Next-Cursor` por la página anterior."
+        type: string
+      - in: query
+        name: limit
+        description: "Cantidad máxima de resultados a devolver."
+        type: integer
+    responses:
+      200:
+        description: Una página de resultados, del más relevante al menos relevante.
+        schema:
+          type: array
+          items:
+            properties:
+              kind: { type: string }
+              id: { type: integer }
+              title: { type: string }
+              rank: { type: number }
+              highlight: { type: string, description: "Fragmento HTML escapado con las coincidencias entre <b> y </b>." }
+      304:
+        description: La respuesta no cambió respecto del ETag enviado en `If-None-Match`.
+      400:
+        description: Falta el texto a buscar o los parámetros son inválidos.
+    """
+    text = request.args.get('q', '')
+    if not any(c.isalnum() for c in text):
+        return jsonify({"msg": "El parámetro 'q' debe contener al menos una palabra"}), 400
+
+    kinds = _list_arg('type') or list(SEARCH_KINDS)
+    if any(kind not in SEARCH_KINDS for kind in kinds):
+        return jsonify({"msg": "El parámetro 'type' admite 'proyecto' y 'pedido'"}), 400
+
+    cursor, limit = parse_page_args(request.args, decode=decode_search_cursor)
+
+    # Una sola consulta sobre los índices de texto completo (GIN en Postgres, FTS5 en SQLite)
+    query = search_query(text, sorted(set(kinds)), cursor, limit)
+
+    results = fetch_all(query)
+    for result in results:
+        result['highlight'] = render_highlight(result['highlight'])
+
+    return page_response(results, limit, cursor_for=encode_search_cursor)
+
+@api.route('/facets', methods=['GET'])
+@jwt_required()
+@response_cache.cached('proyectos', 'pedidos')
+def get_facets():
+    """
+    Conteos para la navegación por facetas: proyectos por país y por tipo de
+    proyecto, y pedidos por tipo de pedido. Se leen de una tabla que las altas de
+    proyectos y pedidos mantienen al día, así el costo no depende del tamaño del catálogo.
+    ---
+    tags:
+      - Proyectos
+    security:
+      - bearerAuth: []
+    parameters:
+      - in: query
+        name: facet
+        description: "Facetas a devolver separadas por coma: `country`, `project_type`, `request_type` (por defecto todas)."
+        type: string
+    responses:
+      200:
+        description: "Por cada faceta, sus valores ordenados de mayor a menor conteo."
+        schema:
+          properties:
+            country:
+              type: array
+              items:
+                properties:
+                  value: { type: string }
+                  count: { type: integer }
+            project_type: { type: array, items: { type: object } }
+            request_type: { type: array, items: { type: object } }
+      304:
+        description: La respuesta no cambió respecto del ETag enviado en `If-None-Match`.
+      400:
+        description: Faceta desconocida.
+    """
+    facets = _list_arg('facet') or FACETS
+    unknown = [facet for facet in facets if facet not in FACETS]
+    if unknown:
+        return jsonify({"msg": f"Facetas desconocidas: {', '.join(unknown)}. Disponibles: {', '.join(FACETS)}"}), 400
+
+    results = {facet: [] for facet in facets}
+    for row in fetch_all(facet_counts_query(facets)):
+        results[row['facet']].append({"value": row['value'], "count": row['count']})
+
+    return jsonify(results)
+
+@api.route('/sync', methods=['GET'])
+@jwt_required()
+def sync():
+    """
+    Sincronización incremental para clientes que guardan una copia local.
+    Devuelve los proyectos, pedidos y compromisos (los propios y los de los
+    proyectos de la ONG) que cambiaron desde el token `since`, los ids borrados
+    y un token nuevo para la próxima sincronización. Las filas cambiadas en los
+    últimos segundos pueden repetirse en la siguiente respuesta.
+    ---
+    tags:
+      - Sincronización
+    security:
+      - bearerAuth: []
+    parameters:
+      - in: query
+        name: since
+        description: "Token `since` de la respuesta anterior; sin él se devuelve todo, por páginas."
+        type: string
+      - in: query
+        name: limit
+        description: "Cantidad máxima de filas por recurso."
+        type: integer
+    responses:
+      200:
+        description: "Cambios por recurso, ids borrados en `deleted`, el token `since` y `has_more` si quedan cambios por pedir."
+        schema:
+          properties:
+            proyectos: { type: array, items: { type: object } }
+            pedidos: { type: array, items: { type: object } }
+            compromisos: { type: array, items: { type: object } }
+            deleted: { type: object }
+            since: { type: string }
+            has_more: { type: boolean }
+      400:
+        description: Token o límite inválido.
+      410:
+        description: El token es anterior a la retención de borrados; hay que sincronizar desde cero.
+    """
+    token, limit = parse_page_args(request.args, decode=decode_sync_token, cursor_arg='since')
+    if token is not None and sync_token_expired(token):
+        return jsonify({"msg": "El token de sincronización expiró; sincroniza de nuevo sin 'since'"}), 410
+
+    return jsonify(sync_changes(current_ong.id, token, limit))
+
+@api.route('/proyectos/<int:project_id>/pedidos/lote', methods=['POST'])
+@jwt_required()
+def add_project_pedidos_bulk(project_id):
+    """
+    Crea varios pedidos de colaboración para un proyecto en una sola petición.
+    El proyecto y el permiso se verifican una vez, los pedidos válidos se insertan
+    en un único INSERT de varias filas y se confirma una sola transacción.
+    Devuelve un resultado por ítem, en el mismo orden en que se enviaron.
+    ---
+    tags:
+      - Proyectos
+    security:
+      - bearerAuth: []
+    parameters:
+      - in: path
+        name: project_id
+        description: "El ID del proyecto al que se le añadirán los pedidos."
+        required: true
+        schema: { type: integer }
+      - in: body
+        name: body
+        required: true
+        schema:
+          properties:
+            pedidos:
+              type: array
+              items:
+                properties:
+                  request_type: { type: string }
+                  description: { type: string }
+                  amount_requested: { type: number }
+              example: [{"request_type": "materiales", "description": "150 bolsas de cemento", "amount_requested": 150}]
+    responses:
+      200:
+        description: "Resultado por ítem: status 201 con `pedido_id` o 400 con `msg`."
+      400:
+        description: Falta la lista de pedidos o supera el máximo permitido.
+      403:
+        description: No tienes permiso para añadir pedidos a este proyecto.
+      404:
+        description: Proyecto no encontrado o no tiene un plan de cobertura.
+    """
+    items, error = _bulk_items('pedidos')
+    if error:
+        return error
+
+    project = project_coverage_context(project_id)
+    if not project:
+        return jsonify({"msg": "Proyecto no encontrado"}), 404
+    if project.creador_ong_id != current_ong.id:
+        return jsonify({"msg": "No tienes permiso para añadir pedidos a este proyecto"}), 403
+    if not project.coverage_plan_id:
+        return jsonify({"msg": "El proyecto no tiene un plan de cobertura para asociar el pedido"}), 404
+
+    results = [None] * len(items)
+    rows, positions = [], []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not all(k in item for k in ('request_type', 'description', 'amount_requested')):
+            results[index] = {"status": 400, "msg": "Faltan los campos 'request_type', 'description' y 'amount_requested'"}
+            continue
+        amount_requested = _to_amount(item['amount_requested'])
+        if amount_requested is None:
+            results[index] = {"status": 400, "msg": "El campo 'amount_requested' debe ser un número mayor a 0"}
+            continue
+        rows.append({
+            "coverage_plan_id": project.coverage_plan_id,
+            "request_type": item['request_type'],
+            "description": item['description'],
+            "amount_requested": amount_requested,
+            "status": 'open',
+        })
+        positions.append(index)
+
+    if rows:
+        new_ids = db.session.execute(
+            insert(PedidoColaboracion).returning(PedidoColaboracion.id, sort_by_parameter_order=True),
+            rows,
+        ).scalars().all()
+        record_pedido_events(new_ids, 'created')
+        register_pedido_facets(row['request_type'] for row in rows)
+        db.session.commit()
+        response_cache.invalidate('pedidos')
+        PEDIDOS_OPENED.inc(len(new_ids))
+        for index, pedido_id in zip(positions, new_ids):
+            results[index] = {"status": 201, "pedido_id": pedido_id}
+
+    return jsonify({"results": results})
+
+@api.route('/compromisos/lote', methods=['POST'])
+@jwt_required()
+def make_commitments_bulk():
+    """
+    Crea compromisos sobre varios pedidos en una sola petición.
+    Los pedidos y sus dueños se resuelven con una sola consulta, los compromisos
+    válidos se insertan en un único INSERT de varias filas y los totales de cada
+    pedido se actualizan en la misma transacción.
+    ---
+    tags:
+      - Pedidos y Compromisos
+    security:
+      - bearerAuth: []
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          properties:
+            compromisos:
+              type: array
+              items:
+                properties:
+                  pedido_id: { type: integer }
+                  details: { type: string }
+                  amount_committed: { type: number }
+              example: [{"pedido_id": 1, "details": "Puedo donar 50 bolsas de cemento.", "amount_committed": 50}]
+    responses:
+      200:
+        description: "Resultado por ítem: status 201 con `compromiso_id`, o 400/403/404 con `msg`."
+      400:
+        description: Falta la lista de compromisos o supera el máximo permitido.
+    """
+    items, error = _bulk_items('compromisos')
+    if error:
+        return error
+
+    pedido_ids = {item['pedido_id'] for item in items if isinstance(item, dict) and _is_id(item.get('pedido_id'))}
+    pedidos = pedidos_context(list(pedido_ids))
+
+    results = [None] * len(items)
+    rows, positions = [], []
+    amounts = {}
+    # Comprometido por pedido a medida que se aplican los ítems, en orden: un ítem
+    # sobre un pedido que otro anterior del lote ya cubrió se rechaza como si
+    # llegara en una petición aparte
+    committed = {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not all(k in item for k in ('pedido_id', 'details', 'amount_committed')):
+            results[index] = {"status": 400, "msg": "Faltan los campos 'pedido_id', 'details' y 'amount_committed'"}
+            continue
+        if not _is_id(item['pedido_id']):
+            results[index] = {"status": 400, "msg": "El campo 'pedido_id' debe ser un entero"}
+            continue
+        pedido = pedidos.get(item['pedido_id'])
+        covered = pedido and pedido.id in committed and committed[pedido.id] >= (pedido.amount_requested or 0)
+        if not pedido or pedido.status != 'open' or covered:
+            results[index] = {"status": 404, "msg": "Pedido no encontrado o ya está cubierto"}
+            continue
+        if pedido.creador_ong_id == current_ong.id:
+            results[index] = {"status": 403, "msg": "No puedes comprometerte a un pedido de tu propio proyecto"}
+            continue
+        amount_committed = _to_amount(item['amount_committed'])
+        if amount_committed is None:
+            results[index] = {"status": 400, "msg": "El campo 'amount_committed' debe ser un número mayor a 0"}
+            continue
+        rows.append({
+            "pedido_id": pedido.id,
+            "ong_id": current_ong.id,
+            "details": item['details'],
+            "amount_committed": amount_committed,
+            "status": 'pending',
+        })
+        positions.append(index)
+        amounts[pedido.id] = amounts.get(pedido.id, 0) + amount_committed
+        committed[pedido.id] = committed.get(pedido.id, pedido.amount_committed_total or 0) + amount_committed
+
+    if rows:
+        new_ids = db.session.execute(
+            insert(Compromiso).returning(Compromiso.id, sort_by_parameter_order=True),
+            rows,
+        ).scalars().all()
+        register_commitments(amounts)
+        record_pedido_events(list(amounts))
+        db.session.commit()
+        response_cache.invalidate('pedidos')
+        COMPROMISOS_CREATED.inc(len(new_ids))
+        for index, compromiso_id in zip(positions, new_ids):
+            results[index] = {"status": 201, "compromiso_id": compromiso_id}
+
+    return jsonify({"results": results})
+
+@api.route('/compromisos/cumplidos', methods=['PUT'])
+@jwt_required()
+def fulfill_commitments_bulk():
+    """
+    Marca varios compromisos como 'cumplidos' en una sola petición.
+    Los permisos se verifican con una sola consulta y los compromisos se
+    actualizan con un único UPDATE. Solo la ONG dueña del proyecto de cada
+    compromiso puede marcarlo.
+    ---
+    tags:
+      - Pedidos y Compromisos
+    security:
+      - bearerAuth: []
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          properties:
+            compromiso_ids:
+              type: array
+              items: { type: integer }
+              example: [1, 2, 3]
+    responses:
+      200:
+        description: "Resultado por ítem: status 200, o 400/403/404 con `msg`."
+      400:
+        description: Falta la lista de compromisos o supera el máximo permitido.
+    """
+    compromiso_ids, error = _bulk_items('compromiso_ids')
+    if error:
+        return error
+
+    compromisos = compromisos_context([cid for cid in compromiso_ids if _is_id(cid)])
+
     results = []
-    
-    if not project.coverage_plan:
-        return jsonify(results) # No hay plan, no hay compromisos
+    allowed = []
+    for compromiso_id in compromiso_ids:
+        if not _is_id(compromiso_id):
+            results.append({"compromiso_id": compromiso_id, "status": 400, "msg": "El id del compromiso debe ser un entero"})
+            continue
+        compromiso = compromisos.get(compromiso_id)
+        if not compromiso:
+            results.append({"compromiso_id": compromiso_id, "status": 404, "msg": "Compromiso no encontrado"})
+        elif compromiso.creador_ong_id != current_ong.id:
+            results.append({"compromiso_id": compromiso_id, "status": 403, "msg": "No tienes permiso para aprobar este compromiso"})
+        else:
+            results.append({"compromiso_id": compromiso_id, "status": 200})
+            allowed.append(compromiso_id)
 
-    pedidos_del_proyecto = project.coverage_plan.pedidos
-    
-    for p in pedidos_del_proyecto:
-        for comp in p.compromisos:
-            results.append({
-                "compromiso_id": comp.id,
-                "compromiso_status": comp.status,
-                "details": comp.details,
-                "amount_committed": comp.amount_committed,
-                "pedido_id": p.id,
-                "pedido_description": p.description,
-                "compromiso_ong_name": comp.compromiso_ong.name 
-            })
-        
-    return jsonify(results)
\ No newline at end of file
+    if allowed:
+        # Solo se suman al total los que efectivamente cambiaron de estado en este UPDATE
+        changed = db.session.execute(
+            update(Compromiso)
+            .where(Compromiso.id.in_(allowed), Compromiso.status != 'fulfilled')
+            .values(status='fulfilled')
+            .returning(Compromiso.pedido_id, Compromiso.amount_committed)
+        ).all()
+        amounts = {}
+        for pedido_id, amount_committed in changed:
+            amounts[pedido_id] = amounts.get(pedido_id, 0) + (amount_committed or 0)
+        register_fulfillments(amounts)
+        record_pedido_events(list(amounts), 'updated')
+        db.session.commit()
+        response_cache.invalidate('pedidos')
+        COMPROMISOS_FULFILLED.inc(len(changed))
+
+    return jsonify({"results": results})
\ No newline at end of file
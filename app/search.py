@@ -0,0 +1,221 @@
+"""
+Búsqueda de texto completo sobre proyectos y pedidos.
+
+En Postgres cada tabla tiene una columna `search_vector` (tsvector con la
+configuración 'spanish') generada por la base a partir del título y los textos
+del registro, con un índice GIN. Al ser una columna GENERATED ... STORED se
+mantiene sola en cada INSERT/UPDATE, incluidos los inserts en lote por Core. No
+se declara en los modelos porque solo existe en Postgres: la crea la migración
+(o `create_all`, con los DDL de este módulo). `include_object` evita que
+`flask db migrate` proponga borrar estos objetos que no están en los modelos.
+
+En SQLite la búsqueda usa dos tablas virtuales FTS5 (`project_search` y
+`pedido_search`, con rowid = id del registro) que mantienen triggers sobre las
+tablas de origen.
+
+Los resultados se ordenan por relevancia (ts_rank_cd / bm25) y se paginan con un
+cursor sobre (rank, kind, id). El rank se compara en doble precisión: ts_rank_cd
+devuelve float4 y no sería igual al valor del cursor, así se saltearían o
+repetirían filas empatadas entre páginas.
+
+El fragmento `highlight` se arma con texto cargado por los usuarios. La base marca
+las coincidencias con caracteres de control (que no forman HTML) y
+`render_highlight` escapa el fragmento antes de cambiarlos por <b> y </b>, así el
+cliente puede mostrarlo como HTML sin riesgo de inyección.
+"""
+import html
+import re
+
+from sqlalchemy import (
+    DDL, Float, and_, cast, column, event, func, literal, literal_column, or_, select, table, tuple_, union_all
+)
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSVECTOR
+from . import db
+
+from .models import ProjectDefinition, PedidoColaboracion
+from .pagination import InvalidPageRequest, decode_token, encode_token
+
+SEARCH_KINDS = ('proyecto', 'pedido')
+TS_CONFIG = 'spanish'
+# Marcas de las coincidencias en la base y su versión HTML en la respuesta
+MATCH_START, MATCH_STOP = '\x02', '\x03'
+HIGHLIGHT_START, HIGHLIGHT_STOP = '<b>', '</b>'
+HEADLINE_OPTIONS = f'StartSel={MATCH_START}, StopSel={MATCH_STOP}, MaxFragments=2, MinWords=5, MaxWords=20'
+SNIPPET_TOKENS = 20
+
+# Textos indexados por tipo de resultado: (tabla, título, [(columna, peso)])
+SEARCH_SOURCES = {
+    'proyecto': (
+        ProjectDefinition, ProjectDefinition.project_name,
+        [('project_name', 'A'), ('description', 'B'), ('objectives', 'C'), ('beneficiaries', 'C')],
+    ),
+    'pedido': (
+        PedidoColaboracion, PedidoColaboracion.request_type,
+        [('request_type', 'A'), ('description', 'B')],
+    ),
+}
+FTS_TABLES = {'proyecto': 'project_search', 'pedido': 'pedido_search'}
+
+
+def _tsvector_sql(columns):
+    return ' || '.join(
+        f"setweight(to_tsvector('{TS_CONFIG}', coalesce({name}, '')), '{weight}')"
+        for name, weight in columns
+    )
+
+
+def _fts_body_sql(columns, prefix):
+    # El título va en su propia columna FTS; el cuerpo concatena el resto de los textos
+    return " || ' ' || ".join(f"coalesce({prefix}.{name}, '')" for name, _ in columns[1:])
+
+
+def search_ddl():
+    """(dialecto, sentencia) de los DDL que crean el índice de búsqueda sobre tablas ya existentes."""
+    statements = []
+    for kind, (model, _, columns) in SEARCH_SOURCES.items():
+        table_name = model.__tablename__
+        statements += [
+            ('postgresql', f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                           f"GENERATED ALWAYS AS ({_tsvector_sql(columns)}) STORED"),
+            ('postgresql', f"CREATE INDEX IF NOT EXISTS ix_{table_name}_search_vector ON {table_name} USING gin (search_vector)"),
+        ]
+
+        fts = FTS_TABLES[kind]
+        title = columns[0][0]
+        insert = (f"INSERT INTO {fts} (rowid, title, body) "
+                  f"VALUES (new.id, new.{title}, {_fts_body_sql(columns, 'new')});")
+        delete = f"DELETE FROM {fts} WHERE rowid = old.id;"
+        indexed = ', '.join(name for name, _ in columns)
+        statements += [
+            ('sqlite', f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                       f"title, body, tokenize = 'unicode61 remove_diacritics 2')"),
+            ('sqlite', f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table_name} BEGIN {insert} END"),
+            # Solo las columnas indexadas: los totales de cobertura se actualizan muy seguido
+            ('sqlite', f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {indexed} ON {table_name} "
+                       f"BEGIN {delete} {insert} END"),
+            ('sqlite', f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table_name} BEGIN {delete} END"),
+        ]
+    return statements
+
+
+# Con SQLALCHEMY_CREATE_ALL las tablas se crean sin pasar por las migraciones
+for _dialect, _statement in search_ddl():
+    event.listen(db.metadata, 'after_create', DDL(_statement).execute_if(dialect=_dialect))
+for _fts in FTS_TABLES.values():
+    event.listen(db.metadata, 'before_drop', DDL(f"DROP TABLE IF EXISTS {_fts}").execute_if(dialect='sqlite'))
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """
+    Filtro `include_object` de Alembic (migrations/env.py): excluye de la
+    autogeneración la columna, los índices y las tablas FTS5 (con sus tablas
+    internas) que crean los DDL de este módulo.
+    """
+    if not reflected or compare_to is not None:
+        return True
+    if type_ in ('column', 'index'):
+        return 'search_vector' not in name
+    if type_ == 'table':
+        return not any(name == fts or name.startswith(f"{fts}_") for fts in FTS_TABLES.values())
+    return True
+
+
+def encode_search_cursor(row):
+    return encode_token([row['rank'], row['kind'], row['id']])
+
+
+def decode_search_cursor(token):
+    try:
+        rank, kind, row_id = decode_token(token)
+        return float(rank), str(kind), int(row_id)
+    except (ValueError, TypeError):
+        raise InvalidPageRequest("Cursor inválido")
+
+
+def _after_cursor(rank, kind, row_id, cursor):
+    """Filas posteriores al cursor en el orden (rank desc, kind, id)."""
+    if cursor is None:
+        return None
+    last_rank, last_kind, last_id = cursor
+    return or_(rank < last_rank, and_(rank == last_rank, tuple_(kind, row_id) > tuple_(last_kind, last_id)))
+
+
+def _pg_search_query(text, kinds, cursor, limit):
+    tsquery = func.websearch_to_tsquery(literal(TS_CONFIG, REGCONFIG), text)
+    selects = []
+    for kind in kinds:
+        model, title, columns = SEARCH_SOURCES[kind]
+        vector = literal_column(f"{model.__tablename__}.search_vector", TSVECTOR)
+        body = func.concat_ws(' ', *(getattr(model, name) for name, _ in columns[1:]))
+        selects.append(
+            select(
+                literal(kind).label('kind'), model.id.label('id'), title.label('title'),
+                cast(func.ts_rank_cd(vector, tsquery), Float(53)).label('rank'), body.label('body'),
+            )
+            .select_from(model)
+            .where(vector.bool_op('@@')(tsquery))
+        )
+    matches = union_all(*selects).subquery('matches')
+    order = (matches.c.rank.desc(), matches.c.kind, matches.c.id)
+
+    page = select(matches).order_by(*order).limit(limit + 1)
+    condition = _after_cursor(matches.c.rank, matches.c.kind, matches.c.id, cursor)
+    if condition is not None:
+        page = page.where(condition)
+    page = page.subquery('page')
+
+    # ts_headline es caro: se calcula solo para las filas de la página
+    return select(
+        page.c.kind, page.c.id, page.c.title, page.c.rank,
+        func.ts_headline(literal(TS_CONFIG, REGCONFIG), page.c.body, tsquery, HEADLINE_OPTIONS).label('highlight'),
+    ).order_by(page.c.rank.desc(), page.c.kind, page.c.id)
+
+
+def _fts_match(text):
+    """
+    Convierte el texto libre en una consulta FTS5 segura: cada palabra entre
+    comillas (sin operadores), y todas deben aparecer.
+    """
+    return ' '.join(f'"{word}"' for word in re.findall(r'\w+', text))
+
+
+def _sqlite_search_query(text, kinds, cursor, limit):
+    match = _fts_match(text)
+    selects = []
+    for kind in kinds:
+        fts = table(FTS_TABLES[kind], column('rowid'), column('title'))
+        # Las funciones auxiliares de FTS5 reciben el nombre de la tabla como argumento
+        name = literal_column(fts.name)
+        selects.append(
+            select(
+                literal(kind).label('kind'), fts.c.rowid.label('id'), fts.c.title.label('title'),
+                # bm25 devuelve valores negativos (más bajo = más relevante); el título pesa más
+                (-func.bm25(name, 10.0, 1.0)).label('rank'),
+                func.snippet(name, 1, MATCH_START, MATCH_STOP, '…', SNIPPET_TOKENS).label('highlight'),
+            )
+            .where(name.op('MATCH')(match))
+        )
+    matches = union_all(*selects).subquery('matches')
+
+    query = select(matches).order_by(matches.c.rank.desc(), matches.c.kind, matches.c.id).limit(limit + 1)
+    condition = _after_cursor(matches.c.rank, matches.c.kind, matches.c.id, cursor)
+    if condition is not None:
+        query = query.where(condition)
+    return query
+
+
+def render_highlight(fragment):
+    """Escapa el fragmento devuelto por la base y marca las coincidencias con <b>."""
+    if fragment is None:
+        return None
+    return html.escape(fragment).replace(MATCH_START, HIGHLIGHT_START).replace(MATCH_STOP, HIGHLIGHT_STOP)
+
+
+def search_query(text, kinds, cursor, limit):
+    """
+    Consulta de una página de resultados (limit + 1 filas) con kind, id, title,
+    rank y highlight, ordenada por relevancia.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        return _pg_search_query(text, kinds, cursor, limit)
+    return _sqlite_search_query(text, kinds, cursor, limit)
@@ -0,0 +1,132 @@
+"""
+Serialización de las respuestas.
+
+`jsonify` delega en el proveedor JSON de la app (`app.json`); este módulo lo
+reemplaza por `ApiJSONProvider`, que:
+  * codifica con orjson (JSON_ENCODER='orjson', por defecto), bastante más rápido
+    que el módulo `json` de la biblioteca estándar, con el mismo formato que Flask:
+    claves ordenadas y fechas en formato HTTP. Con JSON_ENCODER='json', o si orjson
+    no está instalado, usa el codificador estándar;
+  * en los blueprints `api` y `auth` negocia el formato con la cabecera `Accept`
+    y responde MessagePack (más compacto) si el cliente prefiere
+    `application/msgpack`. Requiere el paquete `msgpack`; sin él, o con
+    MSGPACK_ENABLED=0, siempre responde JSON.
+
+Como todo pasa por `jsonify`, la negociación cubre también los errores y los
+listados paginados, y el caché de respuestas guarda una entrada por formato (su
+clave incluye `Accept`). Las respuestas en streaming (NDJSON, SSE) siguen siendo
+JSON, aunque también usan el codificador rápido.
+
+Todo el tiempo de codificación se suma al `serialize` de Server-Timing.
+"""
+from datetime import date, datetime, timezone
+
+from flask import has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+from .instrumentation import serialization_timer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack')
+# Blueprints que responden MessagePack si el cliente lo pide
+NEGOTIATED_BLUEPRINTS = ('api', 'auth')
+
+_WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+def http_date(value):
+    """
+    Igual que `werkzeug.http.http_date` (lo que usa Flask para las fechas), sin pasar
+    por `email.utils`: con una fecha por fila era la mayor parte del tiempo de codificación.
+    """
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    elif value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return (f"{_WEEKDAYS[value.weekday()]}, {value.day:02d} {_MONTHS[value.month - 1]} {value.year:04d} "
+            f"{value.hour:02d}:{value.minute:02d}:{value.second:02d} GMT")
+
+
+def _default(o):
+    if isinstance(o, date):
+        return http_date(o)
+    return DefaultJSONProvider.default(o)
+
+
+class ApiJSONProvider(DefaultJSONProvider):
+    """Proveedor de `app.json` con codificación rápida y negociación de formato."""
+
+    use_orjson = False
+    msgpack_enabled = False
+    default = staticmethod(_default)
+
+    def _orjson_options(self):
+        # Las fechas pasan por `default` para mantener el formato HTTP de Flask
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def _pretty(self):
+        """Como Flask: con indentación si compact=False o en modo debug."""
+        return self.compact is False or (self.compact is None and self._app.debug)
+
+    def _dumpb(self, obj):
+        with serialization_timer():
+            return orjson.dumps(obj, default=self.default, option=self._orjson_options())
+
+    def dumps(self, obj, **kwargs):
+        # Con argumentos (p. ej. indent) se usa el codificador estándar
+        if self.use_orjson and not kwargs:
+            return self._dumpb(obj).decode()
+        with serialization_timer():
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def _negotiates(self):
+        return self.msgpack_enabled and has_request_context() and request.blueprint in NEGOTIATED_BLUEPRINTS
+
+    def _response_mimetype(self):
+        """Formato de la respuesta según `Accept`; JSON salvo que se prefiera MessagePack."""
+        if not self._negotiates():
+            return self.mimetype
+        return request.accept_mimetypes.best_match((self.mimetype, *MSGPACK_MIMETYPES)) or self.mimetype
+
+    def response(self, *args, **kwargs):
+        mimetype = self._response_mimetype()
+        if mimetype in MSGPACK_MIMETYPES:
+            obj = self._prepare_response_obj(args, kwargs)
+            with serialization_timer():
+                body = msgpack.packb(obj, default=self.default, use_bin_type=True)
+            response = self._app.response_class(body, mimetype=mimetype)
+        elif self.use_orjson and not self._pretty():
+            # Los bytes de orjson van directo al cuerpo, sin pasar por str
+            body = self._dumpb(self._prepare_response_obj(args, kwargs)) + b"\n"
+            response = self._app.response_class(body, mimetype=mimetype)
+        else:
+            response = super().response(*args, **kwargs)
+        if self._negotiates():
+            response.vary.add('Accept')
+        return response
+
+
+def init_serialization(app):
+    """Instala `ApiJSONProvider` como proveedor JSON de la app."""
+    provider = ApiJSONProvider(app)
+    provider.use_orjson = app.config['JSON_ENCODER'] == 'orjson' and orjson is not None
+    provider.msgpack_enabled = app.config['MSGPACK_ENABLED'] and msgpack is not None
+    app.json = provider
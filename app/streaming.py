@@ -0,0 +1,65 @@
+"""
+Respuestas en streaming para colecciones grandes.
+
+En lugar de armar la lista completa y serializarla con `jsonify`, las filas se
+leen con un cursor del lado del servidor (`yield_per`) y se envían al cliente por
+bloques a medida que llegan, así la memoria queda acotada al tamaño del bloque y
+el primer byte sale apenas se lee el primer lote.
+
+Formatos soportados:
+  * NDJSON (`application/x-ndjson`): un objeto JSON por línea. Se elige con la
+    cabecera `Accept: application/x-ndjson` o con `?format=ndjson`.
+  * Array JSON por bloques (`application/json`): el mismo documento que devuelve
+    el endpoint sin streaming. Se elige con `?stream=1`.
+"""
+from flask import Response, current_app, request, stream_with_context
+from . import db
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def stream_format():
+    """Devuelve 'ndjson', 'json' o None según lo que pidió el cliente."""
+    if request.args.get('format') == 'ndjson':
+        return 'ndjson'
+    if request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        return 'ndjson'
+    if request.args.get('stream', '').lower() in ('1', 'true'):
+        return 'json'
+    return None
+
+
+def _iter_partitions(query):
+    """Lee la consulta por lotes con un cursor del lado del servidor."""
+    batch_size = current_app.config['STREAM_BATCH_SIZE']
+    result = db.session.execute(query.execution_options(yield_per=batch_size)).mappings()
+    try:
+        yield from result.partitions()
+    finally:
+        result.close()
+
+
+def _generate_ndjson(query):
+    dumps = current_app.json.dumps
+    for partition in _iter_partitions(query):
+        yield ''.join(dumps(dict(row)) + '\n' for row in partition)
+
+
+def _generate_json_array(query):
+    dumps = current_app.json.dumps
+    yield '['
+    first = True
+    for partition in _iter_partitions(query):
+        chunk = ','.join(dumps(dict(row)) for row in partition)
+        if not first:
+            chunk = ',' + chunk
+        first = False
+        yield chunk
+    yield ']'
+
+
+def stream_response(query, fmt):
+    """Arma la respuesta en streaming para la consulta en el formato indicado."""
+    if fmt == 'ndjson':
+        return Response(stream_with_context(_generate_ndjson(query)), mimetype=NDJSON_MIMETYPE)
+    return Response(stream_with_context(_generate_json_array(query)), mimetype='application/json')
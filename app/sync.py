@@ -0,0 +1,159 @@
+"""
+Sincronización incremental para clientes con copia local (GET /api/sync).
+
+El cliente guarda el token `since` de cada respuesta y lo envía en la siguiente:
+recibe solo los proyectos, pedidos y compromisos que cambiaron desde entonces y
+los ids de los que se borraron. Cada recurso se recorre por (updated_at, id) sobre
+su índice, así el costo de una sincronización depende de la cantidad de cambios y
+no del tamaño de las tablas. Sin token se recibe todo, por páginas.
+
+`updated_at` se asigna al escribir, no al confirmar: una transacción que confirma
+tarde puede dejar filas con una fecha anterior a lo que otro cliente ya leyó. Por
+eso, al terminar de recorrer los cambios de cada recurso, su cursor en el token
+retrocede SYNC_OVERLAP_SECONDS (un margen mayor que la transacción de escritura
+más larga). Las filas de ese
+margen pueden llegar repetidas y el cliente las aplica como upsert.
+
+Los borrados se registran en `tombstones` con el evento `after_delete` del ORM;
+los DELETE de Core no pasan por ahí y deben registrar sus lápidas a mano. Las
+lápidas se conservan SYNC_TOMBSTONE_DAYS días (`flask prune-tombstones`): un token
+más viejo recibe 410 y el cliente debe sincronizar desde cero.
+"""
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import delete, event, insert, tuple_
+from . import db
+
+from .models import ProjectDefinition, PedidoColaboracion, Compromiso, Tombstone
+from .pagination import InvalidPageRequest, decode_token, encode_token
+from .queries import (
+    fetch_all, sync_projects_query, sync_pedidos_query, sync_compromisos_query, tombstones_query
+)
+
+# Recursos sincronizados: nombre en la respuesta y en `tombstones.resource` -> modelo
+SYNC_RESOURCES = {
+    'proyectos': ProjectDefinition,
+    'pedidos': PedidoColaboracion,
+    'compromisos': Compromiso,
+}
+# Un recorrido por recurso más el de las lápidas; el token guarda un cursor por recorrido
+STREAM_COUNT = len(SYNC_RESOURCES) + 1
+
+
+def _record_tombstone(resource):
+    def listener(mapper, connection, target):
+        connection.execute(
+            insert(Tombstone).values(resource=resource, row_id=target.id, deleted_at=datetime.now())
+        )
+    return listener
+
+
+for _resource, _model in SYNC_RESOURCES.items():
+    event.listen(_model, 'after_delete', _record_tombstone(_resource))
+
+
+def _streams(ong_id):
+    """(nombre, consulta, columna de fecha, columna id, clave de fecha en la fila) de cada recorrido."""
+    return [
+        ('proyectos', sync_projects_query(), ProjectDefinition.updated_at, ProjectDefinition.id, 'updated_at'),
+        ('pedidos', sync_pedidos_query(), PedidoColaboracion.updated_at, PedidoColaboracion.id, 'updated_at'),
+        ('compromisos', sync_compromisos_query(ong_id), Compromiso.updated_at, Compromiso.id, 'updated_at'),
+        ('deleted', tombstones_query(), Tombstone.deleted_at, Tombstone.id, 'deleted_at'),
+    ]
+
+
+def encode_sync_token(issued_at, cursors):
+    return encode_token([issued_at.isoformat()] + [
+        None if cursor is None else [cursor[0].isoformat(), cursor[1]] for cursor in cursors
+    ])
+
+
+def decode_sync_token(token):
+    """Devuelve (fecha de emisión, [cursor (fecha, id) o None por recorrido])."""
+    try:
+        issued_at, *cursors = decode_token(token)
+        issued_at = datetime.fromisoformat(issued_at)
+        cursors = [
+            None if cursor is None else (datetime.fromisoformat(cursor[0]), int(cursor[1]))
+            for cursor in cursors
+        ]
+    except (ValueError, TypeError, IndexError, KeyError):
+        raise InvalidPageRequest("Token de sincronización inválido")
+    if len(cursors) != STREAM_COUNT:
+        raise InvalidPageRequest("Token de sincronización inválido")
+    return issued_at, cursors
+
+
+def sync_token_expired(token):
+    """True si desde la emisión del token pudieron podarse lápidas que el cliente no vio."""
+    issued_at, _ = token
+    config = current_app.config
+    oldest_kept = datetime.now() - timedelta(days=config['SYNC_TOMBSTONE_DAYS'])
+    return issued_at - timedelta(seconds=config['SYNC_OVERLAP_SECONDS']) < oldest_kept
+
+
+def _changed_since(query, updated_col, id_col, cursor, limit):
+    """Filas posteriores al cursor en orden (fecha, id); una de más para saber si hay otra página."""
+    if cursor is not None:
+        query = query.where(tuple_(updated_col, id_col) > tuple_(*cursor))
+    return query.order_by(updated_col, id_col).limit(limit + 1)
+
+
+def sync_changes(ong_id, token, limit):
+    """
+    Cambios posteriores a `token` (None: todo), hasta `limit` filas por recurso.
+    Con `has_more` el cliente debe pedir de nuevo con el token devuelto.
+    """
+    now = datetime.now()
+    settled = now - timedelta(seconds=current_app.config['SYNC_OVERLAP_SECONDS'])
+    cursors = token[1] if token else [None] * STREAM_COUNT
+
+    body = {}
+    next_cursors = []
+    has_more = False
+    for (name, query, updated_col, id_col, date_key), cursor in zip(_streams(ong_id), cursors):
+        rows = fetch_all(_changed_since(query, updated_col, id_col, cursor, limit))
+        more = len(rows) > limit
+        has_more = has_more or more
+        rows = rows[:limit]
+        body[name] = rows
+        if rows:
+            cursor = (rows[-1][date_key], rows[-1]['id'])
+        # Cada recorrido que queda al día retrocede al margen de solapamiento (ver el
+        # docstring del módulo), aunque otros recursos todavía tengan páginas
+        if not more and cursor is not None and cursor[0] > settled:
+            cursor = (settled, 0)
+        next_cursors.append(cursor)
+
+    deleted = {name: [] for name in SYNC_RESOURCES}
+    for tombstone in body.pop('deleted'):
+        deleted[tombstone['resource']].append(tombstone['row_id'])
+    body['deleted'] = deleted
+    body['since'] = encode_sync_token(now, next_cursors)
+    body['has_more'] = has_more
+    return body
+
+
+@click.command('prune-tombstones')
+@click.option('--days', type=int, default=None,
+              help="Antigüedad a partir de la cual se borran (por defecto y como mínimo SYNC_TOMBSTONE_DAYS).")
+@with_appcontext
+def prune_tombstones_command(days):
+    """Borra las lápidas viejas; los tokens de /api/sync anteriores a ellas pasan a responder 410."""
+    retention = current_app.config['SYNC_TOMBSTONE_DAYS']
+    # Con menos días se borrarían lápidas que tokens todavía aceptados no vieron
+    if days is not None and days < retention:
+        raise click.BadParameter(f"debe ser al menos SYNC_TOMBSTONE_DAYS ({retention})", param_hint="'--days'")
+    days = days if days is not None else retention
+    try:
+        result = db.session.execute(
+            delete(Tombstone).where(Tombstone.deleted_at < datetime.now() - timedelta(days=days))
+        )
+        db.session.commit()
+        print(f"{result.rowcount} lápidas borradas.")
+    except Exception as e:
+        db.session.rollback()
+        raise click.ClickException(f"Error al borrar las lápidas: {e}")
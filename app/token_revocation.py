@@ -0,0 +1,132 @@
+"""
+Revocación de JWT con un filtro de Bloom en memoria respaldado por la tabla
+`revoked_tokens`.
+
+Cada petición autenticada pasa por `is_revoked`. Para que ese chequeo no cueste
+una consulta por petición, cada worker mantiene un filtro de Bloom con los `jti`
+revocados: si el filtro dice que un token no está, seguro no está revocado y no
+se consulta la base. Solo ante un positivo (real o falso) se confirma contra la
+tabla.
+
+El filtro se sincroniza de forma incremental (filas con id mayor al último
+visto) como mucho cada JWT_REVOCATION_SYNC_SECONDS, así que una revocación hecha
+en otro worker puede tardar ese tiempo en verse para los tokens de acceso. Los
+tokens de refresco se verifican siempre contra la tabla: son poco frecuentes y
+la rotación debe detectar la reutilización en cualquier worker.
+"""
+import hashlib
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import exists, select
+from . import db
+
+from .models import RevokedToken
+
+
+class BloomFilter:
+    """Filtro de Bloom sobre un bytearray, con k posiciones derivadas de blake2b."""
+
+    def __init__(self, size_bits, hash_count):
+        self.size_bits = size_bits
+        self.hash_count = hash_count
+        self._bits = bytearray((size_bits + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=8 * self.hash_count).digest()
+        for i in range(self.hash_count):
+            chunk = int.from_bytes(digest[i * 8:(i + 1) * 8], 'big')
+            yield chunk % self.size_bits
+
+    def add(self, value):
+        for pos in self._positions(value):
+            self._bits[pos // 8] |= 1 << (pos % 8)
+
+    def __contains__(self, value):
+        return all(self._bits[pos // 8] & (1 << (pos % 8)) for pos in self._positions(value))
+
+
+class TokenRevocationList:
+    """Registra revocaciones de JWT y responde si un token está revocado."""
+
+    def __init__(self, app=None, jwt=None):
+        self.size_bits = None
+        self.hash_count = None
+        self.capacity = None
+        self.sync_seconds = None
+        self._lock = threading.Lock()
+        self._reset()
+        if app is not None:
+            self.init_app(app, jwt)
+
+    def init_app(self, app, jwt):
+        self.size_bits = app.config['JWT_REVOCATION_BLOOM_BITS']
+        self.hash_count = app.config['JWT_REVOCATION_BLOOM_HASHES']
+        self.capacity = app.config['JWT_REVOCATION_BLOOM_CAPACITY']
+        self.sync_seconds = app.config['JWT_REVOCATION_SYNC_SECONDS']
+        self._reset()
+        jwt.token_in_blocklist_loader(self._blocklist_callback)
+        app.extensions['token_revocation'] = self
+
+    def _reset(self):
+        self._bloom = BloomFilter(self.size_bits, self.hash_count) if self.size_bits else None
+        self._loaded = 0
+        self._last_id = 0
+        self._synced_at = None
+
+    def _sync(self, force=False):
+        """Incorpora al filtro las revocaciones nuevas de la tabla."""
+        now = time.monotonic()
+        if not force and self._synced_at is not None and now - self._synced_at < self.sync_seconds:
+            return
+        with self._lock:
+            # Si el filtro superó su capacidad, se reconstruye solo con los tokens aún
+            # vigentes. `is_revoked` lee el filtro sin lock: el nuevo se llena aparte y
+            # reemplaza al anterior recién cuando está completo
+            if self._loaded > self.capacity:
+                bloom, loaded = BloomFilter(self.size_bits, self.hash_count), 0
+                query = select(RevokedToken.id, RevokedToken.jti).where(RevokedToken.expires_at > datetime.now())
+            else:
+                bloom, loaded = self._bloom, self._loaded
+                query = select(RevokedToken.id, RevokedToken.jti).where(RevokedToken.id > self._last_id)
+            last_id = self._last_id
+            for row_id, jti in db.session.execute(query):
+                bloom.add(jti)
+                loaded += 1
+                last_id = max(last_id, row_id)
+            self._bloom, self._loaded, self._last_id = bloom, loaded, last_id
+            self._synced_at = now
+
+    def _in_table(self, jti):
+        return db.session.execute(
+            select(exists().where(RevokedToken.jti == jti))
+        ).scalar()
+
+    def is_revoked(self, jwt_payload):
+        jti = jwt_payload['jti']
+        if jwt_payload.get('type') == 'refresh':
+            return self._in_table(jti)
+        self._sync()
+        if jti not in self._bloom:
+            return False
+        return self._in_table(jti)
+
+    def _blocklist_callback(self, jwt_header, jwt_payload):
+        return self.is_revoked(jwt_payload)
+
+    def revoke(self, jwt_payload):
+        """
+        Agrega el token a la sesión como revocado. La unicidad de `jti` en la tabla
+        hace que dos rotaciones simultáneas del mismo token no puedan confirmarse
+        ambas: la segunda falla con IntegrityError al hacer commit.
+        """
+        exp = jwt_payload.get('exp')
+        db.session.add(RevokedToken(
+            jti=jwt_payload['jti'],
+            token_type=jwt_payload.get('type', 'access'),
+            ong_id=int(jwt_payload['sub']),
+            expires_at=datetime.fromtimestamp(exp) if exp else datetime.max,
+        ))
+        with self._lock:
+            self._bloom.add(jwt_payload['jti'])
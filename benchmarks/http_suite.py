@@ -0,0 +1,407 @@
+"""
+Benchmark HTTP de los blueprints `api` y `auth` con escenarios guionados.
+
+Escenarios (se corren uno tras otro, cada uno con su concurrencia):
+    browse    GET /api/pedidos con filtros al azar, recorriendo hasta 3 páginas con el cursor
+    commit    POST /api/pedidos/<id>/compromiso sobre pedidos abiertos ajenos
+    fulfill   PUT /api/compromisos/<id>/cumplido por la ONG dueña del proyecto
+    login     ráfaga de POST /auth/login
+    project   POST /api/proyectos
+
+Por escenario y ruta informa cantidad, errores (5xx o sin respuesta),
+throughput, p50/p95/p99 y consultas SQL por petición. Las consultas solo se
+miden sin --url, porque se cuentan con un evento del engine dentro del proceso.
+
+Con --baseline compara contra un resultado guardado y termina con código 1 si
+alguna ruta empeora más que --tolerance en p95 o throughput, si aumentan sus
+consultas por petición (redondeadas a consultas enteras, así el resultado no
+depende de --requests ni de --concurrency) o si aumenta su tasa de errores. --save-baseline guarda
+el resultado actual como nueva línea base. benchmarks/baseline.json se grabó con
+--config config.TestConfig y los valores por defecto; las latencias dependen de
+la máquina, así que conviene regenerarla en la máquina donde se compara.
+
+Uso:
+    python benchmarks/http_suite.py --config config.TestConfig --baseline benchmarks/baseline.json
+    python benchmarks/http_suite.py --scenarios browse,commit --concurrency 16 --requests 2000
+    python benchmarks/http_suite.py --url http://localhost:8000   # base ya sembrada
+
+Sin --url levanta create_app en un servidor local con hilos, usando la base
+configurada en el entorno (DATABASE_URL o DB_*), o SQLite en memoria con
+--config config.TestConfig. Si la base no tiene ONGs se siembra antes con
+`seed-synthetic` (--seed-args). Los escenarios inician sesión con las ONGs
+sintéticas (--password). Sin --url el caché de respuestas se desactiva, así los
+GET miden siempre la consulta a la base; contra un servidor ya levantado conviene
+iniciarlo con RESPONSE_CACHE_ENABLED=0.
+"""
+import argparse
+import json
+import os
+import random
+import shlex
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import urlencode
+from collections import defaultdict, deque, namedtuple
+from itertools import count
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from login_vs_api import percentile, start_local_server
+from seed import SYNTHETIC_COUNTRIES, SYNTHETIC_REQUEST_TYPES
+
+DEFAULT_SEED_ARGS = '--ongs 200 --projects 2000 --pedidos 20000 --compromisos 60000'
+QUERIES_HEADER = 'X-Bench-Queries'
+
+Sample = namedtuple('Sample', 'label status seconds queries')
+Response = namedtuple('Response', 'status headers body')
+
+
+def http(base_url, method, path, payload=None, token=None):
+    """Ejecuta una petición y devuelve (Response, muestra sin etiqueta)."""
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(base_url + path, data=data, method=method)
+    req.add_header('Content-Type', 'application/json')
+    if token:
+        req.add_header('Authorization', f'Bearer {token}')
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req) as resp:
+            status, headers, raw = resp.status, resp.headers, resp.read()
+    except urllib.error.HTTPError as e:
+        status, headers, raw = e.code, e.headers, e.read()
+    except OSError:
+        status, headers, raw = 0, {}, b''
+    elapsed = time.perf_counter() - start
+    queries = headers.get(QUERIES_HEADER)
+    try:
+        body = json.loads(raw) if raw else None
+    except ValueError:
+        body = None
+    return Response(status, headers, body), (status, elapsed, int(queries) if queries is not None else None)
+
+
+def instrument(app):
+    """Cuenta las sentencias SQL de cada petición y las devuelve en una cabecera."""
+    from flask import g, has_request_context
+    from sqlalchemy import event
+    from app import db
+
+    def before_cursor_execute(*args, **kwargs):
+        if has_request_context():
+            g.bench_queries = g.get('bench_queries', 0) + 1
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+    @app.after_request
+    def add_queries_header(response):
+        response.headers[QUERIES_HEADER] = str(g.get('bench_queries', 0))
+        return response
+
+
+def serialize_if_sqlite(app):
+    from app import db
+
+    with app.app_context():
+        dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        # SQLite en memoria comparte una única conexión entre hilos (StaticPool):
+        # las peticiones se atienden de a una y la concurrencia solo agrega espera.
+        print("Aviso: con SQLite las peticiones se serializan; medir concurrencia contra Postgres")
+        lock = threading.Lock()
+        wsgi_app = app.wsgi_app
+
+        def serialized_wsgi_app(environ, start_response):
+            with lock:
+                return wsgi_app(environ, start_response)
+
+        app.wsgi_app = serialized_wsgi_app
+
+
+def seed_if_empty(app, seed_args):
+    from sqlalchemy import func, select
+    from app import db
+    from app.models import ONG
+
+    with app.app_context():
+        if db.session.execute(select(func.count(ONG.id))).scalar():
+            return
+    print(f"Base vacía: sembrando con seed-synthetic {seed_args}")
+    result = app.test_cli_runner().invoke(args=['seed-synthetic', *shlex.split(seed_args)])
+    print(result.output, end='')
+    if result.exit_code:
+        sys.exit("No se pudo sembrar la base")
+
+
+class Workload:
+    """Sesiones y datos (pedidos abiertos, compromisos pendientes) que usan los escenarios."""
+
+    def __init__(self, base_url, password, max_ongs):
+        self.base_url = base_url
+        self.password = password
+        self.tokens = {}
+        self.owner_projects = defaultdict(list)
+        self.open_pedidos = []
+        self.pending_compromisos = deque()
+        self._setup(max_ongs)
+
+    def _login(self, name):
+        response, _ = http(self.base_url, 'POST', '/auth/login', {"name": name, "password": self.password})
+        return response.body['access_token'] if response.status == 200 else None
+
+    def _setup(self, max_ongs):
+        # Una sesión cualquiera para descubrir proyectos y a sus dueños
+        bench_name, bench_password = 'bench_suite_ong', 'bench_suite_pass'
+        http(self.base_url, 'POST', '/auth/register', {"name": bench_name, "password": bench_password})
+        response, _ = http(self.base_url, 'POST', '/auth/login', {"name": bench_name, "password": bench_password})
+        if response.status != 200:
+            sys.exit(f"No se pudo iniciar sesión en {self.base_url} (HTTP {response.status})")
+        token = response.body['access_token']
+
+        projects, _ = http(self.base_url, 'GET', '/api/proyectos?limit=500', token=token)
+        for project in projects.body or []:
+            name = project['ong_name']
+            if name not in self.tokens and len(self.tokens) < max_ongs:
+                self.tokens[name] = self._login(name)
+            if self.tokens.get(name):
+                self.owner_projects[name].append(project['id'])
+        self.tokens = {name: t for name, t in self.tokens.items() if t}
+        if len(self.tokens) < 2:
+            sys.exit("Hacen falta al menos 2 ONGs con la contraseña indicada (--password); sembrar con seed-synthetic")
+
+        pedidos, _ = http(self.base_url, 'GET', '/api/pedidos?limit=500', token=token)
+        self.open_pedidos = [(p['id'], p['creador_ong_name']) for p in pedidos.body or []]
+
+        for name, project_ids in self.owner_projects.items():
+            for project_id in project_ids:
+                compromisos, _ = http(self.base_url, 'GET', f'/api/proyectos/{project_id}/compromisos',
+                                      token=self.tokens[name])
+                self.pending_compromisos.extend(
+                    (name, c['compromiso_id']) for c in compromisos.body or [] if c['compromiso_status'] != 'fulfilled'
+                )
+
+    def request(self, label, method, path, payload=None, token=None):
+        response, (status, seconds, queries) = http(self.base_url, method, path, payload, token)
+        return response, Sample(label, status, seconds, queries)
+
+
+def browse_step(work, rng):
+    token = rng.choice(list(work.tokens.values()))
+    # Filtros variados para que cada iteración recorra páginas distintas
+    filters = rng.choice([
+        {},
+        {'request_type': rng.choice(SYNTHETIC_REQUEST_TYPES)},
+        {'country': rng.choice(SYNTHETIC_COUNTRIES)},
+        {'status': 'covered'},
+    ])
+    path = '/api/pedidos?' + urlencode({'limit': 50, **filters})
+    samples = []
+    for _ in range(3):
+        response, sample = work.request('GET /api/pedidos', 'GET', path, token=token)
+        samples.append(sample)
+        cursor = response.headers.get('X-Next-Cursor') if response.status == 200 else None
+        if not cursor:
+            break
+        path = '/api/pedidos?' + urlencode({'limit': 50, **filters, 'cursor': cursor})
+    return samples
+
+
+def commit_step(work, rng):
+    name = rng.choice(list(work.tokens))
+    candidates = [pedido_id for pedido_id, owner in work.open_pedidos if owner != name]
+    if not candidates:
+        return None
+    _, sample = work.request(
+        'POST /api/pedidos/<id>/compromiso', 'POST', f'/api/pedidos/{rng.choice(candidates)}/compromiso',
+        {"details": "Compromiso de benchmark", "amount_committed": 1}, work.tokens[name],
+    )
+    return [sample]
+
+
+def fulfill_step(work, rng):
+    try:
+        name, compromiso_id = work.pending_compromisos.popleft()
+    except IndexError:
+        return None
+    _, sample = work.request(
+        'PUT /api/compromisos/<id>/cumplido', 'PUT', f'/api/compromisos/{compromiso_id}/cumplido',
+        token=work.tokens[name],
+    )
+    return [sample]
+
+
+def login_step(work, rng):
+    _, sample = work.request('POST /auth/login', 'POST', '/auth/login',
+                             {"name": rng.choice(list(work.tokens)), "password": work.password})
+    return [sample]
+
+
+def project_step(work, rng):
+    payload = {
+        "project_name": f"Proyecto de benchmark {rng.randint(1, 10 ** 9)}",
+        "description": "Proyecto creado por el benchmark",
+        "country": "Argentina",
+        "location": "Rosario",
+        "budget": 1000,
+        "duration": 6,
+        "objectives": "Medir la creación de proyectos",
+        "beneficiaries": "Nadie",
+        "project_types": ["Educación"],
+        "stages": [{"name": "Etapa 1", "start": "2026-01-01", "end": "2026-02-01"}],
+    }
+    _, sample = work.request('POST /api/proyectos', 'POST', '/api/proyectos', payload,
+                             rng.choice(list(work.tokens.values())))
+    return [sample]
+
+
+SCENARIOS = {
+    'browse': browse_step,
+    'commit': commit_step,
+    'fulfill': fulfill_step,
+    'login': login_step,
+    'project': project_step,
+}
+
+
+def run_scenario(name, step, work, concurrency, requests, seed):
+    """Ejecuta `requests` iteraciones del escenario repartidas en `concurrency` hilos."""
+    samples = []
+    lock = threading.Lock()
+    iterations = count()
+
+    def worker(index):
+        rng = random.Random(f"{seed}:{name}:{index}")
+        while next(iterations) < requests:
+            result = step(work, rng)
+            if result is None:
+                return
+            with lock:
+                samples.extend(result)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples, time.perf_counter() - start
+
+
+def summarize(samples, elapsed):
+    by_label = defaultdict(list)
+    for sample in samples:
+        by_label[sample.label].append(sample)
+    summary = {}
+    for label, group in by_label.items():
+        seconds = [s.seconds for s in group]
+        queries = [s.queries for s in group if s.queries is not None]
+        summary[label] = {
+            "requests": len(group),
+            "error_rate": sum(1 for s in group if s.status == 0 or s.status >= 500) / len(group),
+            "throughput": len(group) / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(seconds, 50) * 1000,
+            "p95_ms": percentile(seconds, 95) * 1000,
+            "p99_ms": percentile(seconds, 99) * 1000,
+            "queries_per_request": sum(queries) / len(queries) if queries else None,
+        }
+    return summary
+
+
+def compare(results, baseline, tolerance):
+    """Lista de regresiones de `results` respecto de `baseline`."""
+    failures = []
+    for scenario, routes in baseline.get('scenarios', {}).items():
+        for label, base in routes.items():
+            current = results.get(scenario, {}).get(label)
+            if current is None:
+                print(f"Aviso: {scenario} / {label} no se ejecutó en esta corrida")
+                continue
+            where = f"{scenario} / {label}"
+            if current['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+                failures.append(f"{where}: p95 {current['p95_ms']:.1f}ms > {base['p95_ms']:.1f}ms (+{tolerance:.0%})")
+            if current['throughput'] < base['throughput'] * (1 - tolerance):
+                failures.append(f"{where}: throughput {current['throughput']:.1f}/s < {base['throughput']:.1f}/s (-{tolerance:.0%})")
+            if (current['queries_per_request'] is not None and base.get('queries_per_request') is not None
+                    and round(current['queries_per_request']) > round(base['queries_per_request'])):
+                failures.append(f"{where}: {current['queries_per_request']:.2f} consultas por petición "
+                                f"(antes {base['queries_per_request']:.2f})")
+            if current['error_rate'] > base['error_rate'] + 0.01:
+                failures.append(f"{where}: tasa de errores {current['error_rate']:.1%} (antes {base['error_rate']:.1%})")
+    return failures
+
+
+def print_report(results):
+    print(f"{'escenario':<9} {'ruta':<36} {'n':>6} {'err':>6} {'req/s':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}")
+    for scenario, routes in results.items():
+        for label, r in routes.items():
+            queries = f"{r['queries_per_request']:.2f}" if r['queries_per_request'] is not None else '-'
+            print(f"{scenario:<9} {label:<36} {r['requests']:>6} {r['error_rate']:>6.1%} {r['throughput']:>8.1f} "
+                  f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {queries:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help="URL base de un servidor ya levantado sobre una base sembrada.")
+    parser.add_argument('--config', default='config.Config', help="Configuración de create_app sin --url.")
+    parser.add_argument('--seed-args', default=DEFAULT_SEED_ARGS, help="Opciones de seed-synthetic si la base está vacía.")
+    parser.add_argument('--password', default='synthetic123', help="Contraseña de las ONGs sembradas.")
+    parser.add_argument('--ongs', type=int, default=8, help="ONGs con sesión iniciada que usan los escenarios.")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help="Escenarios separados por coma.")
+    parser.add_argument('--concurrency', type=int, default=8, help="Hilos por escenario.")
+    parser.add_argument('--requests', type=int, default=500, help="Iteraciones por escenario.")
+    parser.add_argument('--random-seed', default='bench', help="Semilla de las elecciones de cada hilo.")
+    parser.add_argument('--baseline', help="Resultado guardado contra el que comparar.")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Empeoramiento relativo admitido en p95 y throughput.")
+    parser.add_argument('--save-baseline', help="Archivo donde guardar el resultado de esta corrida.")
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios.split(',')) - set(SCENARIOS)
+    if unknown:
+        sys.exit(f"Escenarios desconocidos: {', '.join(sorted(unknown))}")
+
+    server = None
+    base_url = args.url
+    if not base_url:
+        from app import create_app
+        app = create_app(args.config)
+        app.extensions['response_cache'].enabled = False
+        instrument(app)
+        serialize_if_sqlite(app)
+        seed_if_empty(app, args.seed_args)
+        base_url, server = start_local_server(app)
+
+    try:
+        work = Workload(base_url, args.password, args.ongs)
+        results = {}
+        for name in args.scenarios.split(','):
+            samples, elapsed = run_scenario(name, SCENARIOS[name], work, args.concurrency, args.requests, args.random_seed)
+            results[name] = summarize(samples, elapsed)
+    finally:
+        if server:
+            server.shutdown()
+
+    print_report(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({"concurrency": args.concurrency, "requests": args.requests, "scenarios": results}, f, indent=2)
+        print(f"Línea base guardada en {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        failures = compare(results, baseline, args.tolerance)
+        if failures:
+            print(f"\n{len(failures)} REGRESIONES respecto de {args.baseline}:")
+            for failure in failures:
+                print(f"  - {failure}")
+            sys.exit(1)
+        print(f"\nSin regresiones respecto de {args.baseline}.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark: throughput de /auth/login frente a la latencia de las consultas baratas.
+
+Lanza una ráfaga de logins concurrentes y, en paralelo, un flujo constante de
+GET /api/proyectos, e informa logins por segundo, cantidad de 503 (rechazos del
+pool de hashing) y percentiles de latencia de los GET. Sirve para comparar
+configuraciones de PASSWORD_POOL_WORKERS / PASSWORD_POOL_MAX_PENDING /
+PASSWORD_HASH_METHOD.
+
+Uso:
+    python benchmarks/login_vs_api.py --logins 200 --login-concurrency 16
+    python benchmarks/login_vs_api.py --url http://localhost:8000   # contra gunicorn
+
+Sin --url levanta create_app en un servidor local con hilos, usando la base de
+datos configurada en el entorno (DATABASE_URL o DB_*), o SQLite en memoria con
+--config config.TestConfig.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BENCH_ONG = 'bench_login_ong'
+BENCH_PASSWORD = 'bench_login_pass'
+
+
+def request_json(url, payload=None, token=None, method=None):
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(url, data=data, method=method)
+    req.add_header('Content-Type', 'application/json')
+    if token:
+        req.add_header('Authorization', f'Bearer {token}')
+    try:
+        with urllib.request.urlopen(req) as resp:
+            return resp.status, json.loads(resp.read() or b'null')
+    except urllib.error.HTTPError as e:
+        return e.code, None
+
+
+def start_local_server(app):
+    from werkzeug.serving import make_server
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}', server
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help="URL base de un servidor ya levantado.")
+    parser.add_argument('--config', default='config.Config', help="Configuración de create_app sin --url.")
+    parser.add_argument('--logins', type=int, default=200, help="Total de logins de la ráfaga.")
+    parser.add_argument('--login-concurrency', type=int, default=16)
+    parser.add_argument('--api-concurrency', type=int, default=4)
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    if not base_url:
+        from app import create_app
+        base_url, server = start_local_server(create_app(args.config))
+
+    request_json(f'{base_url}/auth/register', {"name": BENCH_ONG, "password": BENCH_PASSWORD})
+    status, body = request_json(f'{base_url}/auth/login', {"name": BENCH_ONG, "password": BENCH_PASSWORD})
+    if status != 200:
+        sys.exit(f"No se pudo iniciar sesión con la ONG de benchmark (HTTP {status})")
+    token = body['access_token']
+
+    stop = threading.Event()
+    api_latencies = []
+
+    def api_loop():
+        while not stop.is_set():
+            start = time.perf_counter()
+            request_json(f'{base_url}/api/proyectos?limit=20', token=token)
+            api_latencies.append(time.perf_counter() - start)
+
+    def login_once(_):
+        return request_json(f'{base_url}/auth/login', {"name": BENCH_ONG, "password": BENCH_PASSWORD})[0]
+
+    api_threads = [threading.Thread(target=api_loop) for _ in range(args.api_concurrency)]
+    for t in api_threads:
+        t.start()
+
+    # Línea base de latencia de los GET sin logins concurrentes
+    time.sleep(2)
+    baseline = list(api_latencies)
+    api_latencies.clear()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.login_concurrency) as pool:
+        statuses = list(pool.map(login_once, range(args.logins)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    for t in api_threads:
+        t.join()
+    if server:
+        server.shutdown()
+
+    ok = statuses.count(200)
+    print(f"Logins: {ok} ok, {statuses.count(503)} rechazados (503), "
+          f"{len(statuses) - ok - statuses.count(503)} otros en {elapsed:.2f}s "
+          f"-> {ok / elapsed:.1f} logins/s")
+    for label, values in (("GET sin carga", baseline), ("GET durante logins", api_latencies)):
+        print(f"{label}: n={len(values)} "
+              f"p50={percentile(values, 50) * 1000:.1f}ms "
+              f"p95={percentile(values, 95) * 1000:.1f}ms "
+              f"p99={percentile(values, 99) * 1000:.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: tiempo de codificación y tamaño de las respuestas según el serializador.
+
+Lee páginas de GET /api/pedidos y GET /api/proyectos desde la base (las mismas
+proyecciones que usan los endpoints) y las codifica repetidas veces con:
+    json       DefaultJSONProvider de Flask (biblioteca estándar), como antes
+    orjson     ApiJSONProvider con JSON_ENCODER='orjson' (app/serialization.py)
+    msgpack    MessagePack, lo que recibe un cliente con `Accept: application/msgpack`
+
+Informa por payload y serializador la mediana y el mínimo del tiempo de
+codificación, los bytes del cuerpo y los bytes comprimidos con gzip (lo que viaja
+si un proxy comprime).
+
+Uso:
+    python benchmarks/serializers.py --config config.TestConfig
+    python benchmarks/serializers.py --rows 500 --repeat 50
+
+Usa la base configurada en el entorno (DATABASE_URL o DB_*), o SQLite en memoria
+con --config config.TestConfig. Si la base no tiene ONGs se siembra antes con
+`seed-synthetic` (--seed-args).
+"""
+import argparse
+import gzip
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from http_suite import DEFAULT_SEED_ARGS, seed_if_empty
+
+
+def load_payloads(rows):
+    """Listas de dicts como las que serializan los endpoints de listado."""
+    from app.queries import fetch_all, pedidos_list_query, projects_query
+    from app.models import PedidoColaboracion, ProjectDefinition
+
+    return {
+        'pedidos': fetch_all(
+            pedidos_list_query().order_by(PedidoColaboracion.created_at.desc(), PedidoColaboracion.id.desc()).limit(rows)
+        ),
+        'proyectos': fetch_all(
+            projects_query().order_by(ProjectDefinition.created_at.desc(), ProjectDefinition.id.desc()).limit(rows)
+        ),
+    }
+
+
+def encoders(app):
+    """{nombre: función que devuelve los bytes del cuerpo}, igual que en una respuesta."""
+    import msgpack
+    from flask.json.provider import DefaultJSONProvider
+    from app.serialization import ApiJSONProvider
+
+    standard = DefaultJSONProvider(app)
+    fast = ApiJSONProvider(app)
+    fast.use_orjson = True
+    return {
+        # DefaultJSONProvider.response usa separadores compactos fuera del modo debug
+        'json': lambda obj: standard.dumps(obj, separators=(',', ':')).encode(),
+        'orjson': fast._dumpb,
+        'msgpack': lambda obj: msgpack.packb(obj, default=fast.default, use_bin_type=True),
+    }
+
+
+def measure(encode, obj, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = encode(obj)
+        timings.append(time.perf_counter() - start)
+    return timings, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--config', default='config.Config', help="Configuración de create_app.")
+    parser.add_argument('--rows', type=int, default=500, help="Filas por payload (API_MAX_PAGE_SIZE por defecto es 500).")
+    parser.add_argument('--repeat', type=int, default=30, help="Codificaciones por payload y serializador.")
+    parser.add_argument('--seed-args', default=DEFAULT_SEED_ARGS, help="Argumentos de seed-synthetic si la base está vacía.")
+    args = parser.parse_args()
+
+    from app import create_app
+
+    app = create_app(args.config)
+    seed_if_empty(app, args.seed_args)
+
+    with app.app_context():
+        payloads = load_payloads(args.rows)
+        candidates = encoders(app)
+
+    print(f"{'payload':<10} {'serializador':<12} {'filas':>6} {'mediana ms':>11} {'mín ms':>8} "
+          f"{'bytes':>9} {'gzip':>8} {'vs json':>8}")
+    for payload_name, obj in payloads.items():
+        baseline = None
+        for name, encode in candidates.items():
+            timings, body = measure(encode, obj, args.repeat)
+            median = statistics.median(timings)
+            baseline = baseline or median
+            print(f"{payload_name:<10} {name:<12} {len(obj):>6} {median * 1000:>11.2f} {min(timings) * 1000:>8.2f} "
+                  f"{len(body):>9} {len(gzip.compress(body)):>8} {baseline / median:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,123 @@
 # config.py
 import os
+from datetime import timedelta
 from dotenv import load_dotenv
+from sqlalchemy.pool import StaticPool
 
 load_dotenv()
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY')
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY')
+    # Tokens de acceso cortos; el de refresco evita repetir el login (y su hash) al vencer
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=int(os.environ.get('JWT_ACCESS_TOKEN_MINUTES', 15)))
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=int(os.environ.get('JWT_REFRESH_TOKEN_DAYS', 30)))
+
+    # Filtro de Bloom de tokens revocados (por worker) y cada cuánto se sincroniza con la tabla
+    JWT_REVOCATION_BLOOM_BITS = int(os.environ.get('JWT_REVOCATION_BLOOM_BITS', 1 << 20))
+    JWT_REVOCATION_BLOOM_HASHES = int(os.environ.get('JWT_REVOCATION_BLOOM_HASHES', 7))
+    JWT_REVOCATION_BLOOM_CAPACITY = int(os.environ.get('JWT_REVOCATION_BLOOM_CAPACITY', 100000))
+    JWT_REVOCATION_SYNC_SECONDS = float(os.environ.get('JWT_REVOCATION_SYNC_SECONDS', 5))
+
+    # Caché por worker de la identidad (id, nombre) de la ONG autenticada
+    IDENTITY_CACHE_TTL = int(os.environ.get('IDENTITY_CACHE_TTL', 60))
+    IDENTITY_CACHE_MAX_ENTRIES = int(os.environ.get('IDENTITY_CACHE_MAX_ENTRIES', 10000))
 
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', '').replace(
         'postgres://', 'postgresql://') or \
         f"postgresql://{os.environ.get('DB_USER')}:{os.environ.get('DB_PASSWORD')}@{os.environ.get('DB_HOST')}/{os.environ.get('DB_NAME')}"
     
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Pool de conexiones por worker (ver app/db_pool.py). Sin DB_POOL_SIZE/DB_MAX_OVERFLOW
+    # el tamaño se deduce de la clase de worker de gunicorn.
+    GUNICORN_WORKER_CLASS = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+    GUNICORN_THREADS = int(os.environ.get('GUNICORN_THREADS', 1))
+    DB_POOL_SIZE = int(os.environ['DB_POOL_SIZE']) if os.environ.get('DB_POOL_SIZE') else None
+    DB_MAX_OVERFLOW = int(os.environ['DB_MAX_OVERFLOW']) if os.environ.get('DB_MAX_OVERFLOW') else None
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 15000))
+    # Conexión a través de pgbouncer en modo transacción
+    DB_PGBOUNCER_MODE = os.environ.get('DB_PGBOUNCER_MODE', '0') == '1'
+
+    # Paginación de los listados: tamaño de página por defecto y máximo permitido
+    API_PAGE_SIZE = int(os.environ.get('API_PAGE_SIZE', 100))
+    API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', 500))
+
+    # Filas leídas por lote del cursor del servidor en las respuestas en streaming
+    STREAM_BATCH_SIZE = int(os.environ.get('STREAM_BATCH_SIZE', 1000))
+
+    # Cantidad máxima de ítems aceptados por los endpoints de escritura en lote
+    BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', 500))
+
+    # Caché de respuestas de lectura: 'memory' (LRU por worker) o 'redis' (compartido)
+    RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', '1') == '1'
+    RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory')
+    RESPONSE_CACHE_REDIS_URL = os.environ.get('RESPONSE_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 30))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 512))
+
+    # Hashing de contraseñas: costo del hash y pool de procesos por worker
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:1000000')
+    PASSWORD_POOL_WORKERS = int(os.environ.get('PASSWORD_POOL_WORKERS', 2))
+    PASSWORD_POOL_MAX_PENDING = int(os.environ.get('PASSWORD_POOL_MAX_PENDING', 8))
+    PASSWORD_POOL_TIMEOUT = float(os.environ.get('PASSWORD_POOL_TIMEOUT', 10))
+
+    # Stream de eventos de pedidos (SSE). Cada cliente ocupa un hilo durante toda la
+    # conexión: con workers `sync` de un solo hilo el endpoint queda deshabilitado
+    SSE_ENABLED = os.environ.get(
+        'SSE_ENABLED', str(GUNICORN_WORKER_CLASS != 'sync' or GUNICORN_THREADS > 1)
+    ).lower() in ('1', 'true', 'yes')
+    # Duración máxima de cada conexión, intervalo de keepalive/relectura, espera de
+    # reconexión sugerida, eventos por consulta y margen de relectura (mayor que la
+    # transacción de escritura más larga, como SYNC_OVERLAP_SECONDS)
+    SSE_MAX_SECONDS = float(os.environ.get('SSE_MAX_SECONDS', 25))
+    SSE_HEARTBEAT_SECONDS = float(os.environ.get('SSE_HEARTBEAT_SECONDS', 10))
+    SSE_RETRY_MS = int(os.environ.get('SSE_RETRY_MS', 1000))
+    SSE_BATCH_SIZE = int(os.environ.get('SSE_BATCH_SIZE', 200))
+    SSE_OVERLAP_SECONDS = float(os.environ.get('SSE_OVERLAP_SECONDS', 5))
+
+    # Sincronización incremental (GET /api/sync): margen de solapamiento del token
+    # (mayor que la transacción de escritura más larga) y retención de las lápidas
+    SYNC_OVERLAP_SECONDS = float(os.environ.get('SYNC_OVERLAP_SECONDS', 5))
+    SYNC_TOMBSTONE_DAYS = int(os.environ.get('SYNC_TOMBSTONE_DAYS', 30))
+
+    # Serialización de las respuestas: 'orjson' (rápido) o 'json' (biblioteca estándar),
+    # y MessagePack para los clientes que envían `Accept: application/msgpack`
+    JSON_ENCODER = os.environ.get('JSON_ENCODER', 'orjson')
+    MSGPACK_ENABLED = os.environ.get('MSGPACK_ENABLED', '1') == '1'
+
+    # Token que exigen /metrics y /monitoring/pool (`Authorization: Bearer ...`);
+    # sin configurar, esos endpoints responden 404
+    MONITORING_TOKEN = os.environ.get('MONITORING_TOKEN')
+
+    # Instrumentación por petición: cabecera Server-Timing y log de peticiones lentas
+    SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', '1') == '1'
+    SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 500))
+    SLOW_REQUEST_SAMPLE_RATE = float(os.environ.get('SLOW_REQUEST_SAMPLE_RATE', 1.0))
+    SLOW_REQUEST_MAX_STATEMENTS = int(os.environ.get('SLOW_REQUEST_MAX_STATEMENTS', 20))
+
+
+class TestConfig(Config):
+    """
+    Configuración para pruebas, perfilado y benchmarks sin servidor de base de datos:
+    SQLite en memoria compartido entre hilos, con el esquema creado al iniciar la app.
+    """
+    TESTING = True
+    SECRET_KEY = 'test-secret-key'
+    JWT_SECRET_KEY = 'test-jwt-secret-key-de-al-menos-32-bytes'
+
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    # Una única conexión para que todos los hilos vean la misma base en memoria
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'poolclass': StaticPool,
+        'connect_args': {'check_same_thread': False},
+    }
+    SQLALCHEMY_CREATE_ALL = True
+
+    SSE_ENABLED = True
+
+    # El hashing corre en el mismo proceso y con un costo bajo
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+    PASSWORD_POOL_WORKERS = 0
@@ -10,4 +10,12 @@ echo "Sembrando la base de datos..."
 poetry run flask seed-db
 
 echo "Iniciando el servidor Gunicorn..."
-exec gunicorn wsgi:app -b 0.0.0.0:${PORT:-8000}
+# Directorio compartido de métricas de Prometheus entre workers; se vacía en cada
+# arranque para no mezclar valores de una ejecución anterior
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus_multiproc}
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+# La clase de worker y los hilos también definen el tamaño del pool de conexiones (app/db_pool.py)
+exec gunicorn wsgi:app -c gunicorn.conf.py -b 0.0.0.0:${PORT:-8000} \
+    -k ${GUNICORN_WORKER_CLASS:-sync} --threads ${GUNICORN_THREADS:-1}
@@ -0,0 +1,13 @@
+"""
+Configuración de gunicorn (entrypoint.sh la carga con -c).
+
+Las métricas de Prometheus de cada worker quedan en PROMETHEUS_MULTIPROC_DIR;
+cuando un worker termina se descartan sus gauges para que no sigan sumando en
+`/metrics`. Los contadores e histogramas se conservan, así los totales no
+retroceden al reiniciarse un worker.
+"""
+from prometheus_client import multiprocess
+
+
+def child_exit(server, worker):
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,42 @@
+"""Foreign key indexes
+
+Revision ID: 0d9b2c248e7f
+Revises: eed0d615ed6d
+Create Date: 2026-10-18 12:20:44.318207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0d9b2c248e7f'
+down_revision = 'eed0d615ed6d'
+branch_labels = None
+depends_on = None
+
+# (nombre, tabla, columnas). pedidos_colaboracion.status y project_definitions.created_at
+# ya están cubiertos por los índices compuestos de la migración a9f66b1f4778.
+INDEXES = [
+    ('ix_pedidos_colaboracion_coverage_plan_id', 'pedidos_colaboracion', ['coverage_plan_id']),
+    ('ix_compromisos_pedido_id', 'compromisos', ['pedido_id']),
+    ('ix_compromisos_ong_id', 'compromisos', ['ong_id']),
+    ('ix_coverage_plans_project_id', 'coverage_plans', ['project_id']),
+    ('ix_work_plans_project_id', 'work_plans', ['project_id']),
+    ('ix_project_definitions_creador_ong_id', 'project_definitions', ['creador_ong_id']),
+]
+
+
+def upgrade():
+    # En Postgres CREATE INDEX CONCURRENTLY no bloquea las escrituras, pero no puede
+    # correr dentro de una transacción; en otros dialectos la opción se ignora.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True,
+                            postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,84 @@
+"""Full text search
+
+Revision ID: 4918b702c614
+Revises: 0d9b2c248e7f
+Create Date: 2026-10-18 13:05:12.604187
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4918b702c614'
+down_revision = '0d9b2c248e7f'
+branch_labels = None
+depends_on = None
+
+PROJECT_VECTOR = (
+    "setweight(to_tsvector('spanish', coalesce(project_name, '')), 'A') || "
+    "setweight(to_tsvector('spanish', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('spanish', coalesce(objectives, '')), 'C') || "
+    "setweight(to_tsvector('spanish', coalesce(beneficiaries, '')), 'C')"
+)
+PEDIDO_VECTOR = (
+    "setweight(to_tsvector('spanish', coalesce(request_type, '')), 'A') || "
+    "setweight(to_tsvector('spanish', coalesce(description, '')), 'B')"
+)
+
+# SQLite: (tabla FTS5, tabla de origen, columnas indexadas, título, cuerpo)
+FTS_SOURCES = [
+    ('project_search', 'project_definitions', 'project_name, description, objectives, beneficiaries',
+     'project_name', "coalesce({p}.description, '') || ' ' || coalesce({p}.objectives, '') || ' ' || coalesce({p}.beneficiaries, '')"),
+    ('pedido_search', 'pedidos_colaboracion', 'request_type, description',
+     'request_type', "coalesce({p}.description, '')"),
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        # La columna generada se recalcula sola en cada INSERT/UPDATE. Agregarla
+        # reescribe la tabla; el índice se crea sin bloquear las escrituras.
+        op.execute(f"ALTER TABLE project_definitions ADD COLUMN search_vector tsvector "
+                   f"GENERATED ALWAYS AS ({PROJECT_VECTOR}) STORED")
+        op.execute(f"ALTER TABLE pedidos_colaboracion ADD COLUMN search_vector tsvector "
+                   f"GENERATED ALWAYS AS ({PEDIDO_VECTOR}) STORED")
+        with op.get_context().autocommit_block():
+            op.create_index('ix_project_definitions_search_vector', 'project_definitions', ['search_vector'],
+                            postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+            op.create_index('ix_pedidos_colaboracion_search_vector', 'pedidos_colaboracion', ['search_vector'],
+                            postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+
+    elif dialect == 'sqlite':
+        for fts, table, indexed, title, body in FTS_SOURCES:
+            insert = (f"INSERT INTO {fts} (rowid, title, body) "
+                      f"VALUES (new.id, new.{title}, {body.format(p='new')});")
+            delete = f"DELETE FROM {fts} WHERE rowid = old.id;"
+            op.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5("
+                       f"title, body, tokenize = 'unicode61 remove_diacritics 2')")
+            op.execute(f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END")
+            op.execute(f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {indexed} ON {table} BEGIN {delete} {insert} END")
+            op.execute(f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN {delete} END")
+            op.execute(f"INSERT INTO {fts} (rowid, title, body) "
+                       f"SELECT id, {title}, {body.format(p=table)} FROM {table}")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index('ix_pedidos_colaboracion_search_vector', table_name='pedidos_colaboracion',
+                          postgresql_concurrently=True, if_exists=True)
+            op.drop_index('ix_project_definitions_search_vector', table_name='project_definitions',
+                          postgresql_concurrently=True, if_exists=True)
+        op.execute("ALTER TABLE pedidos_colaboracion DROP COLUMN search_vector")
+        op.execute("ALTER TABLE project_definitions DROP COLUMN search_vector")
+
+    elif dialect == 'sqlite':
+        for fts, table, *_ in reversed(FTS_SOURCES):
+            for suffix in ('ad', 'au', 'ai'):
+                op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {fts}")
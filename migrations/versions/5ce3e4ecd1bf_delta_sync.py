@@ -0,0 +1,68 @@
+"""Delta sync
+
+Revision ID: 5ce3e4ecd1bf
+Revises: 71690bdc8dd3
+Create Date: 2026-10-18 15:20:41.318402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5ce3e4ecd1bf'
+down_revision = '71690bdc8dd3'
+branch_labels = None
+depends_on = None
+
+# (tabla, índice de updated_at, columna con la que se completan las filas existentes)
+SYNC_TABLES = [
+    ('project_definitions', 'ix_project_definitions_updated_at_id', 'created_at'),
+    ('pedidos_colaboracion', 'ix_pedidos_updated_at_id', 'created_at'),
+    ('compromisos', 'ix_compromisos_updated_at_id', None),
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        # Con un DEFAULT no volátil, ADD COLUMN no reescribe la tabla: las filas
+        # existentes quedan con la fecha de la migración. Después el valor lo pone la app.
+        for table, _, _ in SYNC_TABLES:
+            op.execute(f"ALTER TABLE {table} ADD COLUMN updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now()")
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN updated_at DROP DEFAULT")
+        with op.get_context().autocommit_block():
+            for table, index, _ in SYNC_TABLES:
+                op.create_index(index, table, ['updated_at', 'id'],
+                                postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for table, index, source in SYNC_TABLES:
+            with op.batch_alter_table(table, schema=None) as batch_op:
+                batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+            fallback = f"COALESCE({source}, CURRENT_TIMESTAMP)" if source else "CURRENT_TIMESTAMP"
+            op.execute(f"UPDATE {table} SET updated_at = {fallback}")
+            with op.batch_alter_table(table, schema=None) as batch_op:
+                batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+                batch_op.create_index(index, ['updated_at', 'id'], unique=False)
+
+    op.create_table('tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('resource', sa.String(length=20), nullable=False),
+    sa.Column('row_id', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('tombstones', schema=None) as batch_op:
+        batch_op.create_index('ix_tombstones_deleted_at_id', ['deleted_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tombstones', schema=None) as batch_op:
+        batch_op.drop_index('ix_tombstones_deleted_at_id')
+    op.drop_table('tombstones')
+
+    for table, index, _ in reversed(SYNC_TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(index)
+            batch_op.drop_column('updated_at')
@@ -0,0 +1,41 @@
+"""Coverage totals
+
+Revision ID: 9f9e83df76fe
+Revises: a9f66b1f4778
+Create Date: 2026-10-18 11:03:17.502981
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9f9e83df76fe'
+down_revision = 'a9f66b1f4778'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('pedidos_colaboracion', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('amount_committed_total', sa.Float(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('amount_fulfilled_total', sa.Float(), server_default='0', nullable=False))
+
+    # Cargamos los totales de los compromisos existentes y marcamos los pedidos ya cubiertos
+    op.execute(
+        "UPDATE pedidos_colaboracion SET "
+        "amount_committed_total = COALESCE((SELECT SUM(compromisos.amount_committed) FROM compromisos "
+        "WHERE compromisos.pedido_id = pedidos_colaboracion.id), 0), "
+        "amount_fulfilled_total = COALESCE((SELECT SUM(compromisos.amount_committed) FROM compromisos "
+        "WHERE compromisos.pedido_id = pedidos_colaboracion.id AND compromisos.status = 'fulfilled'), 0)"
+    )
+    op.execute(
+        "UPDATE pedidos_colaboracion SET status = 'covered' "
+        "WHERE amount_committed_total > 0 AND amount_committed_total >= COALESCE(amount_requested, 0)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('pedidos_colaboracion', schema=None) as batch_op:
+        batch_op.drop_column('amount_fulfilled_total')
+        batch_op.drop_column('amount_committed_total')
@@ -0,0 +1,53 @@
+"""Keyset pagination
+
+Revision ID: a9f66b1f4778
+Revises: 1800c7f0b5d9
+Create Date: 2026-10-18 10:12:40.118452
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9f66b1f4778'
+down_revision = '1800c7f0b5d9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('pedidos_colaboracion', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('created_at', sa.DateTime(), nullable=True))
+
+    # Los pedidos existentes toman la fecha de su plan de cobertura; el cursor
+    # necesita que created_at no sea nulo en ninguna fila.
+    op.execute(
+        "UPDATE pedidos_colaboracion SET created_at = ("
+        "SELECT coverage_plans.created_at FROM coverage_plans "
+        "WHERE coverage_plans.id = pedidos_colaboracion.coverage_plan_id) "
+        "WHERE created_at IS NULL"
+    )
+    op.execute("UPDATE pedidos_colaboracion SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    op.execute("UPDATE project_definitions SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+
+    with op.batch_alter_table('pedidos_colaboracion', schema=None) as batch_op:
+        batch_op.create_index('ix_pedidos_status_created_at_id', ['status', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_pedidos_request_type_status_created_at_id', ['request_type', 'status', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('project_definitions', schema=None) as batch_op:
+        batch_op.create_index('ix_project_definitions_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_project_definitions_country_created_at_id', ['country', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_project_definitions_project_types', ['project_types'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    with op.batch_alter_table('project_definitions', schema=None) as batch_op:
+        batch_op.drop_index('ix_project_definitions_project_types', postgresql_using='gin')
+        batch_op.drop_index('ix_project_definitions_country_created_at_id')
+        batch_op.drop_index('ix_project_definitions_created_at_id')
+
+    with op.batch_alter_table('pedidos_colaboracion', schema=None) as batch_op:
+        batch_op.drop_index('ix_pedidos_request_type_status_created_at_id')
+        batch_op.drop_index('ix_pedidos_status_created_at_id')
+        batch_op.drop_column('created_at')
@@ -0,0 +1,52 @@
+"""Facet counts
+
+Revision ID: c3a81f5e02d7
+Revises: 5ce3e4ecd1bf
+Create Date: 2026-10-18 16:42:09.511873
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3a81f5e02d7'
+down_revision = '5ce3e4ecd1bf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('facet_counts',
+    sa.Column('facet', sa.String(length=30), nullable=False),
+    sa.Column('value', sa.String(length=255), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('facet', 'value')
+    )
+
+    # Conteos iniciales desde los datos existentes (después los mantiene la app, ver app/facets.py)
+    if op.get_bind().dialect.name == 'postgresql':
+        project_types = (
+            "SELECT 'project_type', t.value, count(DISTINCT p.id) "
+            "FROM project_definitions p CROSS JOIN unnest(p.project_types) AS t(value) "
+            "WHERE t.value IS NOT NULL GROUP BY t.value"
+        )
+    else:
+        project_types = (
+            "SELECT 'project_type', t.value, count(DISTINCT p.id) "
+            "FROM project_definitions p JOIN json_each(p.project_types) AS t "
+            "WHERE t.value IS NOT NULL GROUP BY t.value"
+        )
+    op.execute(
+        "INSERT INTO facet_counts (facet, value, count) "
+        "SELECT 'country', country, count(*) FROM project_definitions GROUP BY country"
+    )
+    op.execute(f"INSERT INTO facet_counts (facet, value, count) {project_types}")
+    op.execute(
+        "INSERT INTO facet_counts (facet, value, count) "
+        "SELECT 'request_type', request_type, count(*) FROM pedidos_colaboracion GROUP BY request_type"
+    )
+
+
+def downgrade():
+    op.drop_table('facet_counts')
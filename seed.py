@@ -1,9 +1,21 @@
+import csv
+import io
+import json
+import random
+import time
+from array import array
+from itertools import accumulate, islice
+
 import click
 from flask.cli import with_appcontext
-from app import db
+from sqlalchemy import JSON, Boolean, func, insert, select, text
+from app import db, password_hasher
 from app.models import ONG, ProjectDefinition, WorkPlan, CoveragePlan, PedidoColaboracion, Compromiso
+from app.models.types import StringArray
+from app.coverage_totals import reconcile_totals
+from app.facets import rebuild_facets
 from werkzeug.security import generate_password_hash
-from datetime import datetime
+from datetime import datetime, timedelta
 
 @click.command('seed-db')
 @with_appcontext
@@ -41,4 +53,256 @@ def seed_db_command():
 
     except Exception as e:
         db.session.rollback()
-        print(f"Error al sembrar la base de datos: {e}")
\ No newline at end of file
+        print(f"Error al sembrar la base de datos: {e}")
+
+# --- Datos sintéticos a escala de producción -----------------------------------
+
+SYNTHETIC_COUNTRIES = ['Argentina', 'Bolivia', 'Chile', 'Colombia', 'Perú', 'Uruguay', 'Paraguay', 'México']
+SYNTHETIC_COUNTRY_WEIGHTS = [30, 10, 12, 15, 12, 6, 5, 10]
+SYNTHETIC_REQUEST_TYPES = ['económica', 'materiales', 'mano de obra', 'equipamiento', 'asesoramiento tecnico']
+SYNTHETIC_PROJECT_TYPES = ['Educación', 'Salud', 'Agua', 'Vivienda', 'Alimentación', 'Medio ambiente', 'Infancia']
+SYNTHETIC_ACTIVITIES = ['Construcción', 'Reparación', 'Equipamiento', 'Ampliación', 'Mantenimiento', 'Capacitación']
+SYNTHETIC_PLACES = ['escuela rural', 'comedor comunitario', 'centro de salud', 'biblioteca popular',
+                    'huerta comunitaria', 'red de agua potable', 'salón barrial']
+SYNTHETIC_GROUPS = ['niños y niñas', 'familias del barrio', 'adultos mayores', 'mujeres emprendedoras',
+                    'jóvenes', 'productores locales']
+SYNTHETIC_SPAN = timedelta(days=365)
+
+
+def _skewed_picker(rng, population, exponent):
+    """
+    Elige elementos de `population` con frecuencias tipo Zipf (unos pocos muy
+    frecuentes y una cola larga). Cuáles son los "calientes" se sortea, así no
+    coinciden siempre con los ids más bajos.
+    """
+    ranked = list(population)
+    rng.shuffle(ranked)
+    cum_weights = list(accumulate(1 / rank ** exponent for rank in range(1, len(ranked) + 1)))
+    return lambda k: rng.choices(ranked, cum_weights=cum_weights, k=k)
+
+
+def _copy_converter(column_type):
+    if isinstance(column_type, StringArray):
+        return lambda v: None if v is None else '{' + ','.join(
+            '"' + item.replace('\\', '\\\\').replace('"', '\\"') + '"' for item in v) + '}'
+    if isinstance(column_type, JSON):
+        return lambda v: None if v is None else json.dumps(v)
+    if isinstance(column_type, Boolean):
+        return lambda v: None if v is None else ('t' if v else 'f')
+    return lambda v: v
+
+
+def _copy_batch(conn, table, columns, batch):
+    """Carga un lote con COPY ... FROM STDIN en formato CSV (None queda como NULL)."""
+    converters = [_copy_converter(table.c[name].type) for name in columns]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in batch:
+        writer.writerow([convert(value) for convert, value in zip(converters, row)])
+    buffer.seek(0)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def _insert_rows(model, columns, rows, batch_size):
+    """
+    Inserta las filas (tuplas en el orden de `columns`) por lotes y confirma al
+    final: COPY en Postgres, INSERT en lote en los demás dialectos.
+    Devuelve la cantidad de filas insertadas.
+    """
+    table = model.__table__
+    conn = db.session.connection()
+    use_copy = conn.dialect.name == 'postgresql'
+    rows = iter(rows)
+    total = 0
+    while batch := list(islice(rows, batch_size)):
+        if use_copy:
+            _copy_batch(conn, table, columns, batch)
+        else:
+            conn.execute(insert(table), [dict(zip(columns, row)) for row in batch])
+        total += len(batch)
+    db.session.commit()
+    return total
+
+
+def _next_id(model):
+    return db.session.execute(select(func.coalesce(func.max(model.id), 0))).scalar()
+
+
+def _reset_sequences(models):
+    """Con ids explícitos las secuencias de Postgres no avanzan solas."""
+    if db.engine.dialect.name != 'postgresql':
+        return
+    for model in models:
+        table = model.__tablename__
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+        ))
+    db.session.commit()
+
+
+@click.command('seed-synthetic')
+@click.option('--ongs', default=1000, show_default=True, help="ONGs a crear.")
+@click.option('--projects', default=10000, show_default=True, help="Proyectos (cada uno con plan de trabajo y de cobertura).")
+@click.option('--pedidos', default=100000, show_default=True, help="Pedidos de colaboración.")
+@click.option('--compromisos', default=300000, show_default=True, help="Compromisos.")
+@click.option('--seed', default=42, show_default=True, help="Semilla: la misma semilla genera los mismos datos.")
+@click.option('--skew', default=1.1, show_default=True, help="Exponente Zipf de la concentración en proyectos, pedidos y ONGs calientes.")
+@click.option('--batch-size', default=5000, show_default=True, help="Filas por lote de COPY/INSERT.")
+@click.option('--password', default='synthetic123', show_default=True, help="Contraseña de todas las ONGs sintéticas.")
+@with_appcontext
+def seed_synthetic_command(ongs, projects, pedidos, compromisos, seed, skew, batch_size, password):
+    """Genera datos sintéticos con distribución realista para pruebas de rendimiento."""
+    if ongs < 2 or projects < 1 or (compromisos and not pedidos):
+        raise click.BadParameter("Se necesitan al menos 2 ONGs, 1 proyecto y pedidos si hay compromisos")
+
+    # Los ids se asignan explícitamente a continuación de los existentes, así las
+    # relaciones se arman sin leer nada de vuelta y se puede sembrar varias veces.
+    ong_base, project_base, work_plan_base, coverage_base, pedido_base, compromiso_base = (
+        _next_id(model) for model in (ONG, ProjectDefinition, WorkPlan, CoveragePlan, PedidoColaboracion, Compromiso)
+    )
+    # Un único hash para todas: calcular PBKDF2 por fila dominaría el tiempo total
+    password_hash = password_hasher.hash(password)
+    seeded_at = datetime.now()
+    start = seeded_at - SYNTHETIC_SPAN
+
+    def project_created_at(i):
+        # Fechas crecientes con el id, como en una base real
+        return start + SYNTHETIC_SPAN * (i / projects)
+
+    def ong_name(ong_id):
+        return f"ong_sintetica_{ong_id}"
+
+    # ONGs que crean muchos proyectos y ONGs que colaboran mucho
+    owner_rng = random.Random(f"{seed}:owners")
+    owners = array('l', _skewed_picker(owner_rng, range(ong_base + 1, ong_base + ongs + 1), skew)(projects))
+
+    def ong_rows():
+        for ong_id in range(ong_base + 1, ong_base + ongs + 1):
+            yield ong_id, ong_name(ong_id), password_hash
+
+    def project_rows():
+        rng = random.Random(f"{seed}:projects")
+        for i in range(projects):
+            activity = rng.choice(SYNTHETIC_ACTIVITIES)
+            place = rng.choice(SYNTHETIC_PLACES)
+            group = rng.choice(SYNTHETIC_GROUPS)
+            yield (
+                project_base + 1 + i,
+                f"{activity} en {place} {i + 1}",
+                ong_name(owners[i]),
+                f"Proyecto de {activity.lower()} en {place} que atiende a {group}.",
+                rng.choices(SYNTHETIC_COUNTRIES, weights=SYNTHETIC_COUNTRY_WEIGHTS)[0],
+                f"Localidad {rng.randint(1, 500)}",
+                rng.sample(SYNTHETIC_PROJECT_TYPES, rng.randint(1, 3)),
+                round(rng.lognormvariate(9, 1), 2),
+                rng.randint(1, 36),
+                f"Mejorar las condiciones de trabajo en {place}.",
+                f"{rng.randint(10, 2000)} {group}",
+                project_created_at(i),
+                project_created_at(i),
+                owners[i],
+            )
+
+    def work_plan_rows():
+        for i in range(projects):
+            created_at = project_created_at(i)
+            stages = [{
+                "name": f"Etapa {n + 1}",
+                "start": (created_at + timedelta(days=30 * n)).date().isoformat(),
+                "end": (created_at + timedelta(days=30 * (n + 1))).date().isoformat(),
+                "activities": "Actividades de la etapa",
+                "resources": "Recursos de la etapa",
+            } for n in range(3)]
+            yield (work_plan_base + 1 + i, project_base + 1 + i, stages, "Informe mensual",
+                   "Riesgo climático", "Avance de obra", True, created_at)
+
+    def coverage_plan_rows():
+        for i in range(projects):
+            yield (coverage_base + 1 + i, project_base + 1 + i, "Pedidos a la red de ONGs",
+                   [ong_name(owners[i])], None, project_created_at(i))
+
+    # Proyectos calientes concentran la mayoría de los pedidos. Se ordenan para que
+    # los ids de pedido crezcan con la fecha de su proyecto.
+    pedido_rng = random.Random(f"{seed}:pedidos")
+    pedido_projects = array('l', sorted(_skewed_picker(pedido_rng, range(projects), skew)(pedidos)))
+    pedido_amounts = array('d')
+
+    def pedido_rows():
+        for j, i in enumerate(pedido_projects):
+            amount = round(pedido_rng.lognormvariate(7, 1.2), 2)
+            pedido_amounts.append(amount)
+            created_at = min(project_created_at(i) + timedelta(minutes=pedido_rng.randint(0, 60 * 24 * 30)),
+                             datetime.now())
+            yield (
+                pedido_base + 1 + j,
+                pedido_rng.choice(SYNTHETIC_REQUEST_TYPES),
+                f"Necesitamos {pedido_rng.choice(['fondos', 'materiales', 'voluntarios', 'herramientas', 'asesoría'])} "
+                f"para el proyecto {project_base + 1 + i}.",
+                amount,
+                'open',
+                0,
+                0,
+                created_at,
+                created_at,
+                coverage_base + 1 + i,
+            )
+
+    def compromiso_rows():
+        rng = random.Random(f"{seed}:compromisos")
+        pick_pedido = _skewed_picker(rng, range(pedidos), skew)
+        pick_ong = _skewed_picker(rng, range(ong_base + 1, ong_base + ongs + 1), skew)
+        compromiso_id = compromiso_base
+        remaining = compromisos
+        while remaining:
+            k = min(batch_size, remaining)
+            remaining -= k
+            for j, ong_id in zip(pick_pedido(k), pick_ong(k)):
+                # Una ONG no se compromete con pedidos de sus propios proyectos
+                if ong_id == owners[pedido_projects[j]]:
+                    ong_id = ong_base + 1 + (ong_id - ong_base) % ongs
+                amount = round(pedido_amounts[j] * rng.uniform(0.05, 0.6), 2)
+                compromiso_id += 1
+                yield (compromiso_id, pedido_base + 1 + j, ong_id, f"Podemos cubrir {amount:.0f}",
+                       amount, 'fulfilled' if rng.random() < 0.4 else 'pending', seeded_at)
+
+    steps = [
+        (ONG, ('id', 'name', 'password'), ong_rows),
+        (ProjectDefinition, ('id', 'project_name', 'ong_name', 'description', 'country', 'location',
+                             'project_types', 'budget', 'duration', 'objectives', 'beneficiaries',
+                             'created_at', 'updated_at', 'creador_ong_id'), project_rows),
+        (WorkPlan, ('id', 'project_id', 'stages', 'monitoring_plan', 'risk_analysis',
+                    'success_indicators', 'terms_accepted', 'created_at'), work_plan_rows),
+        (CoveragePlan, ('id', 'project_id', 'strategy', 'organizations', 'notes', 'created_at'), coverage_plan_rows),
+        (PedidoColaboracion, ('id', 'request_type', 'description', 'amount_requested', 'status',
+                              'amount_committed_total', 'amount_fulfilled_total', 'created_at',
+                              'updated_at', 'coverage_plan_id'), pedido_rows),
+        (Compromiso, ('id', 'pedido_id', 'ong_id', 'details', 'amount_committed', 'status', 'updated_at'),
+         compromiso_rows),
+    ]
+
+    try:
+        for model, columns, rows in steps:
+            began = time.perf_counter()
+            count = _insert_rows(model, columns, rows(), batch_size)
+            print(f"{model.__tablename__}: {count} filas en {time.perf_counter() - began:.1f}s")
+
+        _reset_sequences(model for model, _, _ in steps)
+
+        # Totales de cobertura y estado coherentes con los compromisos generados
+        began = time.perf_counter()
+        processed = reconcile_totals(batch_size, min_id=pedido_base)
+        print(f"Totales de cobertura de {processed} pedidos en {time.perf_counter() - began:.1f}s")
+
+        # Los datos se cargan sin pasar por las rutas: los conteos por faceta se recalculan
+        began = time.perf_counter()
+        facets = rebuild_facets()
+        print(f"Conteos por faceta ({facets} valores) en {time.perf_counter() - began:.1f}s")
+    except Exception as e:
+        db.session.rollback()
+        raise click.ClickException(f"Error al generar los datos sintéticos: {e}")
+
+    print(f"Datos sintéticos generados (semilla {seed}). Contraseña de las ONGs: '{password}'")
@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import event
+
+from app import create_app, db
+from config import TestConfig
+
+
+class QueryCountConfig(TestConfig):
+    """TestConfig sin nada que oculte o agregue consultas entre una petición y otra."""
+    RESPONSE_CACHE_ENABLED = False
+    JWT_REVOCATION_SYNC_SECONDS = 3600
+
+
+class StatementCounter:
+    """Listener de `before_cursor_execute` que cuenta las sentencias ejecutadas."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+@pytest.fixture
+def app():
+    app = create_app(QueryCountConfig)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def statements(app):
+    counter = StatementCounter()
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', counter)
+    yield counter
+    event.remove(engine, 'before_cursor_execute', counter)
+
+
+@pytest.fixture
+def login(client):
+    """Registra una ONG e inicia sesión; devuelve las cabeceras con su token."""
+    def login(name, password='secreto123'):
+        client.post('/auth/register', json={'name': name, 'password': password})
+        response = client.post('/auth/login', json={'name': name, 'password': password})
+        return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+    return login
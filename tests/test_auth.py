@@ -0,0 +1,82 @@
+from flask_jwt_extended import decode_token
+from sqlalchemy import select
+
+from app import db, token_revocation
+from app.models import ONG
+from app.passwords import PasswordPoolBusy
+
+
+def test_bloom_rebuild_keeps_revoked_tokens_visible(app, client, login, monkeypatch):
+    headers = login('ong')
+    client.post('/auth/logout', headers=headers)
+    revocations = app.extensions['token_revocation']
+    with app.app_context():
+        jti = decode_token(headers['Authorization'].split()[1])['jti']
+        revocations._sync(force=True)
+        assert jti in revocations._bloom
+
+        # Mientras se llena el filtro nuevo, el que usa `is_revoked` sigue completo
+        seen_during_rebuild = []
+
+        class CheckingBloomFilter(token_revocation.BloomFilter):
+            def add(self, value):
+                seen_during_rebuild.append(jti in revocations._bloom)
+                super().add(value)
+
+        monkeypatch.setattr(token_revocation, 'BloomFilter', CheckingBloomFilter)
+        revocations._loaded = revocations.capacity + 1
+        revocations._sync(force=True)
+
+    assert seen_during_rebuild == [True]
+    assert isinstance(revocations._bloom, CheckingBloomFilter) and jti in revocations._bloom
+    assert client.get('/api/pedidos', headers=headers).status_code == 401
+
+
+def test_login_succeeds_when_the_rehash_is_shed(app, client, login, monkeypatch):
+    login('ong')
+    hasher = app.extensions['password_hasher']
+    # El costo configurado subió después del registro
+    monkeypatch.setattr(hasher, 'method', 'pbkdf2:sha256:2000')
+
+    def busy(password):
+        raise PasswordPoolBusy("Demasiados inicios de sesión en curso")
+    monkeypatch.setattr(hasher, 'hash', busy)
+
+    response = client.post('/auth/login', json={'name': 'ong', 'password': 'secreto123'})
+    assert response.status_code == 200
+    with app.app_context():
+        assert db.session.execute(select(ONG.password)).scalar().startswith('pbkdf2:sha256:1000$')
+
+
+def _tokens(client, name='ong', password='secreto123'):
+    client.post('/auth/register', json={'name': name, 'password': password})
+    return client.post('/auth/login', json={'name': name, 'password': password}).get_json()
+
+
+def _bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_refresh_rotates_the_refresh_token(client):
+    tokens = _tokens(client)
+    response = client.post('/auth/refresh', headers=_bearer(tokens['refresh_token']))
+    assert response.status_code == 200
+    rotated = response.get_json()
+    assert rotated['refresh_token'] != tokens['refresh_token']
+    assert client.get('/api/pedidos', headers=_bearer(rotated['access_token'])).status_code == 200
+    assert client.post('/auth/refresh', headers=_bearer(rotated['refresh_token'])).status_code == 200
+
+
+def test_reused_refresh_token_is_rejected(client):
+    tokens = _tokens(client)
+    assert client.post('/auth/refresh', headers=_bearer(tokens['refresh_token'])).status_code == 200
+    assert client.post('/auth/refresh', headers=_bearer(tokens['refresh_token'])).status_code == 401
+
+
+def test_tokens_are_rejected_after_logout(client):
+    tokens = _tokens(client)
+    assert client.post('/auth/logout', headers=_bearer(tokens['access_token'])).status_code == 200
+    assert client.get('/api/pedidos', headers=_bearer(tokens['access_token'])).status_code == 401
+
+    assert client.post('/auth/logout', headers=_bearer(tokens['refresh_token'])).status_code == 200
+    assert client.post('/auth/refresh', headers=_bearer(tokens['refresh_token'])).status_code == 401
@@ -0,0 +1,50 @@
+import pytest
+
+from tests.test_query_counts import PROJECT
+
+
+@pytest.fixture
+def pedido_ids(client, login):
+    owner = login('ong_originante')
+    project_id = client.post('/api/proyectos', json=PROJECT, headers=owner).get_json()['project_id']
+    response = client.post(f'/api/proyectos/{project_id}/pedidos/lote', json={'pedidos': [
+        {'request_type': 'materiales', 'description': 'x', 'amount_requested': 10}
+    ] * 2}, headers=owner)
+    return [result['pedido_id'] for result in response.get_json()['results']]
+
+
+def test_commitments_bulk_rejects_invalid_items(client, login, pedido_ids):
+    collaborator = login('ong_red')
+    response = client.post('/api/compromisos/lote', json={'compromisos': [
+        {'pedido_id': [pedido_ids[0]], 'details': 'd', 'amount_committed': 5},
+        {'pedido_id': pedido_ids[0], 'details': 'd', 'amount_committed': -5},
+        {'pedido_id': pedido_ids[0], 'details': 'd', 'amount_committed': 0},
+        {'pedido_id': pedido_ids[0], 'details': 'd', 'amount_committed': 5},
+    ]}, headers=collaborator)
+    assert response.status_code == 200
+    assert [result['status'] for result in response.get_json()['results']] == [400, 400, 400, 201]
+
+
+def test_commitments_bulk_applies_items_in_order(client, login, pedido_ids):
+    collaborator = login('ong_red')
+    response = client.post('/api/compromisos/lote', json={'compromisos': [
+        {'pedido_id': pedido_ids[0], 'details': 'd', 'amount_committed': 6},
+        {'pedido_id': pedido_ids[0], 'details': 'd', 'amount_committed': 6},
+        # El pedido ya quedó cubierto por los dos anteriores
+        {'pedido_id': pedido_ids[0], 'details': 'd', 'amount_committed': 6},
+        {'pedido_id': pedido_ids[1], 'details': 'd', 'amount_committed': 6},
+    ]}, headers=collaborator)
+    assert [result['status'] for result in response.get_json()['results']] == [201, 201, 404, 201]
+
+    pedidos = client.get(f'/api/pedidos?ids={pedido_ids[0]},{pedido_ids[1]}', headers=collaborator).get_json()
+    assert [(p['status'], p['amount_committed_total']) for p in pedidos['results']] == [('covered', 12), ('open', 6)]
+
+
+def test_fulfillments_bulk_rejects_non_integer_ids(client, login, pedido_ids):
+    owner, collaborator = login('ong_originante'), login('ong_red')
+    created = client.post('/api/compromisos/lote', json={'compromisos': [
+        {'pedido_id': pedido_ids[0], 'details': 'd', 'amount_committed': 5},
+    ]}, headers=collaborator).get_json()['results'][0]['compromiso_id']
+    response = client.put('/api/compromisos/cumplidos', json={'compromiso_ids': [[created], created]}, headers=owner)
+    assert response.status_code == 200
+    assert [result['status'] for result in response.get_json()['results']] == [400, 200]
@@ -0,0 +1,23 @@
+from tests.test_query_counts import PROJECT
+
+
+def test_etag_round_trip_and_invalidation(app, client, login):
+    app.extensions['response_cache'].enabled = True
+    owner = login('ong_originante')
+    project_id = client.post('/api/proyectos', json=PROJECT, headers=owner).get_json()['project_id']
+    pedido = {'request_type': 'materiales', 'description': 'x', 'amount_requested': 10}
+    client.post(f'/api/proyectos/{project_id}/pedido', json=pedido, headers=owner)
+
+    first = client.get('/api/pedidos', headers=owner)
+    assert first.status_code == 200 and first.headers['ETag']
+
+    cached = client.get('/api/pedidos', headers={**owner, 'If-None-Match': first.headers['ETag']})
+    assert cached.status_code == 304
+    assert cached.get_data() == b''
+
+    # Una escritura invalida la versión cacheada
+    assert client.post(f'/api/proyectos/{project_id}/pedido', json=pedido, headers=owner).status_code == 201
+    after = client.get('/api/pedidos', headers={**owner, 'If-None-Match': first.headers['ETag']})
+    assert after.status_code == 200
+    assert after.headers['ETag'] != first.headers['ETag']
+    assert len(after.get_json()) == len(first.get_json()) + 1
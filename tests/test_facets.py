@@ -0,0 +1,11 @@
+from app import facets
+
+
+def test_rebuild_facets_fails_with_nonzero_exit(app, monkeypatch):
+    def fail():
+        raise RuntimeError("sin conexión")
+    monkeypatch.setattr(facets, 'rebuild_facets', fail)
+
+    result = app.test_cli_runner().invoke(args=['rebuild-facets'])
+    assert result.exit_code != 0
+    assert 'sin conexión' in result.output
@@ -0,0 +1,14 @@
+import pytest
+
+
+@pytest.mark.parametrize('url', ['/metrics', '/monitoring/pool'])
+def test_monitoring_is_disabled_without_token(client, url):
+    assert client.get(url).status_code == 404
+
+
+@pytest.mark.parametrize('url', ['/metrics', '/monitoring/pool'])
+def test_monitoring_requires_token(app, client, url):
+    app.config['MONITORING_TOKEN'] = 'token-de-monitoreo'
+    assert client.get(url).status_code == 401
+    assert client.get(url, headers={'Authorization': 'Bearer otro'}).status_code == 401
+    assert client.get(url, headers={'Authorization': 'Bearer token-de-monitoreo'}).status_code == 200
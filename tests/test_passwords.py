@@ -0,0 +1,42 @@
+import time
+
+import pytest
+
+from app.passwords import PasswordHasher, PasswordPoolBusy
+
+
+def _hasher(method='pbkdf2:sha256:1000000', workers=0, max_pending=2, timeout=10):
+    hasher = PasswordHasher()
+    hasher.init_app(type('App', (), {'config': {
+        'PASSWORD_HASH_METHOD': method,
+        'PASSWORD_POOL_WORKERS': workers,
+        'PASSWORD_POOL_MAX_PENDING': max_pending,
+        'PASSWORD_POOL_TIMEOUT': timeout,
+    }, 'extensions': {}})())
+    return hasher
+
+
+@pytest.mark.parametrize('stored, configured, expected', [
+    ('pbkdf2:sha256:600000', 'pbkdf2:sha256:1000000', True),
+    ('pbkdf2:sha256:1000000', 'pbkdf2:sha256:1000000', False),
+    # Nunca se baja el costo de un hash más fuerte
+    ('pbkdf2:sha256:1000000', 'pbkdf2:sha256:600000', False),
+    ('scrypt:32768:8:1', 'scrypt:65536:8:1', True),
+    ('scrypt:65536:8:1', 'scrypt:32768:8:1', False),
+    # Costos que no se pueden comparar
+    ('scrypt:65536:4:1', 'scrypt:32768:8:1', False),
+    ('pbkdf2:sha256:1000', 'scrypt:32768:8:1', False),
+])
+def test_needs_rehash_only_when_weaker(stored, configured, expected):
+    assert _hasher(configured).needs_rehash(f'{stored}$salt$hash') is expected
+
+
+def test_timed_out_hash_keeps_its_slot_until_it_finishes():
+    hasher = _hasher(workers=1, max_pending=1, timeout=0.2)
+    with pytest.raises(PasswordPoolBusy):
+        hasher._run(time.sleep, 1)
+    # La tarea vencida sigue corriendo en el pool: no hay lugar para otra
+    with pytest.raises(PasswordPoolBusy, match="Demasiados"):
+        hasher._run(time.sleep, 0)
+    time.sleep(1.5)
+    assert hasher._run(time.sleep, 0) is None
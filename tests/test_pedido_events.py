@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, insert, select, update
+
+from app import db, pedido_events
+from app.models import PedidoEvent
+from tests.test_query_counts import PROJECT
+
+
+@pytest.fixture
+def stream(app, client, login):
+    """Crea tres pedidos (tres eventos) y devuelve una función que lee el stream una vez."""
+    # Una sola lectura de la tabla por conexión
+    app.config['SSE_MAX_SECONDS'] = 0
+    owner = login('ong_originante')
+    project_id = client.post('/api/proyectos', json=PROJECT, headers=owner).get_json()['project_id']
+    client.post(f'/api/proyectos/{project_id}/pedidos/lote', json={'pedidos': [
+        {'request_type': 'materiales', 'description': 'x', 'amount_requested': 10}
+    ] * 3}, headers=owner)
+
+    def read(last_event_id):
+        response = client.get('/api/pedidos/stream', headers={**owner, 'Last-Event-ID': last_event_id})
+        assert response.status_code == 200
+        return [
+            dict(line.split(': ', 1) for line in block.splitlines())
+            for block in response.get_data(as_text=True).split('\n\n') if block.startswith('id:')
+        ]
+    return read
+
+
+def test_stream_delivers_events_committed_out_of_order(app, stream):
+    with app.app_context():
+        ids = db.session.execute(select(PedidoEvent.id).order_by(PedidoEvent.id)).scalars().all()
+        # El evento del medio todavía no se confirmó
+        late = db.session.execute(select(PedidoEvent.__table__).where(PedidoEvent.id == ids[1])).mappings().one()
+        db.session.execute(delete(PedidoEvent).where(PedidoEvent.id == ids[1]))
+        db.session.commit()
+
+    events = stream('0')
+    assert [event['id'] for event in events] == [f'0:{ids[0]}', f'0:{ids[0]},{ids[2]}']
+
+    with app.app_context():
+        db.session.execute(insert(PedidoEvent), [dict(late)])
+        db.session.commit()
+
+    events = stream(events[-1]['id'])
+    assert [event['id'] for event in events] == [f'0:{ids[0]},{ids[1]},{ids[2]}']
+
+
+def test_stream_settles_old_events(app, stream):
+    with app.app_context():
+        ids = db.session.execute(select(PedidoEvent.id).order_by(PedidoEvent.id)).scalars().all()
+        db.session.execute(update(PedidoEvent).values(created_at=datetime.now() - timedelta(minutes=1)))
+        db.session.commit()
+
+    assert [event['id'] for event in stream(f'0:{ids[0]}')] == [str(ids[1]), str(ids[2])]
+    assert stream(str(ids[2])) == []
+
+
+def test_stream_rejects_invalid_last_event_id(client, login):
+    response = client.get('/api/pedidos/stream', headers={**login('ong'), 'Last-Event-ID': '3:a'})
+    assert response.status_code == 400
+
+
+def test_stream_disabled_on_sync_workers(app, client, login):
+    app.config['SSE_ENABLED'] = False
+    response = client.get('/api/pedidos/stream', headers=login('ong'))
+    assert response.status_code == 503
+
+
+def test_prune_pedido_events_fails_with_nonzero_exit(app, monkeypatch):
+    def fail(*args):
+        raise RuntimeError("sin conexión")
+    monkeypatch.setattr(pedido_events, 'delete', fail)
+
+    result = app.test_cli_runner().invoke(args=['prune-pedido-events'])
+    assert result.exit_code != 0
+    assert 'sin conexión' in result.output
@@ -0,0 +1,143 @@
+import pytest
+
+from tests.test_query_counts import PROJECT
+
+
+@pytest.mark.parametrize('project_types', [
+    'Educación', ['Educación', 3], ['Educación', ' '], {'a': 'b'}, ['x' * 256],
+])
+def test_create_project_rejects_invalid_project_types(client, login, project_types):
+    owner = login('ong_originante')
+    response = client.post('/api/proyectos', json={**PROJECT, 'project_types': project_types}, headers=owner)
+    assert response.status_code == 400
+    assert client.get('/api/facets', headers=owner).get_json()['project_type'] == []
+
+
+@pytest.mark.parametrize('project_types', [None, [], ['Educación', 'Salud']])
+def test_create_project_accepts_project_types(client, login, project_types):
+    owner = login('ong_originante')
+    response = client.post('/api/proyectos', json={**PROJECT, 'project_types': project_types}, headers=owner)
+    assert response.status_code == 201
+    project = client.get(f"/api/proyectos/{response.get_json()['project_id']}", headers=owner).get_json()
+    assert project['project_types'] == project_types
+
+
+@pytest.mark.parametrize('amount_requested', [0, -5, 'abc', None, True])
+def test_add_pedido_rejects_invalid_amount(client, login, amount_requested):
+    owner = login('ong_originante')
+    project_id = client.post('/api/proyectos', json=PROJECT, headers=owner).get_json()['project_id']
+    response = client.post(f'/api/proyectos/{project_id}/pedido', json={
+        'request_type': 'materiales', 'description': 'x', 'amount_requested': amount_requested,
+    }, headers=owner)
+    assert response.status_code == 400
+    assert client.get(f'/api/proyectos/{project_id}/pedidos', headers=owner).get_json() == []
+
+
+def _project_with_pedidos(client, owner, amounts):
+    project_id = client.post('/api/proyectos', json=PROJECT, headers=owner).get_json()['project_id']
+    pedido_ids = [
+        client.post(f'/api/proyectos/{project_id}/pedido', json={
+            'request_type': request_type, 'description': 'x', 'amount_requested': amount,
+        }, headers=owner).get_json().get('pedido_id')
+        for request_type, amount in amounts
+    ]
+    return project_id, pedido_ids
+
+
+def test_project_summary_caps_coverage_and_ignores_invalid_amounts(client, login):
+    owner = login('ong_originante')
+    collaborator = login('ong_red')
+    project_id, pedido_ids = _project_with_pedidos(client, owner, [
+        ('materiales', 10), ('económica', 20), ('materiales', 0), ('materiales', -5),
+    ])
+    # Los montos cero y negativos se rechazan y no llegan al resumen
+    assert pedido_ids[2:] == [None, None]
+
+    # Lo comprometido de más en un pedido no cubre a los demás
+    compromiso_id = client.post(f'/api/pedidos/{pedido_ids[0]}/compromiso', json={
+        'details': 'd', 'amount_committed': 15,
+    }, headers=collaborator).get_json()['compromiso_id']
+    client.post(f'/api/pedidos/{pedido_ids[1]}/compromiso', json={'details': 'd', 'amount_committed': 5}, headers=collaborator)
+    client.put(f'/api/compromisos/{compromiso_id}/cumplido', headers=owner)
+
+    summary = client.get(f'/api/proyectos/{project_id}/resumen', headers=owner).get_json()
+    assert {key: summary[key] for key in (
+        'pedidos', 'amount_requested', 'amount_committed', 'amount_fulfilled',
+        'coverage_percent', 'fulfillment_percent', 'collaborating_ongs',
+    )} == {
+        'pedidos': 2, 'amount_requested': 30, 'amount_committed': 20, 'amount_fulfilled': 15,
+        'coverage_percent': 50.0, 'fulfillment_percent': 50.0, 'collaborating_ongs': 1,
+    }
+    assert [(group['request_type'], group['status']) for group in summary['by_request_type']] == [
+        ('económica', 'open'), ('materiales', 'covered'),
+    ]
+    assert client.get(f'/api/proyectos/{project_id}/resumen', headers=collaborator).status_code == 403
+
+
+def test_project_summary_without_pedidos(client, login):
+    owner = login('ong_originante')
+    project_id, _ = _project_with_pedidos(client, owner, [])
+    summary = client.get(f'/api/proyectos/{project_id}/resumen', headers=owner).get_json()
+    assert (summary['pedidos'], summary['coverage_percent'], summary['by_request_type']) == (0, None, [])
+
+
+def test_fields_restricts_the_projection(client, login):
+    owner = login('ong_originante')
+    project_id, _ = _project_with_pedidos(client, owner, [('materiales', 10), ('económica', 20)])
+
+    # Los listados paginados agregan siempre los campos del cursor
+    response = client.get('/api/pedidos?fields=description&limit=1', headers=owner)
+    assert [set(row) for row in response.get_json()] == [{'id', 'created_at', 'description'}]
+    next_page = client.get(f"/api/pedidos?fields=description&limit=1&cursor={response.headers['X-Next-Cursor']}",
+                           headers=owner).get_json()
+    assert len(next_page) == 1 and next_page[0]['id'] != response.get_json()[0]['id']
+
+    project = client.get(f'/api/proyectos/{project_id}?fields=project_name,budget', headers=owner).get_json()
+    assert project == {'id': project_id, 'project_name': PROJECT['project_name'], 'budget': PROJECT['budget']}
+
+    assert client.get('/api/proyectos?fields=project_name,nope', headers=owner).status_code == 400
+
+
+def test_include_adds_relations(client, login):
+    owner = login('ong_originante')
+    collaborator = login('ong_red')
+    project_id, pedido_ids = _project_with_pedidos(client, owner, [('materiales', 10)])
+    client.post(f'/api/pedidos/{pedido_ids[0]}/compromiso', json={'details': 'd', 'amount_committed': 4}, headers=collaborator)
+
+    project = client.get(f'/api/proyectos/{project_id}', headers=owner).get_json()
+    assert not {'work_plan', 'coverage_plan', 'pedidos', 'compromisos'} & set(project)
+
+    url = f'/api/proyectos/{project_id}?include=work_plan,coverage_plan,pedidos,compromisos'
+    project = client.get(url, headers=owner).get_json()
+    assert project['work_plan']['stages'] == PROJECT['stages']
+    assert project['coverage_plan']['id']
+    assert [pedido['id'] for pedido in project['pedidos']] == pedido_ids
+    assert len(project['compromisos']) == 1
+
+    # Los compromisos solo los ve la ONG dueña; el resto de las relaciones, cualquiera
+    assert client.get(url, headers=collaborator).status_code == 403
+    assert client.get(f'/api/proyectos/{project_id}?include=pedidos', headers=collaborator).status_code == 200
+    assert client.get(f'/api/proyectos/{project_id}?include=nope', headers=owner).status_code == 400
+    assert client.get('/api/proyectos/999999?include=work_plan', headers=owner).status_code == 404
+
+
+def test_ids_returns_rows_in_order_and_missing_ids(app, client, login):
+    owner = login('ong_originante')
+    collaborator = login('ong_red')
+    project_id, pedido_ids = _project_with_pedidos(client, owner, [('materiales', 10), ('económica', 20)])
+    # Un pedido cubierto también se devuelve: `?ids=` no filtra por estado
+    client.post(f'/api/pedidos/{pedido_ids[0]}/compromiso', json={'details': 'd', 'amount_committed': 10}, headers=collaborator)
+
+    body = client.get(f'/api/pedidos?ids={pedido_ids[1]},999999,{pedido_ids[0]},{pedido_ids[1]}&fields=status',
+                      headers=owner).get_json()
+    assert body == {
+        'results': [{'id': pedido_ids[1], 'status': 'open'}, {'id': pedido_ids[0], 'status': 'covered'}],
+        'missing': [999999],
+    }
+
+    body = client.get(f'/api/proyectos?ids=999999,{project_id}', headers=owner).get_json()
+    assert [row['id'] for row in body['results']] == [project_id] and body['missing'] == [999999]
+
+    assert client.get('/api/pedidos?ids=1,abc', headers=owner).status_code == 400
+    too_many = ','.join(str(i) for i in range(1, app.config['BULK_MAX_ITEMS'] + 2))
+    assert client.get(f'/api/proyectos?ids={too_many}', headers=owner).status_code == 400
@@ -0,0 +1,68 @@
+"""
+La cantidad de sentencias SQL de cada GET no depende de cuántas filas devuelve:
+se mide con pocos datos, se multiplican las filas y se vuelve a medir.
+"""
+import pytest
+
+PROJECT = {
+    'project_name': 'Escuela rural', 'description': 'd', 'country': 'Argentina', 'location': 'l',
+    'project_types': ['Educación'], 'budget': 1000, 'duration': 12, 'objectives': 'o',
+    'beneficiaries': 'b', 'stages': [{'name': 'Fase 1'}],
+}
+
+ENDPOINTS = [
+    '/api/pedidos',
+    '/api/pedidos?status=covered',
+    '/api/pedidos?country=Argentina&request_type=materiales&project_types=Educación',
+    '/api/pedidos?fields=id,description',
+    '/api/pedidos?format=ndjson',
+    '/api/proyectos',
+    '/api/proyectos?country=Argentina',
+    '/api/proyectos/{project_id}',
+    '/api/proyectos/{project_id}?include=work_plan,coverage_plan,pedidos,compromisos',
+    '/api/proyectos/{project_id}/pedidos',
+    '/api/proyectos/{project_id}/compromisos',
+    '/api/proyectos/{project_id}/resumen',
+    '/api/facets',
+]
+
+
+def _add_data(client, owner, collaborator, projects, pedidos):
+    """Crea proyectos con `pedidos` pedidos cada uno y compromete la mitad de ellos."""
+    project_ids = []
+    for _ in range(projects):
+        project_id = client.post('/api/proyectos', json=PROJECT, headers=owner).get_json()['project_id']
+        response = client.post(f'/api/proyectos/{project_id}/pedidos/lote', json={'pedidos': [
+            {'request_type': 'materiales', 'description': 'x', 'amount_requested': 10}
+        ] * pedidos}, headers=owner)
+        pedido_ids = [result['pedido_id'] for result in response.get_json()['results']]
+        client.post('/api/compromisos/lote', json={'compromisos': [
+            {'pedido_id': pedido_id, 'details': 'd', 'amount_committed': 10} for pedido_id in pedido_ids[::2]
+        ]}, headers=collaborator)
+        project_ids.append(project_id)
+    return project_ids
+
+
+@pytest.mark.parametrize('url', ENDPOINTS)
+def test_statement_count_does_not_depend_on_rows(client, statements, login, url):
+    owner, collaborator = login('ong_originante'), login('ong_red')
+    project_id = _add_data(client, owner, collaborator, projects=1, pedidos=2)[0]
+    url = url.format(project_id=project_id)
+
+    def measure():
+        statements.count = 0
+        response = client.get(url, headers=owner)
+        assert response.status_code == 200
+        response.get_data()  # Las respuestas en streaming consultan al consumirse
+        return statements.count
+
+    # La primera petición resuelve y cachea la identidad de la ONG
+    client.get(url, headers=owner).get_data()
+    few_rows = measure()
+
+    _add_data(client, owner, collaborator, projects=5, pedidos=1)
+    client.post(f'/api/proyectos/{project_id}/pedidos/lote', json={'pedidos': [
+        {'request_type': 'materiales', 'description': 'x', 'amount_requested': 10}
+    ] * 40}, headers=owner)
+
+    assert measure() == few_rows
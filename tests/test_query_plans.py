@@ -0,0 +1,47 @@
+"""
+Regresiones de planes de ejecución (app/query_plans.py) contra una base Postgres
+poblada, por ejemplo con `flask seed-synthetic`:
+
+    QUERY_PLANS_DATABASE_URL=postgresql://... python -m pytest tests/test_query_plans.py
+
+Sin esa variable, o si la base no responde, el test se omite.
+"""
+import os
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app import create_app, db
+from config import Config
+
+DATABASE_URL = os.environ.get('QUERY_PLANS_DATABASE_URL')
+
+
+class PlanCheckConfig(Config):
+    TESTING = True
+    SECRET_KEY = 'test-secret-key'
+    JWT_SECRET_KEY = 'test-jwt-secret-key-de-al-menos-32-bytes'
+    SQLALCHEMY_DATABASE_URI = DATABASE_URL
+
+
+def _postgres_available():
+    if not DATABASE_URL or not DATABASE_URL.startswith('postgresql'):
+        return False
+    try:
+        with create_engine(DATABASE_URL).connect() as conn:
+            conn.execute(text('SELECT 1'))
+    except (OperationalError, ImportError):
+        return False
+    return True
+
+
+@pytest.mark.skipif(not _postgres_available(), reason="Requiere Postgres poblado en QUERY_PLANS_DATABASE_URL")
+def test_hot_queries_do_not_seq_scan_large_tables():
+    from app.query_plans import find_plan_regressions
+
+    app = create_app(PlanCheckConfig)
+    with app.app_context():
+        _, failures = find_plan_regressions(min_rows=10000)
+        db.session.rollback()
+    assert not failures, "\n".join(failures)
@@ -0,0 +1,36 @@
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy.dialects import postgresql
+
+from app import db
+from app.search import SEARCH_KINDS, _pg_search_query, include_object
+from tests.test_query_counts import PROJECT
+
+
+def test_highlight_escapes_stored_text(client, login):
+    owner = login('ong_originante')
+    client.post('/api/proyectos', json={
+        **PROJECT, 'description': '<img src=x onerror="alert(1)"> pozo de agua potable & cloacas',
+    }, headers=owner)
+
+    results = client.get('/api/search?q=agua', headers=owner).get_json()
+    highlight = results[0]['highlight']
+    assert '<b>agua</b>' in highlight
+    assert '<img' not in highlight
+    assert '&lt;img src=x onerror=&quot;alert(1)&quot;&gt;' in highlight
+    assert '&amp; cloacas' in highlight
+
+
+def test_autogenerate_ignores_search_objects(app):
+    with app.app_context():
+        with db.engine.connect() as connection:
+            context = MigrationContext.configure(connection, opts={'include_object': include_object})
+            assert compare_metadata(context, db.metadata) == []
+            # Sin el filtro, la autogeneración borraría las tablas FTS5
+            unfiltered = compare_metadata(MigrationContext.configure(connection), db.metadata)
+            assert {diff[1].name for diff in unfiltered if diff[0] == 'remove_table'} >= {'project_search', 'pedido_search'}
+
+
+def test_pg_search_compares_rank_in_double_precision():
+    statement = str(_pg_search_query('agua', SEARCH_KINDS, (0.1, 'pedido', 3), 20).compile(dialect=postgresql.dialect()))
+    assert 'CAST(ts_rank_cd(' in statement and 'AS FLOAT(53))' in statement
@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from sqlalchemy import select, update
+
+from app import db, sync
+from app.models import PedidoColaboracion
+from tests.test_query_counts import PROJECT
+
+
+def test_sync_rewinds_each_caught_up_resource(app, client, login):
+    owner = login('ong_originante')
+    first = client.post('/api/proyectos', json=PROJECT, headers=owner).get_json()['project_id']
+    second = client.post('/api/proyectos', json=PROJECT, headers=owner).get_json()['project_id']
+    pedido = {'request_type': 'materiales', 'description': 'x', 'amount_requested': 10}
+    client.post(f'/api/proyectos/{first}/pedido', json=pedido, headers=owner)
+
+    # Los proyectos siguen teniendo páginas, los pedidos ya quedaron al día
+    body = client.get('/api/sync?limit=1', headers=owner).get_json()
+    assert body['has_more'] and len(body['pedidos']) == 1
+
+    # Un pedido que confirma tarde, con una fecha anterior al que ya se entregó
+    late_id = client.post(f'/api/proyectos/{second}/pedido', json=pedido, headers=owner).get_json()['pedido_id']
+    with app.app_context():
+        delivered_at = db.session.execute(
+            select(PedidoColaboracion.updated_at).where(PedidoColaboracion.id == body['pedidos'][0]['id'])
+        ).scalar()
+        db.session.execute(
+            update(PedidoColaboracion).where(PedidoColaboracion.id == late_id)
+            .values(updated_at=delivered_at - timedelta(milliseconds=1))
+        )
+        db.session.commit()
+
+    body = client.get(f"/api/sync?limit=1&since={body['since']}", headers=owner).get_json()
+    assert late_id in [row['id'] for row in body['pedidos']]
+
+
+def test_prune_tombstones_rejects_days_below_retention(app):
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=['prune-tombstones', '--days', str(app.config['SYNC_TOMBSTONE_DAYS'] - 1)])
+    assert result.exit_code != 0
+    assert 'SYNC_TOMBSTONE_DAYS' in result.output
+    assert runner.invoke(args=['prune-tombstones']).exit_code == 0
+
+
+def test_prune_tombstones_fails_with_nonzero_exit(app, monkeypatch):
+    def fail(*args):
+        raise RuntimeError("sin conexión")
+    monkeypatch.setattr(sync, 'delete', fail)
+
+    result = app.test_cli_runner().invoke(args=['prune-tombstones'])
+    assert result.exit_code != 0
+    assert 'sin conexión' in result.output